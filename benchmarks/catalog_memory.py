@@ -0,0 +1,166 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Compare the peak memory used to deduplicate a catalog with `polib` entries
+and with the compact `CatalogEntry` model.
+
+Usage:
+
+    python benchmarks/catalog_memory.py [--messages 20000] [--files 2000]
+"""
+import argparse
+import contextlib
+import gc
+import os
+import random
+import time
+import tracemalloc
+
+import polib
+
+from jupyterlab_translate.catalog import Catalog
+from jupyterlab_translate.catalog import CatalogEntry
+from jupyterlab_translate.catalog import make_occurrence
+from jupyterlab_translate.utils import remove_duplicates
+
+METADATA = {
+    "Project-Id-Version": "jupyterlab 3.0.0",
+    "MIME-Version": "1.0",
+    "Content-Type": "text/plain; charset=utf-8",
+    "Content-Transfer-Encoding": "8bit",
+}
+
+
+def generate_messages(messages, files, seed=0):
+    """
+    Generate `(file, line, context, msgid)` tuples, like the extracted
+    strings of a monorepo where many messages are used in several files.
+    """
+    rng = random.Random(seed)
+    results = []
+    for idx in range(messages):
+        msgid = "Message number {} of the benchmark catalog".format(idx)
+        context = "schema" if idx % 10 == 0 else None
+        for _ in range(rng.randint(1, 4)):
+            results.append((rng.randrange(files), rng.randint(1, 2000), context, msgid))
+
+    return results
+
+
+def get_path(file_idx):
+    # The extractors build a new path string for each occurrence
+    return "/packages/package-{}/src/module{}.ts".format(file_idx % 100, file_idx)
+
+
+def legacy_remove_duplicates(entries):
+    """
+    Deduplicate `polib.POEntry` objects as `remove_duplicates` used to.
+    """
+    grouped = {}
+    entries_data = {}
+    duplicates = set()
+    for entry in entries:
+        key = (entry.msgctxt, entry.msgid, entry.msgid_plural)
+        if key in grouped:
+            grouped[key].append(entry)
+            duplicates.add(key)
+        else:
+            entry.occurrences = list(sorted(entry.occurrences))
+            grouped[key] = [entry]
+            entries_data[key] = entry
+
+    for key in duplicates:
+        entry = entries_data[key]
+        new_occurences = []
+        for item in grouped[key]:
+            new_occurences.extend(item.occurrences)
+
+        grouped[key] = [
+            polib.POEntry(
+                msgid=entry.msgid,
+                msgid_plural=entry.msgid_plural,
+                msgctxt=entry.msgctxt,
+                occurrences=list(sorted(new_occurences)),
+            )
+        ]
+
+    po = polib.POFile(wrapwidth=100000)
+    po.metadata = METADATA
+    for key in sorted(grouped, key=lambda x: grouped[x][0].occurrences):
+        po.append(grouped[key][0])
+
+    return po
+
+
+def run_legacy(messages):
+    entries = [
+        polib.POEntry(
+            msgid=msgid,
+            msgctxt=context,
+            occurrences=[(get_path(file_idx), str(line))],
+        )
+        for (file_idx, line, context, msgid) in messages
+    ]
+    return legacy_remove_duplicates(entries)
+
+
+def run_compact(messages):
+    pot = Catalog(metadata=METADATA)
+    for file_idx, line, context, msgid in messages:
+        pot.append(
+            CatalogEntry(
+                msgid=msgid,
+                msgctxt=context,
+                occurrences=[make_occurrence(get_path(file_idx), line)],
+            )
+        )
+
+    return remove_duplicates(pot, METADATA)
+
+
+def measure(func, messages):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(messages)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result), peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages, args.files)
+    print(
+        "{} messages, {} occurrences, {} files\n".format(
+            args.messages, len(messages), args.files
+        )
+    )
+    results = {}
+    for name, func in (("polib", run_legacy), ("compact", run_compact)):
+        with open(os.devnull, "w") as devnull:
+            # Silence the progress messages of remove_duplicates
+            with contextlib.redirect_stdout(devnull):
+                entries, peak, elapsed = measure(func, messages)
+
+        results[name] = peak
+        print(
+            "{:<8} entries={} peak={:.1f} MiB time={:.2f}s".format(
+                name, entries, peak / 2**20, elapsed
+            )
+        )
+
+    print(
+        "\nPeak memory reduced by {:.0%}".format(
+            1 - results["compact"] / results["polib"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
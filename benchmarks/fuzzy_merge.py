@@ -0,0 +1,95 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Compare the time to merge a template into a translated catalog with the
+`difflib` and the trigram index fuzzy matchers, for growing catalog sizes.
+
+Usage:
+
+    python benchmarks/fuzzy_merge.py [--sizes 1000 2000 4000 8000]
+"""
+import argparse
+import random
+import time
+
+from babel.messages.catalog import Catalog
+
+from jupyterlab_translate.merge import DifflibMatcher
+from jupyterlab_translate.merge import TrigramMatcher
+from jupyterlab_translate.merge import update_catalog
+
+WORDS = (
+    "open close save file folder notebook cell code markdown kernel restart "
+    "run select all copy paste cut undo redo view tab panel console terminal "
+    "settings theme language export download upload rename delete new edit"
+).split()
+
+
+def generate_catalogs(size, changed=0.1, seed=0):
+    """
+    Generate a translated catalog with `size` messages and a template where
+    a fraction of them has changed slightly.
+    """
+    rng = random.Random(seed)
+    catalog = Catalog(locale="es")
+    template = Catalog()
+    for idx in range(size):
+        words = rng.sample(WORDS, rng.randint(3, 8))
+        msgid = "{} {}".format(" ".join(words).capitalize(), idx)
+        catalog.add(msgid, "ES " + msgid, locations=[("file.py", idx)])
+        if rng.random() < changed:
+            # Reword the message so it needs a fuzzy match
+            msgid = msgid.replace(words[0], rng.choice(WORDS), 1) + "..."
+
+        template.add(msgid, locations=[("file.py", idx)])
+
+    return catalog, template
+
+
+def run(size, matcher):
+    catalog, template = generate_catalogs(size)
+    start = time.perf_counter()
+    update_catalog(catalog, template, fuzzy_matcher=matcher)
+    elapsed = time.perf_counter() - start
+    fuzzy = sum(1 for message in catalog if message.fuzzy and message.id)
+    return elapsed, fuzzy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000]
+    )
+    parser.add_argument(
+        "--difflib-max-size",
+        type=int,
+        default=8000,
+        help="Skip the difflib matcher above this size",
+    )
+    args = parser.parse_args()
+
+    print(
+        "{:>8} {:>12} {:>8} {:>12} {:>8}".format(
+            "size", "difflib", "fuzzy", "trigram", "fuzzy"
+        )
+    )
+    for size in args.sizes:
+        difflib_time, difflib_fuzzy = "-", "-"
+        if size <= args.difflib_max_size:
+            elapsed, difflib_fuzzy = run(size, DifflibMatcher)
+            difflib_time = "{:.2f}s".format(elapsed)
+
+        elapsed, trigram_fuzzy = run(size, TrigramMatcher)
+        print(
+            "{:>8} {:>12} {:>8} {:>12} {:>8}".format(
+                size,
+                difflib_time,
+                difflib_fuzzy,
+                "{:.2f}s".format(elapsed),
+                trigram_fuzzy,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
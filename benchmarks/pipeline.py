@@ -0,0 +1,401 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Time each stage of the translation pipeline on a synthetic JupyterLab
+shaped repository.
+
+The repository is generated with the given number of packages, TypeScript
+and TSX files, settings schemas and strings per file. Each stage runs on a
+new output folder and the best of `--repeat` runs is kept:
+
+- extract: `extract_translations` without the extraction cache.
+- remove_duplicates: `remove_duplicates` on the extracted catalog.
+- update: `update_translations` for every locale, with a cached extraction.
+- compile: `compile_translations` of every locale, `.mo` and `.json` files.
+- convert: `convert_catalog_to_json` of every locale.
+
+Results are saved as JSON and compared with a baseline saved by a previous
+run, the check fails if a stage is slower than the baseline by more than
+the tolerance.
+
+Usage:
+
+    python benchmarks/pipeline.py [--packages 20] [--locales 4] --output results.json
+    python benchmarks/pipeline.py --baseline results.json [--tolerance 0.2]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import polib
+
+from jupyterlab_translate.constants import LOCALE_FOLDER
+from jupyterlab_translate.converters import convert_catalog_to_json
+from jupyterlab_translate.utils import compile_translations
+from jupyterlab_translate.utils import create_catalog
+from jupyterlab_translate.utils import extract_translations
+from jupyterlab_translate.utils import get_catalog_path
+from jupyterlab_translate.utils import get_version
+from jupyterlab_translate.utils import remove_duplicates
+from jupyterlab_translate.utils import update_translations
+
+PROJECT = "jupyterlab"
+LOCALES = ("es_CO", "fr_FR", "ja_JP", "pt_BR", "zh_CN", "de_DE", "ru_RU", "ko_KR")
+STAGES = ("extract", "remove_duplicates", "update", "compile", "convert")
+WORDS = (
+    "open close save file folder notebook cell code markdown kernel restart "
+    "run select all copy paste cut undo redo view tab panel console terminal "
+    "settings theme language export download upload rename delete new edit"
+).split()
+
+
+# --- Repository generator
+# ----------------------------------------------------------------------------
+def make_message(rng, idx):
+    """
+    Return a message of a few words, shared by other files one time in ten.
+    """
+    if rng.random() < 0.1:
+        idx = rng.randrange(100)
+
+    words = rng.sample(WORDS, rng.randint(2, 6))
+    return "{} {}".format(" ".join(words).capitalize(), idx)
+
+
+def make_source(rng, strings, tsx=False):
+    """
+    Return the text of a TypeScript module using `strings` messages.
+    """
+    lines = ["import { nullTranslator } from '@jupyterlab/translation';", ""]
+    for idx in range(strings):
+        message = make_message(rng, idx)
+        kind = idx % 4
+        if kind == 0:
+            lines.append("const a{} = trans.__('{}');".format(idx, message))
+        elif kind == 1:
+            lines.append(
+                "const b{} = trans._n('{}', '{}s', n);".format(idx, message, message)
+            )
+        elif kind == 2:
+            lines.append("const c{} = trans._p('menu', '{}');".format(idx, message))
+        else:
+            lines.append("const d{} = trans.__('{} %1', name);".format(idx, message))
+
+    if tsx:
+        lines.append("const e = <div title={trans.__('Widget title')} />;")
+
+    return "\n".join(lines) + "\n"
+
+
+def make_schema(rng, strings):
+    """
+    Return a settings schema with `strings` translatable titles and
+    descriptions.
+    """
+    properties = {}
+    for idx in range(max(0, strings - 2) // 2):
+        properties["property{}".format(idx)] = {
+            "title": make_message(rng, idx),
+            "description": make_message(rng, idx + 1),
+            "type": "string",
+        }
+
+    return {
+        "title": make_message(rng, 0),
+        "description": make_message(rng, 1),
+        "properties": properties,
+    }
+
+
+def generate_repo(
+    repo_root_dir, packages=20, ts_files=10, tsx_files=4, schemas=2, strings=20, seed=0
+):
+    """
+    Generate a synthetic JupyterLab shaped repository.
+
+    Parameters
+    ----------
+    repo_root_dir: str
+        Folder of the repository, created if needed.
+    packages: int
+        Number of packages in the `packages` folder.
+    ts_files: int
+        Number of TypeScript files of each package.
+    tsx_files: int
+        Number of TSX files of each package.
+    schemas: int
+        Number of settings schemas of each package.
+    strings: int
+        Number of strings of each file.
+    seed: int
+        Seed of the random messages.
+    """
+    rng = random.Random(seed)
+    for pkg_idx in range(packages):
+        pkg_dir = os.path.join(repo_root_dir, "packages", "pkg{}".format(pkg_idx))
+        src_dir = os.path.join(pkg_dir, "src")
+        schema_dir = os.path.join(pkg_dir, "schema")
+        os.makedirs(src_dir, exist_ok=True)
+        os.makedirs(schema_dir, exist_ok=True)
+        with open(os.path.join(pkg_dir, "package.json"), "w") as fh:
+            json.dump(
+                {
+                    "name": "@jupyterlab/pkg{}".format(pkg_idx),
+                    "jupyterlab": {"schemaDir": "schema"},
+                },
+                fh,
+                indent=2,
+            )
+
+        for idx in range(ts_files + tsx_files):
+            tsx = idx >= ts_files
+            name = "module{}{}".format(idx, ".tsx" if tsx else ".ts")
+            with open(os.path.join(src_dir, name), "w") as fh:
+                fh.write(make_source(rng, strings, tsx=tsx))
+
+        for idx in range(schemas):
+            name = "plugin{}.json".format(idx)
+            with open(os.path.join(schema_dir, name), "w") as fh:
+                json.dump(make_schema(rng, strings), fh, indent=2)
+
+    project_dir = os.path.join(repo_root_dir, PROJECT)
+    os.makedirs(project_dir, exist_ok=True)
+    with open(os.path.join(project_dir, "_version.py"), "w") as fh:
+        fh.write("__version__ = '3.0.0'\n")
+
+
+def translate_catalogs(output_dir, locales, ratio=0.8, seed=0):
+    """
+    Translate a fraction of the messages of the `.po` files of `locales`.
+    """
+    rng = random.Random(seed)
+    locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
+    for locale in locales:
+        po_path = get_catalog_path(locale_dir, PROJECT, locale)
+        po = polib.pofile(po_path, wrapwidth=100000)
+        for entry in po:
+            if rng.random() > ratio:
+                continue
+
+            if entry.msgid_plural:
+                for key in entry.msgstr_plural:
+                    entry.msgstr_plural[key] = "{} [{}]".format(
+                        entry.msgid_plural, locale
+                    )
+            else:
+                entry.msgstr = "{} [{}]".format(entry.msgid, locale)
+
+        po.save(po_path)
+
+
+# --- Stages
+# ----------------------------------------------------------------------------
+@contextlib.contextmanager
+def silence():
+    """
+    Silence the progress messages of the pipeline.
+    """
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def run_pipeline(repo_root_dir, work_dir, locales, jobs=1):
+    """
+    Run every stage once on a new output folder.
+
+    Returns
+    -------
+    dict
+        Seconds taken by each stage.
+    """
+    output_dir = tempfile.mkdtemp(dir=work_dir)
+    locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
+    json_dir = tempfile.mkdtemp(dir=work_dir)
+    times = {}
+    with silence():
+        times["extract"] = timed(
+            extract_translations,
+            repo_root_dir,
+            output_dir,
+            PROJECT,
+            jobs=jobs,
+            use_cache=False,
+        )
+
+        _pot_path, pot = create_catalog(
+            repo_root_dir,
+            locale_dir,
+            PROJECT,
+            get_version(repo_root_dir, PROJECT),
+            jobs=jobs,
+        )
+        times["remove_duplicates"] = timed(remove_duplicates, pot, pot.metadata)
+
+        times["update"] = timed(
+            update_translations,
+            repo_root_dir,
+            output_dir,
+            PROJECT,
+            locales,
+            jobs=jobs,
+        )
+        translate_catalogs(output_dir, locales)
+
+        times["compile"] = timed(compile_translations, output_dir, PROJECT, locales)
+
+        start = time.perf_counter()
+        for locale in locales:
+            convert_catalog_to_json(
+                get_catalog_path(locale_dir, PROJECT, locale), json_dir, PROJECT
+            )
+        times["convert"] = time.perf_counter() - start
+
+    shutil.rmtree(output_dir)
+    shutil.rmtree(json_dir)
+    return times
+
+
+# --- Results
+# ----------------------------------------------------------------------------
+def compare_results(results, baseline, tolerance):
+    """
+    Print the change of each stage against a baseline.
+
+    Returns
+    -------
+    list
+        Names of the stages slower than the baseline by more than
+        `tolerance`.
+    """
+    if baseline["config"] != results["config"]:
+        print(
+            "\nwarning: the baseline was measured with a different "
+            "configuration: {}".format(baseline["config"])
+        )
+
+    print("\n{:<20} {:>10} {:>10} {:>8}".format("stage", "baseline", "current", ""))
+    regressions = []
+    for stage in STAGES:
+        old = baseline["times"].get(stage)
+        new = results["times"][stage]
+        if not old:
+            print("{:<20} {:>10} {:>9.3f}s".format(stage, "-", new))
+            continue
+
+        change = new / old - 1
+        status = ""
+        if change > tolerance:
+            status = "SLOWER"
+            regressions.append(stage)
+        elif change < -tolerance:
+            status = "faster"
+
+        print(
+            "{:<20} {:>9.3f}s {:>9.3f}s {:>+7.0%} {}".format(
+                stage, old, new, change, status
+            )
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--ts-files", type=int, default=10)
+    parser.add_argument("--tsx-files", type=int, default=4)
+    parser.add_argument("--schemas", type=int, default=2)
+    parser.add_argument("--strings", type=int, default=20, help="Strings per file")
+    parser.add_argument("--locales", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of this file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown against the baseline, 0.2 is 20%%",
+    )
+    parser.add_argument(
+        "--keep", help="Generate the repository in this folder and keep it"
+    )
+    args = parser.parse_args()
+
+    if not 1 <= args.locales <= len(LOCALES):
+        parser.error("--locales must be between 1 and {}".format(len(LOCALES)))
+
+    config = {
+        "packages": args.packages,
+        "ts_files": args.ts_files,
+        "tsx_files": args.tsx_files,
+        "schemas": args.schemas,
+        "strings": args.strings,
+        "locales": args.locales,
+        "jobs": args.jobs,
+    }
+    locales = list(LOCALES[: args.locales])
+    work_dir = tempfile.mkdtemp(prefix="jupyterlab-translate-bench-")
+    repo_root_dir = args.keep or os.path.join(work_dir, "repo")
+    try:
+        generate_repo(
+            repo_root_dir,
+            packages=args.packages,
+            ts_files=args.ts_files,
+            tsx_files=args.tsx_files,
+            schemas=args.schemas,
+            strings=args.strings,
+        )
+        runs = []
+        for idx in range(args.repeat):
+            runs.append(run_pipeline(repo_root_dir, work_dir, locales, jobs=args.jobs))
+            print("Run {} of {} done".format(idx + 1, args.repeat))
+    finally:
+        shutil.rmtree(work_dir)
+
+    # Keep the best time of each stage, the others measure noise of the machine
+    times = {stage: min(run[stage] for run in runs) for stage in STAGES}
+    results = {
+        "config": config,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "times": times,
+    }
+    print("\n{}".format(json.dumps(config)))
+    for stage in STAGES:
+        print("{:<20} {:>9.3f}s".format(stage, times[stage]))
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as fh:
+            baseline = json.load(fh)
+
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(
+                "\nerror: slower than the baseline: {}".format(", ".join(regressions))
+            )
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
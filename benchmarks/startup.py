@@ -0,0 +1,90 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Measure the import time of the command line interface with `-X importtime`.
+
+The check fails if a heavy dependency is imported at startup or if the
+import takes longer than the given budget, so it can run in CI.
+
+Usage:
+
+    python benchmarks/startup.py [--module jupyterlab_translate.cli] [--max-ms 150]
+"""
+import argparse
+import subprocess
+import sys
+
+# Only the commands needing them should import these
+HEAVY_MODULES = (
+    "babel",
+    "cookiecutter",
+    "jinja2",
+    "pkg_resources",
+    "polib",
+    "requests",
+)
+
+
+def measure_imports(module):
+    """
+    Return the cumulative import time in microseconds of each module
+    imported by `import module` in a new interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--module", default="jupyterlab_translate.cli")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=150,
+        help="Maximum import time of the module in milliseconds",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep the best run, the others measure noise of the machine
+    runs = [measure_imports(args.module) for _ in range(args.repeat)]
+    times = min(runs, key=lambda run: run.get(args.module, 0))
+    total = times.get(args.module, 0) / 1000
+    print("Import time of `{}`: {:.1f} ms\n".format(args.module, total))
+    for name, value in sorted(times.items(), key=lambda item: -item[1])[:10]:
+        print("{:>10.1f} ms  {}".format(value / 1000, name))
+
+    errors = []
+    heavy = sorted(name for name in times if name in HEAVY_MODULES)
+    if heavy:
+        errors.append("Heavy modules imported at startup: {}".format(", ".join(heavy)))
+
+    if total > args.max_ms:
+        errors.append(
+            "Import time {:.1f} ms is over the budget of {:.1f} ms".format(
+                total, args.max_ms
+            )
+        )
+
+    for error in errors:
+        print("\nerror: {}".format(error))
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
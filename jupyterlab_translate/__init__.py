@@ -2,5 +2,6 @@
 # Distributed under the terms of the Modified BSD License.
 from .finder import get_installed_language_packs
 from .finder import get_language_pack
+from .finder import merge_data
 
 __version__ = "0.1.0-dev0"
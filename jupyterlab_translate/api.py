@@ -3,19 +3,31 @@
 """
 API interface.
 """
+import json
 import os
-import shutil
-
+import time
+from collections import OrderedDict
+
+from . import tracing
+from .build import BuildManifest
+from .build import plan_language_pack
+from .build import run_build
+from .constants import BUILD_MANIFEST
 from .constants import EXTENSIONS_FOLDER
 from .constants import JUPYTERLAB
 from .constants import LANG_PACKS_FOLDER
-from .converters import convert_catalog_to_json
-from .utils import check_locale
-from .utils import compile_to_mo
+from .locales import validate_locale
+from .parallel import shared_pool
 from .utils import compile_translations
 from .utils import create_new_language_pack
 from .utils import extract_translations
+from .utils import find_locales
+from .utils import get_language_pack_dir
 from .utils import update_translations
+from .watch import DEFAULT_INTERVAL
+from .watch import SourceWatcher
+from .writers import move_if_changed
+from .writers import report_write_stats
 
 
 def check_locales(locales):
@@ -30,8 +42,13 @@ def check_locales(locales):
         List of locales
     """
     for locale in locales:
-        if not check_locale(locale):
-            raise Exception("Invalid locale '{locale}'".format(locale=locale))
+        result = validate_locale(locale)
+        if not result.valid:
+            raise Exception(
+                "Invalid locale '{locale}': {error}".format(
+                    locale=locale, error=result.error
+                )
+            )
 
 
 def normalize_project(project):
@@ -46,13 +63,33 @@ def normalize_project(project):
     return project.lower().replace("-", "_")
 
 
-def extract_package(package_repo_dir, project):
+@tracing.traced(category=tracing.API)
+def extract_package(package_repo_dir, project, jobs=1, use_cache=True):
     """
     FIXME:
     """
+    project = normalize_project(project)
+    output_dir = os.path.join(package_repo_dir, project)
+
+    if not os.path.isdir(output_dir):
+        raise Exception(
+            "Output dir `{output_dir}` not found!".format(output_dir=output_dir)
+        )
+
+    write_stats = {}
+    extract_translations(
+        package_repo_dir,
+        output_dir,
+        project,
+        jobs=jobs,
+        use_cache=use_cache,
+        write_stats=write_stats,
+    )
+    report_write_stats(write_stats)
 
 
-def update_package(package_repo_dir, project, locales):
+@tracing.traced(category=tracing.API)
+def update_package(package_repo_dir, project, locales, jobs=1):
     """
     FIXME:
     """
@@ -67,10 +104,20 @@ def update_package(package_repo_dir, project, locales):
             "Output dir `{output_dir}` not found!".format(output_dir=output_dir)
         )
 
-    update_translations(package_repo_dir, output_dir, project, locales)
+    write_stats = {}
+    update_translations(
+        package_repo_dir,
+        output_dir,
+        project,
+        locales,
+        jobs=jobs,
+        write_stats=write_stats,
+    )
+    report_write_stats(write_stats)
 
 
-def compile_package(package_repo_dir, project, locales):
+@tracing.traced(category=tracing.API)
+def compile_package(package_repo_dir, project, locales, minify=False):
     """
     FIXME
     """
@@ -79,13 +126,17 @@ def compile_package(package_repo_dir, project, locales):
 
     project = normalize_project(project)
     output_dir = os.path.join(package_repo_dir, project)
-    po_paths = compile_translations(output_dir, project, locales)
-    for __, po_path in po_paths.items():
-        output_path = os.path.dirname(po_path)
-        convert_catalog_to_json(po_path, output_path, project)
+    write_stats = {}
+    compile_translations(
+        output_dir, project, locales, minify=minify, write_stats=write_stats
+    )
+    report_write_stats(write_stats)
 
 
-def extract_language_pack(package_repo_dir, language_packs_repo_dir, project):
+@tracing.traced(category=tracing.API)
+def extract_language_pack(
+    package_repo_dir, language_packs_repo_dir, project, jobs=1, use_cache=True
+):
     """
     FIXME:
     """
@@ -97,10 +148,22 @@ def extract_language_pack(package_repo_dir, language_packs_repo_dir, project):
         output_dir = os.path.join(language_packs_repo_dir, EXTENSIONS_FOLDER, project)
         os.makedirs(output_dir, exist_ok=True)
 
-    extract_translations(package_repo_dir, output_dir, project)
-
-
-def update_language_pack(package_repo_dir, language_packs_repo_dir, project, locales):
+    write_stats = {}
+    extract_translations(
+        package_repo_dir,
+        output_dir,
+        project,
+        jobs=jobs,
+        use_cache=use_cache,
+        write_stats=write_stats,
+    )
+    report_write_stats(write_stats)
+
+
+@tracing.traced(category=tracing.API)
+def update_language_pack(
+    package_repo_dir, language_packs_repo_dir, project, locales, jobs=1
+):
     """
     FIXME
     """
@@ -112,15 +175,23 @@ def update_language_pack(package_repo_dir, language_packs_repo_dir, project, loc
     if project == JUPYTERLAB:
         output_dir = os.path.join(language_packs_repo_dir, project)
     else:
-        output_dir = os.path.join(
-            language_packs_repo_dir, "jupyterlab_extensions", project
-        )
+        output_dir = os.path.join(language_packs_repo_dir, EXTENSIONS_FOLDER, project)
         os.makedirs(output_dir, exist_ok=True)
 
-    update_translations(package_repo_dir, output_dir, project, locales)
+    write_stats = {}
+    update_translations(
+        package_repo_dir,
+        output_dir,
+        project,
+        locales,
+        jobs=jobs,
+        write_stats=write_stats,
+    )
+    report_write_stats(write_stats)
 
 
-def compile_language_pack(language_packs_repo_dir, project, locales):
+@tracing.traced(category=tracing.API)
+def compile_language_pack(language_packs_repo_dir, project, locales, minify=False):
     """
     FIXME:
     """
@@ -135,36 +206,342 @@ def compile_language_pack(language_packs_repo_dir, project, locales):
     else:
         output_dir = os.path.join(language_packs_repo_dir, EXTENSIONS_FOLDER, project)
 
-    po_paths = compile_translations(output_dir, project, locales)
-    for locale, po_path in po_paths.items():
-        output_path = os.path.dirname(po_path)
-        json_path = convert_catalog_to_json(po_path, output_path, project)
-        mo_path = compile_to_mo(po_path)
-
+    # The compiled files are moved, only the language pack files are counted
+    write_stats = {}
+    compiled_paths = compile_translations(output_dir, project, locales, minify=minify)
+    for locale, (mo_path, json_path) in compiled_paths.items():
         # Move to language pack folder
-        language_packs_dir = os.path.join(language_packs_repo_dir, LANG_PACKS_FOLDER)
-        pkg_name = "jupyterlab-language-pack-{locale}".format(locale=locale).replace(
-            "_", "-"
-        )
-        locale_language_pack_dir = os.path.join(
-            language_packs_dir, pkg_name, pkg_name.replace("-", "_")
+        locale_language_pack_dir, output_dir = get_language_pack_dir(
+            language_packs_repo_dir, project, locale
         )
 
         # Check if it exists, otherwise create it
         if not os.path.isdir(locale_language_pack_dir):
-            create_new_language_pack(language_packs_dir, locale)
+            create_new_language_pack(
+                os.path.join(language_packs_repo_dir, LANG_PACKS_FOLDER), locale
+            )
+
+        for path in (mo_path, json_path):
+            move_if_changed(
+                path,
+                os.path.join(output_dir, os.path.basename(path)),
+                stats=write_stats,
+            )
+
+    report_write_stats(write_stats)
+
+
+@tracing.traced(category=tracing.API)
+def build_language_pack(
+    package_repo_dir,
+    language_packs_repo_dir,
+    project,
+    locales,
+    jobs=1,
+    minify=False,
+    dry_run=False,
+    write_stats=None,
+):
+    """
+    Extract, update, compile and publish the catalogs of a language pack,
+    only running the steps whose inputs changed since the last build.
+
+    Parameters
+    ----------
+    package_repo_dir: str
+        Path to the repository of the project.
+    language_packs_repo_dir: str
+        Path to the language packs repository.
+    project: str
+        Project name.
+    locales: sequence
+        Locales to build, by default the ones found in the catalogs folder.
+    jobs: int, optional
+        Number of worker processes.
+    minify: bool, optional
+        Write the JSON files without whitespace.
+    dry_run: bool, optional
+        Only print the steps that would run.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`. If
+        given, they are added to it instead of being reported.
+
+    Returns
+    -------
+    list
+        Names of the targets that ran, or would run.
+    """
+    if locales:
+        check_locales(locales)
+
+    project = normalize_project(project)
+
+    if project == JUPYTERLAB:
+        output_dir = os.path.join(language_packs_repo_dir, project)
+    else:
+        output_dir = os.path.join(language_packs_repo_dir, EXTENSIONS_FOLDER, project)
+
+    if not locales:
+        locales = find_locales(output_dir)
+
+    steps = plan_language_pack(
+        package_repo_dir,
+        language_packs_repo_dir,
+        output_dir,
+        project,
+        locales,
+        jobs=jobs,
+        minify=minify,
+    )
+    manifest = BuildManifest(os.path.join(output_dir, BUILD_MANIFEST))
+    report = write_stats is None
+    if report:
+        write_stats = {}
+
+    names = run_build(
+        steps, manifest, jobs=jobs, dry_run=dry_run, write_stats=write_stats
+    )
+    if report and not dry_run:
+        report_write_stats(write_stats)
+
+    return names
+
+
+@tracing.traced(category=tracing.API)
+def watch_language_pack(
+    package_repo_dir,
+    language_packs_repo_dir,
+    project,
+    locales=None,
+    jobs=1,
+    minify=False,
+    compile=False,
+    interval=DEFAULT_INTERVAL,
+):
+    """
+    Extract the strings of a project again each time its source files change.
+
+    The builds run in the same process until interrupted. The changed files
+    found by the watcher are the only ones read and extracted again, and the
+    `.pot` file is only written again if its entries change.
+
+    Parameters
+    ----------
+    package_repo_dir: str
+        Path to the repository of the project.
+    language_packs_repo_dir: str
+        Path to the language packs repository.
+    project: str
+        Project name.
+    locales: sequence, optional
+        Locales to update when `compile` is used, by default the ones found
+        in the catalogs folder.
+    jobs: int, optional
+        Number of worker processes.
+    minify: bool, optional
+        Write the JSON files without whitespace.
+    compile: bool, optional
+        Also update, compile and publish the catalogs of the locales.
+    interval: float, optional
+        Seconds between checks of the source files.
+    """
+    if locales:
+        check_locales(locales)
+
+    project = normalize_project(project)
+
+    if project == JUPYTERLAB:
+        output_dir = os.path.join(language_packs_repo_dir, project)
+    else:
+        output_dir = os.path.join(language_packs_repo_dir, EXTENSIONS_FOLDER, project)
+        os.makedirs(output_dir, exist_ok=True)
 
-        if project == JUPYTERLAB:
-            output_dir = os.path.join(locale_language_pack_dir)
+    watcher = SourceWatcher(package_repo_dir, project)
+    print("\n--- Watching {count} files\n".format(count=len(watcher.files)))
+    # Every file is read by the first build
+    changed = None
+    try:
+        with shared_pool(jobs):
+            while True:
+                start = time.time()
+                steps = plan_language_pack(
+                    package_repo_dir,
+                    language_packs_repo_dir,
+                    output_dir,
+                    project,
+                    (locales or find_locales(output_dir)) if compile else [],
+                    jobs=jobs,
+                    minify=minify,
+                    extraction_files=watcher.files,
+                    changed_files=changed,
+                    catalog_files=watcher.catalog_files,
+                )
+                write_stats = {}
+                try:
+                    run_build(
+                        steps,
+                        BuildManifest(os.path.join(output_dir, BUILD_MANIFEST)),
+                        jobs=jobs,
+                        write_stats=write_stats,
+                    )
+                except Exception as e:
+                    # Keep watching, the next change may fix the error
+                    print("error: {error}".format(error=e))
+                else:
+                    report_write_stats(write_stats)
+                    print(
+                        "Updated in {elapsed:.2f}s".format(elapsed=time.time() - start)
+                    )
+
+                print("Waiting for changes...")
+                changed = set(watcher.wait(interval))
+                print("\n--- {count} files changed\n".format(count=len(changed)))
+    except KeyboardInterrupt:
+        print("\nStopped watching `{project}`".format(project=project))
+
+
+def load_batch_manifest(manifest_path):
+    """
+    Load the projects of a batch manifest.
+
+    The manifest is a JSON file with a list of projects, each one given as a
+    `{"package_repo_dir": ..., "project": ...}` object or as a
+    `[package_repo_dir, project]` pair. It can also be an object with the
+    list in `projects` and the default `locales` of every project. Relative
+    paths are relative to the manifest folder.
+
+    Parameters
+    ----------
+    manifest_path: str
+        Path to the manifest file.
+
+    Returns
+    -------
+    tuple
+        List of `(package_repo_dir, project)` tuples and list of locales.
+    """
+    with open(manifest_path, "r") as fh:
+        data = json.load(fh)
+
+    locales = []
+    if isinstance(data, dict):
+        locales = data.get("locales", [])
+        data = data.get("projects", [])
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    projects = []
+    for item in data:
+        if isinstance(item, dict):
+            package_repo_dir, project = item["package_repo_dir"], item["project"]
         else:
-            output_dir = os.path.join(locale_language_pack_dir, EXTENSIONS_FOLDER)
+            package_repo_dir, project = item
 
-        shutil.rmtree(
-            os.path.join(output_dir, os.path.basename(mo_path)), ignore_errors=True
+        projects.append(
+            (os.path.join(base_dir, os.path.expanduser(package_repo_dir)), project)
         )
-        shutil.rmtree(
-            os.path.join(output_dir, os.path.basename(json_path)), ignore_errors=True
+
+    return projects, locales
+
+
+@tracing.traced(category=tracing.API)
+def batch_language_packs(
+    manifest_path,
+    language_packs_repo_dir,
+    locales=None,
+    jobs=1,
+    minify=False,
+    dry_run=False,
+):
+    """
+    Build the language packs of every project of a manifest in one process.
+
+    Projects are built like `build_language_pack`, sharing a single pool of
+    worker processes and the caches of the current process. A failing
+    project does not stop the others.
+
+    Parameters
+    ----------
+    manifest_path: str
+        Path to the manifest file, see `load_batch_manifest`.
+    language_packs_repo_dir: str
+        Path to the language packs repository.
+    locales: sequence, optional
+        Locales to build, by default the ones of the manifest or the ones
+        found for each project.
+    jobs: int, optional
+        Number of worker processes.
+    minify: bool, optional
+        Write the JSON files without whitespace.
+    dry_run: bool, optional
+        Only print the steps that would run.
+
+    Returns
+    -------
+    dict
+        Projects mapped to the names of the targets that ran, or would run.
+    """
+    projects, manifest_locales = load_batch_manifest(manifest_path)
+    locales = list(locales or manifest_locales)
+    if locales:
+        check_locales(locales)
+
+    write_stats = {}
+    results = OrderedDict()
+    errors = OrderedDict()
+    start = time.time()
+    with shared_pool(jobs):
+        for package_repo_dir, project in projects:
+            print("\n--- {project}\n".format(project=project))
+            project_start = time.time()
+            try:
+                if not os.path.isdir(package_repo_dir):
+                    raise Exception(
+                        "Package repository `{path}` not found!".format(
+                            path=package_repo_dir
+                        )
+                    )
+
+                results[project] = build_language_pack(
+                    package_repo_dir,
+                    language_packs_repo_dir,
+                    project,
+                    locales,
+                    jobs=jobs,
+                    minify=minify,
+                    dry_run=dry_run,
+                    write_stats=write_stats,
+                )
+            except Exception as e:
+                errors[project] = e
+                print("error: {project}: {error}".format(project=project, error=e))
+                continue
+
+            print(
+                "Built `{project}` in {elapsed:.2f}s".format(
+                    project=project, elapsed=time.time() - project_start
+                )
+            )
+
+    elapsed = time.time() - start
+    print(
+        "\nBuilt {count} of {total} projects in {elapsed:.2f}s "
+        "({rate:.2f} projects/s), {targets} targets {status}".format(
+            count=len(results),
+            total=len(projects),
+            elapsed=elapsed,
+            rate=len(results) / elapsed if elapsed else 0,
+            targets=sum(len(names) for names in results.values()),
+            status="would run" if dry_run else "ran",
+        )
+    )
+    if not dry_run:
+        report_write_stats(write_stats)
+
+    if errors:
+        raise Exception(
+            "Failed to build {projects}".format(
+                projects=", ".join("`{}`".format(project) for project in errors)
+            )
         )
 
-        shutil.move(mo_path, os.path.join(output_dir, os.path.basename(mo_path)))
-        shutil.move(json_path, os.path.join(output_dir, os.path.basename(json_path)))
+    return results
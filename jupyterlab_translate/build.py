@@ -0,0 +1,472 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Incremental builds of language packs.
+
+A language pack is built by these stages, each made of targets reading
+input files and writing output files:
+
+- extract: source files into the `.pot` template.
+- update: template into the `.po` catalog of each locale.
+- compile: `.po` catalog into the `.mo` file of the language pack package.
+- convert: `.po` catalog into the Jed `.json` file of the language pack
+  package.
+
+The compiled files are written straight into the language pack, like
+`compile-pack` leaves them, so nothing is left next to the catalogs.
+
+A manifest next to the catalogs records the content hash of the inputs and
+outputs of each target after it runs. Like `make`, a target only runs again
+if it never ran, its options changed, one of its files changed, or one of
+its inputs is rebuilt before it.
+"""
+import functools
+import json
+import os
+from collections import namedtuple
+
+from .constants import LANG_PACKS_FOLDER
+from .constants import LOCALE_FOLDER
+from .converters import convert_catalog_to_json
+from .merge import load_template
+from .parallel import parallel_map
+from .utils import create_new_language_pack
+from .utils import extract_translations
+from .utils import find_extraction_files
+from .utils import get_catalog_path
+from .utils import get_language_pack_dir
+from .utils import read_catalog
+from .utils import update_catalogs
+from .writers import get_content_hash
+from .writers import merge_write_stats
+from .writers import write_if_changed
+
+# Constants
+EXTRACT = "extract"
+UPDATE = "update"
+COMPILE = "compile"
+CONVERT = "convert"
+MANIFEST_VERSION = 2
+
+# Last file parsed by each loader in the current process, see `_load_cached`
+_parsed_files = {}
+
+Target = namedtuple("Target", ["name", "inputs", "outputs", "action", "params"])
+
+
+class BuildManifest:
+    """
+    Content hashes of the files and targets of previous builds.
+
+    Parameters
+    ----------
+    path: str
+        Path of the manifest file. Paths are stored relative to its folder,
+        so the manifest stays valid if the repositories are moved together.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.files = {}
+        self.targets = {}
+        self._hashes = {}
+
+        data = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as fh:
+                    data = json.load(fh)
+            except ValueError:
+                pass
+
+        if data.get("version") == MANIFEST_VERSION:
+            self.files = data.get("files", {})
+            self.targets = data.get("targets", {})
+
+    def relpath(self, path):
+        """
+        Return the key of a file in the manifest.
+        """
+        path = os.path.relpath(os.path.abspath(path), self.root)
+        return path.replace(os.sep, "/")
+
+    def get_hash(self, path):
+        """
+        Return the content hash of a file, or `None` if it is missing.
+
+        The hash recorded by a previous build is reused if the size and the
+        modification time of the file did not change.
+        """
+        key = self.relpath(path)
+        if key in self._hashes:
+            return self._hashes[key]
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.files.pop(key, None)
+            digest = None
+        else:
+            stamp = [stat.st_size, stat.st_mtime_ns]
+            record = self.files.get(key)
+            if record is not None and record[:2] == stamp:
+                digest = record[2]
+            else:
+                digest = get_content_hash(path)
+                self.files[key] = stamp + [digest]
+
+        self._hashes[key] = digest
+        return digest
+
+    def check(self, target):
+        """
+        Return why a target has to run, or `None` if it is up to date.
+        """
+        record = self.targets.get(target.name)
+        if record is None:
+            return "never built"
+
+        if record["params"] != target.params:
+            return "options changed"
+
+        inputs = {self.relpath(path): path for path in target.inputs}
+        if set(inputs) != set(record["inputs"]):
+            return "input files added or removed"
+
+        for key in sorted(inputs):
+            if self.get_hash(inputs[key]) != record["inputs"][key]:
+                return "`{key}` changed".format(key=key)
+
+        for path in target.outputs:
+            key = self.relpath(path)
+            digest = self.get_hash(path)
+            if digest is None:
+                return "`{key}` missing".format(key=key)
+
+            if digest != record["outputs"].get(key):
+                return "`{key}` changed".format(key=key)
+
+        return None
+
+    def record(self, target):
+        """
+        Record the files of a target that just ran.
+        """
+        for path in target.outputs:
+            self._hashes.pop(self.relpath(path), None)
+
+        self.targets[target.name] = {
+            "params": target.params,
+            "inputs": {
+                self.relpath(path): self.get_hash(path) for path in target.inputs
+            },
+            "outputs": {
+                self.relpath(path): self.get_hash(path) for path in target.outputs
+            },
+        }
+
+    def save(self):
+        """
+        Write the manifest, keeping only the files used by a target.
+        """
+        used = set()
+        for record in self.targets.values():
+            used.update(record["inputs"])
+            used.update(record["outputs"])
+
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {key: self.files[key] for key in used if key in self.files},
+            "targets": self.targets,
+        }
+        write_if_changed(self.path, json.dumps(data, indent=1, sort_keys=True))
+
+
+# --- Actions
+# ----------------------------------------------------------------------------
+def _load_cached(path, loader):
+    # Consecutive targets of a locale read the same files, keep the last one
+    stat = os.stat(path)
+    stamp = (path, stat.st_size, stat.st_mtime_ns)
+    cached = _parsed_files.get(loader)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, loader(path))
+        _parsed_files[loader] = cached
+
+    return cached[1]
+
+
+def _update(pot_path, locale_dir, locale, write_stats=None):
+    template = _load_cached(pot_path, load_template)
+    update_catalogs(
+        pot_path, locale_dir, locale, template=template, write_stats=write_stats
+    )
+
+
+def _prepare_output(po_path, output_path, language_pack):
+    language_packs_repo_dir, locale, locale_language_pack_dir = language_pack
+    if not os.path.isdir(locale_language_pack_dir):
+        create_new_language_pack(
+            os.path.join(language_packs_repo_dir, LANG_PACKS_FOLDER), locale
+        )
+
+    # Remove the file left next to the catalog by builds of older versions
+    extension = os.path.splitext(output_path)[-1]
+    old_path = os.path.splitext(po_path)[0] + extension
+    if os.path.isfile(old_path):
+        os.remove(old_path)
+
+
+def _compile(po_path, mo_path, language_pack, write_stats=None):
+    _prepare_output(po_path, mo_path, language_pack)
+    po = _load_cached(po_path, read_catalog)
+    write_if_changed(mo_path, po.to_binary(), stats=write_stats)
+
+
+def _convert(po_path, json_path, domain, minify, language_pack, write_stats=None):
+    _prepare_output(po_path, json_path, language_pack)
+    po = _load_cached(po_path, read_catalog)
+    # The published file only has the strings of the catalog, like the one
+    # moved by `compile-pack`
+    convert_catalog_to_json(
+        po_path,
+        os.path.dirname(json_path),
+        domain,
+        po=po,
+        minify=minify,
+        merge=False,
+        write_stats=write_stats,
+    )
+
+
+def _run_actions(actions):
+    write_stats = {}
+    for action in actions:
+        action(write_stats=write_stats)
+
+    return write_stats
+
+
+# --- Build
+# ----------------------------------------------------------------------------
+def plan_language_pack(
+    package_repo_dir,
+    language_packs_repo_dir,
+    output_dir,
+    project,
+    locales,
+    jobs=1,
+    minify=False,
+    extraction_files=None,
+    changed_files=None,
+    catalog_files=None,
+):
+    """
+    Return the targets to build the catalogs of a project in a language pack.
+
+    Parameters
+    ----------
+    package_repo_dir: str
+        Path to the repository of the project.
+    language_packs_repo_dir: str
+        Path to the language packs repository.
+    output_dir: str
+        Folder of the project catalogs in the language packs repository.
+    project: str
+        Normalized project name.
+    locales: sequence
+        Locales to build.
+    jobs: int, optional
+        Number of worker processes used to extract strings.
+    minify: bool, optional
+        Write the JSON files without whitespace.
+    extraction_files: list, optional
+        Files read by the extraction, see `find_extraction_files`. They are
+        found from `catalog_files`, or by walking the repository, if not
+        given.
+    changed_files: collection, optional
+        Files changed since the previous build in this process, only they
+        are extracted again, see `create_catalog`.
+    catalog_files: CatalogFiles, optional
+        Files to extract, see `find_catalog_files`. The repository is walked
+        again by the extraction if not given.
+
+    Returns
+    -------
+    list
+        Steps to run in order. Each step is a list of groups of targets, the
+        groups of a step are independent and their targets run in order.
+    """
+    locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
+    pot_path = os.path.join(locale_dir, "{project}.pot".format(project=project))
+    if extraction_files is None:
+        extraction_files = find_extraction_files(
+            package_repo_dir, project, catalog_files=catalog_files
+        )
+
+    extract = Target(
+        name=EXTRACT,
+        inputs=extraction_files,
+        outputs=[pot_path],
+        action=functools.partial(
+            extract_translations,
+            package_repo_dir,
+            output_dir,
+            project,
+            jobs=jobs,
+            changed_files=changed_files,
+            catalog_files=catalog_files,
+        ),
+        params={"project": project},
+    )
+
+    groups = []
+    for locale in locales:
+        po_path = get_catalog_path(locale_dir, project, locale)
+        locale_language_pack_dir, pack_dir = get_language_pack_dir(
+            language_packs_repo_dir, project, locale
+        )
+        mo_path = os.path.join(pack_dir, "{project}.mo".format(project=project))
+        json_path = os.path.join(pack_dir, "{project}.json".format(project=project))
+        language_pack = (language_packs_repo_dir, locale, locale_language_pack_dir)
+        groups.append(
+            [
+                Target(
+                    name="{stage}:{locale}".format(stage=UPDATE, locale=locale),
+                    inputs=[pot_path],
+                    outputs=[po_path],
+                    action=functools.partial(_update, pot_path, locale_dir, locale),
+                    params={},
+                ),
+                Target(
+                    name="{stage}:{locale}".format(stage=COMPILE, locale=locale),
+                    inputs=[po_path],
+                    outputs=[mo_path],
+                    action=functools.partial(_compile, po_path, mo_path, language_pack),
+                    params={},
+                ),
+                Target(
+                    name="{stage}:{locale}".format(stage=CONVERT, locale=locale),
+                    inputs=[po_path],
+                    outputs=[json_path],
+                    action=functools.partial(
+                        _convert, po_path, json_path, project, minify, language_pack
+                    ),
+                    params={"minify": minify},
+                ),
+            ]
+        )
+
+    return [[[extract]], groups]
+
+
+def get_stale_targets(manifest, targets, pending=None):
+    """
+    Return the targets that have to run, in order.
+
+    Parameters
+    ----------
+    manifest: BuildManifest
+        Manifest of the previous builds.
+    targets: list
+        Targets in the order they run.
+    pending: set, optional
+        Paths written by targets running before these ones, it is updated
+        with the outputs of the stale targets.
+
+    Returns
+    -------
+    list
+        List of `(target, reason)` tuples.
+    """
+    pending = set() if pending is None else pending
+    stale = []
+    for target in targets:
+        reason = manifest.check(target)
+        if reason is None:
+            for path in target.inputs:
+                if path in pending:
+                    reason = "`{key}` is rebuilt".format(key=manifest.relpath(path))
+                    break
+
+        if reason is not None:
+            stale.append((target, reason))
+            pending.update(target.outputs)
+
+    return stale
+
+
+def run_build(steps, manifest, jobs=1, dry_run=False, write_stats=None):
+    """
+    Run the stale targets of a build and record them in the manifest.
+
+    The files are checked again after each step, so a step writing the same
+    content as before does not trigger the next ones.
+
+    Parameters
+    ----------
+    steps: list
+        Steps of the build, see `plan_language_pack`.
+    manifest: BuildManifest
+        Manifest of the previous builds, saved after each step.
+    jobs: int, optional
+        Number of worker processes, groups of a step run in parallel.
+    dry_run: bool, optional
+        Only print the targets that would run.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+
+    Returns
+    -------
+    list
+        Names of the targets that ran, or would run.
+    """
+    # Without running the targets, their outputs have to be assumed changed
+    pending = set() if dry_run else None
+    names = []
+    total = 0
+    for groups in steps:
+        stale_groups = []
+        for group in groups:
+            total += len(group)
+            stale = get_stale_targets(manifest, group, pending=pending)
+            for target, reason in stale:
+                names.append(target.name)
+                print(
+                    "{action} `{name}`: {reason}".format(
+                        action="Would run" if dry_run else "Running",
+                        name=target.name,
+                        reason=reason,
+                    )
+                )
+
+            if stale:
+                stale_groups.append([target for (target, _reason) in stale])
+
+        if dry_run or not stale_groups:
+            continue
+
+        results = parallel_map(
+            _run_actions,
+            [[target.action for target in group] for group in stale_groups],
+            jobs=jobs,
+        )
+        for group, group_write_stats in zip(stale_groups, results):
+            if write_stats is not None:
+                merge_write_stats(write_stats, group_write_stats)
+
+            for target in group:
+                manifest.record(target)
+
+        manifest.save()
+
+    print(
+        "\n{count} of {total} targets {status}, {uptodate} up to date\n".format(
+            count=len(names),
+            total=total,
+            status="would run" if dry_run else "ran",
+            uptodate=total - len(names),
+        )
+    )
+    return names
@@ -0,0 +1,220 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Compact in memory catalog used from extraction to the final `.pot` file.
+"""
+import sys
+
+import polib
+
+# Constants
+# Do not add column wrapping by using a large value!
+WRAPWIDTH = 100000
+
+# Text of the entries of the last serialized catalog, see `Catalog.iter_text`
+_text_cache = {}
+
+
+def make_occurrence(path, line):
+    """
+    Create an occurrence tuple with an interned path and an integer line.
+
+    Parameters
+    ----------
+    path: str
+        Source file path.
+    line: int or str
+        Line number, an empty string or `None` when unknown.
+
+    Returns
+    -------
+    tuple
+        `(path, line)` where line is an `int` or `None`.
+    """
+    if line is None or line == "":
+        line = None
+    else:
+        line = int(line)
+
+    return sys.intern(path), line
+
+
+class CatalogEntry:
+    """
+    Extracted message.
+
+    Parameters
+    ----------
+    msgid: str
+        Message text.
+    msgid_plural: str, optional
+        Plural message text.
+    msgctxt: str, optional
+        Message context.
+    occurrences: list, optional
+        List of `(path, line)` tuples, see `make_occurrence`.
+    comment: str, optional
+        Extracted comment.
+    flags: list, optional
+        Message flags, like `python-format`.
+    num_plurals: int, optional
+        Number of plural forms of the template, used for plural messages.
+    """
+
+    __slots__ = (
+        "msgid",
+        "msgid_plural",
+        "msgctxt",
+        "occurrences",
+        "comment",
+        "flags",
+        "num_plurals",
+    )
+
+    def __init__(
+        self,
+        msgid,
+        msgid_plural="",
+        msgctxt=None,
+        occurrences=None,
+        comment="",
+        flags=None,
+        num_plurals=2,
+    ):
+        self.msgid = msgid
+        self.msgid_plural = msgid_plural
+        self.msgctxt = msgctxt
+        self.occurrences = [] if occurrences is None else occurrences
+        self.comment = comment
+        self.flags = [] if flags is None else flags
+        self.num_plurals = num_plurals
+
+    def __repr__(self):
+        return "<CatalogEntry msgctxt={!r} msgid={!r}>".format(self.msgctxt, self.msgid)
+
+    @classmethod
+    def from_poentry(cls, entry):
+        """
+        Create an entry from a `polib.POEntry`.
+        """
+        return cls(
+            entry.msgid,
+            msgid_plural=entry.msgid_plural,
+            msgctxt=entry.msgctxt,
+            occurrences=[
+                make_occurrence(path, line) for (path, line) in entry.occurrences
+            ],
+            comment=entry.comment,
+            flags=list(entry.flags),
+            num_plurals=len(entry.msgstr_plural) or 2,
+        )
+
+    def sort_key(self):
+        """
+        Return the occurrences as `(path, line)` strings.
+
+        Line numbers are compared as strings, as they were when the entries
+        were polib objects, so the order of the `.pot` file does not change.
+        """
+        return [
+            (path, "" if line is None else str(line))
+            for (path, line) in self.occurrences
+        ]
+
+    def text_key(self):
+        """
+        Return a hashable key of everything written for the entry.
+        """
+        return (
+            self.msgid,
+            self.msgid_plural,
+            self.msgctxt,
+            tuple(self.occurrences),
+            self.comment,
+            tuple(self.flags),
+            self.num_plurals if self.msgid_plural else None,
+        )
+
+    def to_poentry(self):
+        """
+        Create the equivalent `polib.POEntry`.
+        """
+        kwargs = {}
+        if self.msgid_plural:
+            kwargs["msgid_plural"] = self.msgid_plural
+            kwargs["msgstr_plural"] = {idx: "" for idx in range(self.num_plurals)}
+
+        return polib.POEntry(
+            msgid=self.msgid,
+            msgctxt=self.msgctxt,
+            occurrences=self.sort_key(),
+            comment=self.comment,
+            flags=self.flags,
+            **kwargs
+        )
+
+
+class Catalog:
+    """
+    List of `CatalogEntry` with the catalog metadata.
+
+    Parameters
+    ----------
+    metadata: dict, optional
+        Catalog headers.
+    entries: list, optional
+        List of `CatalogEntry`.
+    """
+
+    def __init__(self, metadata=None, entries=None):
+        self.metadata = {} if metadata is None else metadata
+        self.entries = [] if entries is None else entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def append(self, entry):
+        self.entries.append(entry)
+
+    @classmethod
+    def from_pofile(cls, po):
+        """
+        Create a catalog from a `polib.POFile`.
+        """
+        return cls(
+            metadata=po.metadata.copy(),
+            entries=[CatalogEntry.from_poentry(entry) for entry in po],
+        )
+
+    def iter_text(self):
+        """
+        Serialize the catalog in the `.po` format, one entry at a time.
+
+        Yields
+        ------
+        str
+            Header and metadata followed by each entry, joined they are the
+            same text `polib` would write for the catalog.
+        """
+        global _text_cache
+
+        po = polib.POFile(wrapwidth=WRAPWIDTH)
+        po.metadata = self.metadata
+        yield str(po)
+
+        # Reuse the text of the entries that did not change since the last
+        # catalog serialized by this process, like when watching for changes
+        text_cache = {}
+        for entry in self.entries:
+            key = entry.text_key()
+            text = _text_cache.get(key)
+            if text is None:
+                text = entry.to_poentry().__unicode__(WRAPWIDTH)
+
+            text_cache[key] = text
+            yield "\n" + text
+
+        _text_cache = text_cache
@@ -5,12 +5,8 @@ Command line interface.
 """
 import click
 
-from .api import compile_language_pack
-from .api import compile_package
-from .api import extract_language_pack
-from .api import extract_package
-from .api import update_language_pack
-from .api import update_package
+# The api is imported by each command, so that the help and the startup time
+# do not pay for loading babel, polib and cookiecutter
 
 # --- Common arguments
 # ----------------------------------------------------------------------------
@@ -26,6 +22,31 @@ project_arg = click.argument("project")
 locales_opt = click.option(
     "--locales", "-l", default=None, multiple=True, help="Locale languages to use"
 )
+dry_run_opt = click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Only list the steps that would run",
+)
+jobs_opt = click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Number of worker processes, 0 uses all available cores",
+)
+minify_opt = click.option(
+    "--minify",
+    is_flag=True,
+    default=False,
+    help="Write the JSON catalogs without whitespace",
+)
+no_cache_opt = click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Extract all source files instead of only the changed ones",
+)
 
 
 @click.group(
@@ -36,8 +57,47 @@ locales_opt = click.option(
         "or provide localization files in the extension package."
     )
 )
-def main():
-    pass
+@click.option(
+    "--profile",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help=(
+        "Time each stage and save the trace to this file, in the Chrome trace "
+        "event format"
+    ),
+)
+@click.pass_context
+def main(ctx, profile):
+    if profile:
+        from . import tracing
+
+        tracing.enable()
+        ctx.call_on_close(lambda: save_profile(profile))
+
+
+def save_profile(path):
+    """
+    Save the trace of the command and print the time of each stage.
+    """
+    from . import tracing
+
+    tracing.save_trace(path)
+    click.echo("\nProfile saved to `{path}`\n".format(path=path), err=True)
+    for name, item in tracing.get_summary().items():
+        details = ", ".join(
+            "{key}={value:g}".format(key=key, value=round(value, 1))
+            for (key, value) in sorted(item.items())
+            if key not in ("calls", "wall_ms")
+        )
+        click.echo(
+            "{wall_ms:>10.1f} ms {calls:>5}x  {name}  {details}".format(
+                wall_ms=item["wall_ms"],
+                calls=item["calls"],
+                name=name,
+                details=details,
+            ).rstrip(),
+            err=True,
+        )
 
 
 # --- Localization for standalone packages
@@ -47,9 +107,13 @@ def main():
 )
 @package_repo_dir_arg
 @project_arg
-def extract(package_repo_dir, project):
-    click.echo("Updating for stand alone package")
-    extract_package(package_repo_dir, project)
+@jobs_opt
+@no_cache_opt
+def extract(package_repo_dir, project, jobs, no_cache):
+    from .api import extract_package
+
+    click.echo("Extracting for stand alone package")
+    extract_package(package_repo_dir, project, jobs=jobs, use_cache=not no_cache)
 
 
 @main.command(
@@ -58,18 +122,24 @@ def extract(package_repo_dir, project):
 @package_repo_dir_arg
 @project_arg
 @locales_opt
-def update(package_repo_dir, project, locales):
+@jobs_opt
+def update(package_repo_dir, project, locales, jobs):
+    from .api import update_package
+
     click.echo("Updating for stand alone package")
-    update_package(package_repo_dir, project, locales)
+    update_package(package_repo_dir, project, locales, jobs=jobs)
 
 
 @main.command(help=("Compile catalogs for a Jupyterlab extension."))
 @package_repo_dir_arg
 @project_arg
 @locales_opt
-def compile(package_repo_dir, project, locales):
+@minify_opt
+def compile(package_repo_dir, project, locales, minify):
+    from .api import compile_package
+
     click.echo("Compiling for stand alone package")
-    compile_package(package_repo_dir, project, locales)
+    compile_package(package_repo_dir, project, locales, minify=minify)
 
 
 # --- Localization for language packs
@@ -82,9 +152,19 @@ def compile(package_repo_dir, project, locales):
 @package_repo_dir_arg
 @lang_packs_repo_dir_arg
 @project_arg
-def extract_pack(package_repo_dir, language_packs_repo_dir, project):
+@jobs_opt
+@no_cache_opt
+def extract_pack(package_repo_dir, language_packs_repo_dir, project, jobs, no_cache):
+    from .api import extract_language_pack
+
     click.echo("Extracting for language pack")
-    extract_language_pack(package_repo_dir, language_packs_repo_dir, project)
+    extract_language_pack(
+        package_repo_dir,
+        language_packs_repo_dir,
+        project,
+        jobs=jobs,
+        use_cache=not no_cache,
+    )
 
 
 @main.command(
@@ -96,19 +176,134 @@ def extract_pack(package_repo_dir, language_packs_repo_dir, project):
 @lang_packs_repo_dir_arg
 @project_arg
 @locales_opt
-def update_pack(package_repo_dir, language_packs_repo_dir, project, locales):
+@jobs_opt
+def update_pack(package_repo_dir, language_packs_repo_dir, project, locales, jobs):
+    from .api import update_language_pack
+
     click.echo("Updating for language pack")
-    update_language_pack(package_repo_dir, language_packs_repo_dir, project, locales)
+    update_language_pack(
+        package_repo_dir, language_packs_repo_dir, project, locales, jobs=jobs
+    )
 
 
 @main.command(help=("Compile catalogs for a jupyterlab-language-pack."))
 @lang_packs_repo_dir_arg
 @project_arg
 @locales_opt
-def compile_pack(language_packs_repo_dir, project, locales):
+@minify_opt
+def compile_pack(language_packs_repo_dir, project, locales, minify):
+    from .api import compile_language_pack
+
     click.echo("Compiling for Jupyterlab Language Pack")
 
-    compile_language_pack(language_packs_repo_dir, project, locales)
+    compile_language_pack(language_packs_repo_dir, project, locales, minify=minify)
+
+
+@main.command(
+    help=(
+        "Extract, update, compile and publish the catalogs of a "
+        "jupyterlab-language-pack, only rebuilding what changed since the "
+        "last build."
+    )
+)
+@package_repo_dir_arg
+@lang_packs_repo_dir_arg
+@project_arg
+@locales_opt
+@jobs_opt
+@minify_opt
+@dry_run_opt
+def build(
+    package_repo_dir, language_packs_repo_dir, project, locales, jobs, minify, dry_run
+):
+    from .api import build_language_pack
+
+    click.echo("Building language pack")
+    build_language_pack(
+        package_repo_dir,
+        language_packs_repo_dir,
+        project,
+        locales,
+        jobs=jobs,
+        minify=minify,
+        dry_run=dry_run,
+    )
+
+
+@main.command(
+    help=(
+        "Build the jupyterlab-language-packs catalogs of every project listed in "
+        "a JSON manifest of package repository and project pairs, in one process."
+    )
+)
+@click.argument("manifest_path", type=click.Path(exists=True, dir_okay=False))
+@lang_packs_repo_dir_arg
+@locales_opt
+@jobs_opt
+@minify_opt
+@dry_run_opt
+def batch(manifest_path, language_packs_repo_dir, locales, jobs, minify, dry_run):
+    from .api import batch_language_packs
+
+    click.echo("Building language packs in batch")
+    batch_language_packs(
+        manifest_path,
+        language_packs_repo_dir,
+        locales,
+        jobs=jobs,
+        minify=minify,
+        dry_run=dry_run,
+    )
+
+
+@main.command(
+    help=(
+        "Extract the strings of a jupyterlab-language-pack project each time "
+        "its source files change, until interrupted."
+    )
+)
+@package_repo_dir_arg
+@lang_packs_repo_dir_arg
+@project_arg
+@locales_opt
+@jobs_opt
+@minify_opt
+@click.option(
+    "--compile",
+    "compile_",
+    is_flag=True,
+    default=False,
+    help="Also update, compile and publish the catalogs of the locales",
+)
+@click.option(
+    "--interval",
+    default=0.25,
+    type=click.FloatRange(min=0),
+    help="Seconds between checks of the source files",
+)
+def watch(
+    package_repo_dir,
+    language_packs_repo_dir,
+    project,
+    locales,
+    jobs,
+    minify,
+    compile_,
+    interval,
+):
+    from .api import watch_language_pack
+
+    click.echo("Watching language pack sources, press Ctrl+C to stop")
+    watch_language_pack(
+        package_repo_dir,
+        language_packs_repo_dir,
+        project,
+        locales,
+        jobs=jobs,
+        minify=minify,
+        compile=compile_,
+        interval=interval,
+    )
 
 
 # Rinse and repeat
@@ -4,10 +4,13 @@
 Constants
 """
 
+BUILD_MANIFEST = ".build-manifest.json"
 COOKIECUTTER_URL = "https://github.com/goanpeca/jupyterlab-language-pack-cookiecutter"
 EXTENSIONS_FOLDER = "extensions"
+EXTRACTION_CACHE = ".extraction-cache.json"
 JUPYTERLAB = "jupyterlab"
 LANG_PACKS_FOLDER = "language-packs"
 LC_MESSAGES = "LC_MESSAGES"
 LOCALE_FOLDER = "locale"
+PACKAGES_FOLDER = "packages"
 TRANSLATIONS_FOLDER = "translations"
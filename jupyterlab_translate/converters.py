@@ -6,11 +6,138 @@ import os
 
 import polib
 
+from . import tracing
+from .writers import open_if_changed
 
-def convert_catalog_to_json(po_path, output_dir, project):
+
+def iter_json(data, indent=4):
+    """
+    Encode a dictionary as JSON with sorted keys, one top level key at a time.
+
+    Joined, the chunks are the same text as
+    `json.dumps(data, sort_keys=True, indent=indent)`. With `indent=None`
+    the output is minified, without any whitespace.
+
+    Parameters
+    ----------
+    data: dict
+        Dictionary to encode.
+    indent: int or None, optional
+        Number of spaces used for indentation, or `None` to minify.
+
+    Yields
+    ------
+    str
+        JSON text chunks.
+    """
+    return iter_json_items(sorted(data.items()), indent=indent)
+
+
+def iter_json_items(items, indent=4):
+    """
+    Encode `(key, value)` pairs as a JSON object, one pair at a time.
+
+    The pairs are consumed lazily, so the values can be built while the
+    output is written, see `iter_json`.
+
+    Parameters
+    ----------
+    items: iterable
+        Pairs of the object, sorted by key.
+    indent: int or None, optional
+        Number of spaces used for indentation, or `None` to minify.
+
+    Yields
+    ------
+    str
+        JSON text chunks.
+    """
+    if indent is None:
+        separators = (",", ":")
+        newline = prefix = ""
+    else:
+        separators = (",", ": ")
+        newline = "\n"
+        prefix = " " * indent
+
+    start = "{" + newline
+    for key, value in items:
+        value = json.dumps(value, sort_keys=True, indent=indent, separators=separators)
+        yield "{start}{prefix}{key}{separator}{value}".format(
+            start=start,
+            prefix=prefix,
+            key=json.dumps(key),
+            separator=separators[1],
+            value=value.replace("\n", "\n" + prefix),
+        )
+        start = separators[0] + newline
+
+    yield "{}" if start.startswith("{") else newline + "}"
+
+
+def get_nplurals(po):
+    """
+    Return the number of plural forms of a catalog.
+
+    Parameters
+    ----------
+    po: polib.POFile
+        FIXME:
+
+    Returns
+    -------
+    int
+        Value of `nplurals` in the `Plural-Forms` header.
+    """
+    nplurals_string = po.metadata["Plural-Forms"].split(";")[0]
+    return ast.literal_eval(nplurals_string.replace("nplurals=", "").strip())
+
+
+def get_entry_value(entry, nplurals):
+    """
+    Return the Jed value of a catalog entry.
+
+    Parameters
+    ----------
+    entry: polib.POEntry
+        Catalog entry.
+    nplurals: int
+        Number of plural forms of the catalog, see `get_nplurals`.
+
+    Returns
+    -------
+    list or None
+        Translations, preceded by the plural text for plural entries, or
+        `None` if the entry is not translated.
+    """
+    if entry.msgstr:
+        return [entry.msgstr]
+
+    if not entry.msgstr_plural:
+        return None
+
+    plural = [entry.msgid_plural]
+    for __, msgstr in sorted(entry.msgstr_plural.items()):
+        plural.append(msgstr)
+
+    # If language has nplurals=1, then add the same translation
+    if nplurals == 1:
+        plural[0] = plural[-1]
+
+    return plural
+
+
+@tracing.traced()
+def convert_catalog_to_json(
+    po_path, output_dir, project, po=None, minify=False, merge=True, write_stats=None
+):
     """
     Convert the `.po` format to Jed json format merging any existing json files.
 
+    The value of each entry is built from the catalog while the file is
+    written, only the keys are sorted beforehand. The existing JSON file is
+    loaded whole when merging.
+
     Parameters
     ----------
     po_path: str
@@ -19,6 +146,16 @@ def convert_catalog_to_json(po_path, output_dir, project):
         FIXME:
     project: str
         FIXME:
+    po: polib.POFile, optional
+        Catalog already parsed from `po_path`.
+    minify: bool, optional
+        Write the JSON without whitespace, for production bundles. By default
+        it is indented to make changes easy to review.
+    merge: bool, optional
+        Keep the strings of an existing JSON file that are missing from the
+        catalog. Use `False` to only write the strings of the catalog.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
 
     Returns
     -------
@@ -28,31 +165,32 @@ def convert_catalog_to_json(po_path, output_dir, project):
     json_name = os.path.basename(po_path).replace(".po", ".json")
     json_path = os.path.join(output_dir, json_name)
 
-    # Do not add column wrapping by using a large value!
-    po = polib.pofile(po_path, wrapwidth=100000)
+    if po is None:
+        # Do not add column wrapping by using a large value!
+        po = polib.pofile(po_path, wrapwidth=100000)
 
     # Add metadata
-    result = {
-        "": {
-            "domain": project,
-            "version": po.metadata["Project-Id-Version"].split(" ")[-1],
-            "language": po.metadata["Language"].replace("_", "-"),
-            "plural_forms": po.metadata["Plural-Forms"],
-        }
+    metadata = {
+        "domain": project,
+        "version": po.metadata["Project-Id-Version"].split(" ")[-1],
+        "language": po.metadata["Language"].replace("_", "-"),
+        "plural_forms": po.metadata["Plural-Forms"],
     }
 
-    nplurals_string = po.metadata["Plural-Forms"].split(";")[0]
-    nplurals = ast.literal_eval(nplurals_string.replace("nplurals=", ""))
+    nplurals = get_nplurals(po)
     # Load existing file in case some old strings need to remain
-    if os.path.isfile(json_path):
+    old_data = {}
+    if merge and os.path.isfile(json_path):
         with open(json_path, "r") as fh:
-            data = json.load(fh)
+            old_data = json.load(fh)
 
-        data.pop("")  # Remove old metadata
-        result.update(data)
+        old_data.pop("")  # Remove old metadata
 
+    # Entries without translations keep the old value, the last entry of a
+    # key wins
+    entries = {}
     for entry in po:
-        if entry.obsolete:
+        if entry.obsolete or not (entry.msgstr or entry.msgstr_plural):
             continue
 
         if entry.msgctxt:
@@ -60,23 +198,22 @@ def convert_catalog_to_json(po_path, output_dir, project):
         else:
             key = entry.msgid
 
-        if entry.msgstr:
-            # result[key] = [None, entry.msgstr]
-            result[key] = [entry.msgstr]
-        elif entry.msgstr_plural:
-            plural = [entry.msgid_plural]
-
-            result[key] = plural
-            ordered_plural = sorted(entry.msgstr_plural.items())
+        entries[key] = entry
 
-            for __, msgstr in ordered_plural:
-                plural.append(msgstr)
+    keys = sorted(entries.keys() | old_data.keys() if old_data else entries)
 
-            # If language has nplurals=1, then add the same translation
-            if nplurals == 1:
-                plural[0] = plural[-1]
+    def iter_items():
+        yield "", metadata
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None:
+                yield key, old_data[key]
+            else:
+                yield key, get_entry_value(entry, nplurals)
 
-    with open(json_path, "w") as fh:
-        fh.write(json.dumps(result, sort_keys=True, indent=4 * " "))
+    tracing.set_args(entries=len(keys))
+    with open_if_changed(json_path, stats=write_stats) as fh:
+        for chunk in iter_json_items(iter_items(), indent=None if minify else 4):
+            fh.write(chunk)
 
     return json_path
@@ -0,0 +1,595 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+In-process string extractors.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from functools import partial
+
+import babel
+from babel.messages import frontend
+from babel.messages.catalog import Catalog
+from babel.messages.extract import check_and_call_extract_file
+from babel.messages.extract import DEFAULT_KEYWORDS
+
+from . import tracing
+from .catalog import CatalogEntry
+from .catalog import make_occurrence
+from .parallel import parallel_map
+from .typescript import extract_typescript
+from .writers import open_if_changed
+from .writers import record_write
+
+# Constants
+HERE = os.path.abspath(os.path.dirname(__file__))
+MAPPING_PATH = os.path.join(HERE, "pybabel_config.cfg")
+DEFAULT_BATCH_SIZE = 250
+# Bump when the format of cached extraction results changes
+CACHE_VERSION = 2
+BABEL = "babel"
+TYPESCRIPT = "typescript"
+
+# Caches loaded or saved by the current process, by path. Each item is the
+# `(stamp, key, hashes, cache)` of the file, see `load_extraction_cache`
+_loaded_caches = {}
+# Hashes of the files read by the current process, by path, see
+# `extract_cached`
+_file_hashes = {}
+
+
+def load_mapping(mapping_path=MAPPING_PATH):
+    """
+    Load a babel extraction method mapping file.
+
+    Parameters
+    ----------
+    mapping_path: str
+        Path to the `pybabel` mapping configuration file.
+
+    Returns
+    -------
+    tuple
+        The `(method_map, options_map)` pair used by babel extractors.
+    """
+    # `parse_mapping` was renamed `parse_mapping_cfg` in babel 2.14
+    parse_mapping = getattr(frontend, "parse_mapping_cfg", None)
+    if parse_mapping is None:
+        parse_mapping = frontend.parse_mapping
+
+    with open(mapping_path, "r") as fh:
+        return parse_mapping(fh, filename=mapping_path)
+
+
+def get_file_hash(path):
+    """
+    Return a content hash for the source file in `path`.
+
+    The file suffix is part of the hash, as it selects the extraction method.
+    """
+    digest = hashlib.sha256(os.path.splitext(path)[-1].encode("utf-8"))
+    with open(path, "rb") as fh:
+        digest.update(fh.read())
+
+    return digest.hexdigest()
+
+
+def get_cache_key(mapping_path=MAPPING_PATH):
+    """
+    Return a key identifying the extraction setup cached results depend on.
+    """
+    digest = hashlib.sha256()
+    with open(mapping_path, "rb") as fh:
+        digest.update(fh.read())
+
+    return "{version}-{babel_version}-{mapping}".format(
+        version=CACHE_VERSION,
+        babel_version=babel.__version__,
+        mapping=digest.hexdigest(),
+    )
+
+
+def _get_cache_stamp(cache_path):
+    try:
+        stat = os.stat(cache_path)
+    except OSError:
+        return None
+
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _get_cache_hashes(cache):
+    return {name: frozenset(results) for name, results in cache.items()}
+
+
+def load_extraction_cache(cache_path, mapping_path=MAPPING_PATH):
+    """
+    Load cached extraction results.
+
+    Parameters
+    ----------
+    cache_path: str or None
+        Path to the cache file. If `None` an empty cache is returned.
+    mapping_path: str
+        Path to the `pybabel` mapping configuration file.
+
+    Returns
+    -------
+    dict
+        Mapping of each extractor name ("babel" and "typescript") to a
+        mapping of file hashes to extraction results. Results are dropped if
+        the cache was created with a different setup. The same object is
+        returned while the file is not modified by other processes.
+    """
+    cache = {BABEL: {}, TYPESCRIPT: {}}
+    if cache_path is None:
+        return cache
+
+    key = get_cache_key(mapping_path)
+    loaded = _loaded_caches.get(cache_path)
+    if loaded is not None:
+        stamp, loaded_key, _hashes, loaded_cache = loaded
+        if stamp == _get_cache_stamp(cache_path) and loaded_key == key:
+            return loaded_cache
+
+    try:
+        with open(cache_path, "r") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return cache
+
+    if data.get("key") != key:
+        return cache
+
+    files = data.get("files", {})
+    for file_hash, messages in files.get(BABEL, {}).items():
+        # JSON turns the tuples used for plural messages into lists
+        cache[BABEL][file_hash] = [
+            (
+                lineno,
+                tuple(message) if isinstance(message, list) else message,
+                comments,
+                context,
+            )
+            for lineno, message, comments, context in messages
+        ]
+
+    cache[TYPESCRIPT].update(files.get(TYPESCRIPT, {}))
+    _loaded_caches[cache_path] = (
+        _get_cache_stamp(cache_path),
+        key,
+        _get_cache_hashes(cache),
+        cache,
+    )
+    return cache
+
+
+def save_extraction_cache(
+    cache_path, cache, mapping_path=MAPPING_PATH, write_stats=None
+):
+    """
+    Save extraction results, see `load_extraction_cache`.
+
+    Results are keyed by file hash and never modified, so the file is not
+    serialized again if it holds the same hashes since this process loaded
+    or saved it.
+    """
+    key = get_cache_key(mapping_path)
+    hashes = _get_cache_hashes(cache)
+    loaded = _loaded_caches.get(cache_path)
+    if (
+        loaded is not None
+        and loaded[0] == _get_cache_stamp(cache_path)
+        and loaded[1:3] == (key, hashes)
+    ):
+        record_write(write_stats, False)
+        return
+
+    data = {"key": key, "files": cache}
+    with open_if_changed(cache_path, stats=write_stats) as fh:
+        json.dump(data, fh, separators=(",", ":"))
+
+    _loaded_caches[cache_path] = (_get_cache_stamp(cache_path), key, hashes, cache)
+
+
+def iter_batches(items, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Split `items` into consecutive lists of at most `batch_size` elements.
+    """
+    for idx in range(0, len(items), batch_size):
+        yield items[idx : idx + batch_size]
+
+
+def extract_file_strings(path, method_map, options_map, dirpath=None):
+    """
+    Extract localizable strings from a single source file.
+
+    Parameters
+    ----------
+    path: str
+        Path to source file.
+    method_map: list
+        List of `(pattern, method)` tuples.
+    options_map: dict
+        Options for each extraction method pattern.
+    dirpath: str, optional
+        Directory patterns are matched against. Defaults to the current
+        working directory, as `pybabel extract` does for file arguments.
+
+    Returns
+    -------
+    list
+        List of `(lineno, message, comments, context)` tuples.
+    """
+    if dirpath is None:
+        dirpath = os.getcwd()
+
+    return [
+        (lineno, message, comments, context)
+        for __, lineno, message, comments, context in check_and_call_extract_file(
+            path,
+            method_map,
+            options_map,
+            callback=None,
+            keywords=DEFAULT_KEYWORDS,
+            comment_tags=(),
+            strip_comment_tags=False,
+            dirpath=dirpath,
+        )
+    ]
+
+
+def extract_cached(
+    package_files,
+    extract_batch,
+    cache,
+    jobs=1,
+    batch_size=DEFAULT_BATCH_SIZE,
+    changed_files=None,
+):
+    """
+    Extract files missing from `cache` in batches across worker processes.
+
+    Batches never mix files of different packages.
+
+    Parameters
+    ----------
+    package_files: dict
+        Mapping of package name to the list of its source file paths.
+    extract_batch: callable
+        Picklable callable receiving a list of paths and returning a list of
+        `(path, results)` tuples.
+    cache: dict
+        Extraction results by file hash. It is updated in place and keeps
+        only the results for the given files.
+    jobs: int, optional
+        Number of worker processes. `None` or `0` use all available cores.
+    batch_size: int
+        Number of files extracted on each batch.
+    changed_files: collection, optional
+        Paths of the files changed since the previous call in this process.
+        The hashes of the other files are reused instead of reading them.
+
+    Returns
+    -------
+    dict
+        Mapping of path to file hash, following the package order.
+    """
+    file_hashes = OrderedDict()
+    batches = []
+    for files in package_files.values():
+        missing_files = []
+        for path in files:
+            file_hash = None
+            if changed_files is not None and path not in changed_files:
+                file_hash = _file_hashes.get(path)
+
+            if file_hash is None:
+                file_hash = _file_hashes[path] = get_file_hash(path)
+
+            file_hashes[path] = file_hash
+            if file_hash not in cache:
+                missing_files.append(path)
+
+        batches.extend(iter_batches(missing_files, batch_size))
+
+    for results in parallel_map(extract_batch, batches, jobs=jobs):
+        for path, file_results in results:
+            cache[file_hashes[path]] = file_results
+
+    extracted = sum(len(batch) for batch in batches)
+    print(
+        "Extracted strings from {extracted} files, {cached} files cached".format(
+            extracted=extracted, cached=len(file_hashes) - extracted
+        )
+    )
+    tracing.set_args(
+        files=len(file_hashes), extracted=extracted, cached=len(file_hashes) - extracted
+    )
+
+    # Drop results for files that are gone or changed
+    for file_hash in set(cache) - set(file_hashes.values()):
+        del cache[file_hash]
+
+    return file_hashes
+
+
+def prune_file_hashes(paths):
+    """
+    Forget the hashes kept by `extract_cached` for files not in `paths`.
+
+    Parameters
+    ----------
+    paths: collection
+        Paths of the files of the last extraction.
+    """
+    for path in set(_file_hashes).difference(paths):
+        del _file_hashes[path]
+
+
+def extract_batch_strings(paths, mapping_path=MAPPING_PATH):
+    """
+    Extract localizable strings from a batch of source files.
+
+    Files that fail to be parsed are reported and skipped instead of
+    aborting the whole extraction.
+
+    Parameters
+    ----------
+    paths: list
+        Paths to source files.
+    mapping_path: str
+        Path to the `pybabel` mapping configuration file.
+
+    Returns
+    -------
+    list
+        List of `(path, results)` tuples, see `extract_file_strings`.
+    """
+    method_map, options_map = load_mapping(mapping_path)
+    results = []
+    for path in paths:
+        try:
+            results.append((path, extract_file_strings(path, method_map, options_map)))
+        except Exception as e:
+            print(
+                "Could not extract strings from `{path}`: {error}".format(
+                    path=path, error=e
+                )
+            )
+
+    return results
+
+
+@tracing.traced()
+def extract_source_strings(
+    package_files,
+    project,
+    version,
+    jobs=1,
+    cache=None,
+    mapping_path=MAPPING_PATH,
+    batch_size=DEFAULT_BATCH_SIZE,
+    changed_files=None,
+):
+    """
+    Extract localizable strings with babel without spawning `pybabel`.
+
+    Every package is split in batches of files that can be extracted on
+    separate worker processes. Results are merged back following the
+    package order, so the catalog is the same for any number of `jobs`.
+
+    Parameters
+    ----------
+    package_files: dict
+        Mapping of package name to the list of its source file paths.
+    project: str
+        Project name.
+    version: str
+        Project version.
+    jobs: int, optional
+        Number of worker processes. `None` or `0` use all available cores.
+    cache: dict, optional
+        Extraction results by file hash, see `load_extraction_cache`. Only
+        files not found in the cache are extracted. The cache is updated in
+        place and keeps only the results for the given files.
+    mapping_path: str
+        Path to the `pybabel` mapping configuration file.
+    batch_size: int
+        Number of files extracted on each batch.
+    changed_files: collection, optional
+        Paths of the files changed since the previous extraction, see
+        `extract_cached`.
+
+    Returns
+    -------
+    babel.messages.catalog.Catalog
+        Catalog with the extracted messages, as `pybabel extract` builds it.
+    """
+    if cache is None:
+        cache = {}
+
+    file_hashes = extract_cached(
+        package_files,
+        partial(extract_batch_strings, mapping_path=mapping_path),
+        cache,
+        jobs=jobs,
+        batch_size=batch_size,
+        changed_files=changed_files,
+    )
+
+    catalog = Catalog(project=project, version=version, charset="utf-8")
+    for path, file_hash in file_hashes.items():
+        messages = cache.get(file_hash, [])
+        path = os.path.relpath(path)
+        for lineno, message, comments, context in messages:
+            catalog.add(
+                message, None, [(path, lineno)], auto_comments=comments, context=context
+            )
+
+    tracing.set_args(entries=len(catalog))
+    return catalog
+
+
+def catalog_to_entries(catalog, root_dir):
+    """
+    Convert a babel catalog into a list of entry dictionaries.
+
+    Parameters
+    ----------
+    catalog: babel.messages.catalog.Catalog
+        Catalog with extracted messages.
+    root_dir: str
+        Repository root path, removed from occurrence paths.
+
+    Returns
+    -------
+    list of CatalogEntry
+        Extracted entries.
+    """
+    entries = []
+    for message in catalog:
+        if not message.id:
+            continue
+
+        occurrences = []
+        for (path, line) in message.locations:
+            path = os.path.abspath(path).replace(root_dir, "").replace("\\", "/")
+            occurrences.append(make_occurrence(path, line))
+
+        if message.pluralizable:
+            msgid, msgid_plural = message.id[:2]
+        else:
+            msgid, msgid_plural = message.id, ""
+
+        entries.append(
+            CatalogEntry(
+                msgid=msgid,
+                msgid_plural=msgid_plural,
+                msgctxt=message.context or None,
+                occurrences=occurrences,
+                comment="\n".join(message.auto_comments),
+                flags=sorted(message.flags),
+                num_plurals=catalog.num_plurals,
+            )
+        )
+
+    return entries
+
+
+def extract_typescript_file(path):
+    """
+    Extract translation calls from a TypeScript/TSX file.
+
+    Parameters
+    ----------
+    path: str
+        Path to source file.
+
+    Returns
+    -------
+    list
+        List of `(line, context, text, plural, comment)` tuples.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        source = fh.read()
+
+    return list(extract_typescript(source, jsx=path.endswith(".tsx")))
+
+
+def extract_typescript_batch(paths):
+    """
+    Extract translation calls from a batch of TypeScript/TSX files.
+
+    Returns
+    -------
+    list
+        List of `(path, results)` tuples, see `extract_typescript_file`.
+    """
+    results = []
+    for path in paths:
+        try:
+            results.append((path, extract_typescript_file(path)))
+        except Exception as e:
+            print(
+                "Could not extract strings from `{path}`: {error}".format(
+                    path=path, error=e
+                )
+            )
+
+    return results
+
+
+@tracing.traced()
+def extract_typescript_strings(
+    package_files,
+    root_dir,
+    jobs=1,
+    cache=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    changed_files=None,
+):
+    """
+    Extract translation calls from TypeScript/TSX files without Node.
+
+    This replaces the `gettext-extract` tool. Messages with the same context
+    and text are merged and occurrences are relative to `root_dir`.
+
+    Parameters
+    ----------
+    package_files: dict
+        Mapping of package name to the list of its source file paths.
+    root_dir: str
+        Repository root path.
+    jobs: int, optional
+        Number of worker processes. `None` or `0` use all available cores.
+    cache: dict, optional
+        Extraction results by file hash, see `extract_cached`.
+    batch_size: int
+        Number of files extracted on each batch.
+    changed_files: collection, optional
+        Paths of the files changed since the previous extraction, see
+        `extract_cached`.
+
+    Returns
+    -------
+    list of CatalogEntry
+        Extracted entries.
+    """
+    if cache is None:
+        cache = {}
+
+    file_hashes = extract_cached(
+        package_files,
+        extract_typescript_batch,
+        cache,
+        jobs=jobs,
+        batch_size=batch_size,
+        changed_files=changed_files,
+    )
+
+    entries = OrderedDict()
+    comments = {}
+    for path, file_hash in file_hashes.items():
+        ref_path = os.path.relpath(path, root_dir).replace("\\", "/")
+        for line, context, text, plural, comment in cache.get(file_hash, []):
+            key = (context, text)
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = CatalogEntry(msgid=text, msgctxt=context)
+                comments[key] = []
+
+            entry.occurrences.append(make_occurrence(ref_path, line))
+            if plural is not None and not entry.msgid_plural:
+                entry.msgid_plural = plural
+
+            if comment is not None and comment not in comments[key]:
+                comments[key].append(comment)
+
+    for key, entry in entries.items():
+        entry.comment = "\n".join(comments[key])
+
+    tracing.set_args(entries=len(entries))
+    return list(entries.values())
@@ -1,21 +1,378 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
+"""
+Find the installed language packs and the locale data bundled in packages.
+
+Entry points are listed with `importlib.metadata` and summarized in an
+index mapping each package to its locales and JSON files. The index is
+persisted in the user cache folder and rebuilt when a folder holding the
+metadata of the installed distributions changes, which happens when
+distributions are installed or removed.
+"""
+import hashlib
 import json
 import os
+import pickle
+import sys
+from functools import lru_cache
+from importlib.util import find_spec
 
-import pkg_resources
-
-from .utils import check_locale
+from .constants import LC_MESSAGES
+from .constants import LOCALE_FOLDER
+from .locales import check_locale
+from .mofile import MoCatalog
+from .writers import write_if_changed
 
 
 JUPYTERLAB_LANGUAGEPACK_ENTRY = "jupyterlab.languagepack"
 JUPYTERLAB_LOCALE_ENTRY = "jupyterlab.locale"
+LOCALE_INDEX_VERSION = 3
+# Number of merged locale bundles kept in memory, see `merge_data`
+MERGE_CACHE_SIZE = 32
+
+# Index loaded by the current process, see `get_locale_index`
+_locale_index = None
+
+# Memory mapped catalogs opened by the current process, by locale and domain,
+# see `get_mo_catalog`
+_mo_catalogs = {}
+
+
+# --- Locale index
+# ----------------------------------------------------------------------------
+def _iter_entry_points(group):
+    # Only needed when the index is rebuilt
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=group)
+
+    # Python < 3.10
+    return eps.get(group, [])
+
+
+def get_distribution_dirs():
+    """
+    Return the folders holding the metadata of the installed distributions,
+    usually the site-packages folders.
+    """
+    from importlib.metadata import distributions
+
+    dirs = set()
+    for dist in distributions():
+        dirs.add(os.path.abspath(str(dist.locate_file(""))))
+
+    return sorted(dirs)
+
+
+def get_index_path():
+    """
+    Return the path of the locale index of the running environment.
+
+    It is stored in `$XDG_CACHE_HOME/jupyterlab-translate`, by default
+    `~/.cache/jupyterlab-translate`.
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    env_hash = hashlib.sha256(sys.prefix.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(
+        cache_dir,
+        "jupyterlab-translate",
+        "locale-index-{env_hash}.json".format(env_hash=env_hash),
+    )
+
+
+def get_index_key(dirs):
+    """
+    Return the modification times of the folders holding distributions.
+
+    Installing or removing a distribution changes the modification time of
+    the folder holding its metadata, so the index is rebuilt when the key
+    changes. Other folders of `sys.path`, like the current directory, are
+    not checked.
+
+    Parameters
+    ----------
+    dirs: list
+        Folders holding the distributions, see `get_distribution_dirs`.
+    """
+    key = [LOCALE_INDEX_VERSION, sys.prefix]
+    for path in dirs:
+        try:
+            key.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            key.append([path, None])
+
+    return key
+
+
+def _find_package_dir(module):
+    # Locate the package without importing it
+    try:
+        spec = find_spec(module)
+    except (ImportError, ValueError):
+        spec = None
 
+    if spec is None:
+        return None
 
-def merge_data():
+    if spec.submodule_search_locations:
+        return list(spec.submodule_search_locations)[0]
+
+    if spec.origin:
+        return os.path.dirname(spec.origin)
+
+    return None
+
+
+def build_locale_index():
+    """
+    Scan the installed entry points for language packs and locale data.
+
+    Returns
+    -------
+    dict
+        Index with the `language_packs` entry points and their JSON `files`,
+        the `packages` locale data, mapping each package name to its
+        `locales` JSON paths, and the `dirs` holding the distributions.
+    """
+    language_packs = {}
+    for entry_point in _iter_entry_points(JUPYTERLAB_LANGUAGEPACK_ENTRY):
+        if entry_point.name in language_packs:
+            continue
+
+        files = []
+        module = entry_point.value.split(":")[0].strip()
+        package_root_path = _find_package_dir(module)
+        if package_root_path is not None:
+            for root, _dirs, names in os.walk(package_root_path):
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.endswith(".json")
+                )
+
+        language_packs[entry_point.name] = {
+            "value": entry_point.value,
+            "files": sorted(files),
+        }
+
+    packages = {}
+    for entry_point in _iter_entry_points(JUPYTERLAB_LOCALE_ENTRY):
+        name = entry_point.name.replace("-", "_").lower()
+        module = entry_point.value.split(":")[0].strip()
+        package_root_path = _find_package_dir(module)
+        if package_root_path is None:
+            print("Package `{module}` not found!".format(module=module))
+            continue
+
+        locales = {}
+        locale_path = os.path.join(package_root_path, LOCALE_FOLDER)
+        if os.path.isdir(locale_path):
+            for locale in sorted(os.listdir(locale_path)):
+                locale_json_path = os.path.join(
+                    locale_path,
+                    locale,
+                    LC_MESSAGES,
+                    "{name}.json".format(name=name),
+                )
+                if os.path.isfile(locale_json_path):
+                    locales[locale] = locale_json_path
+
+        packages[name] = {"value": entry_point.value, "locales": locales}
+
+    dirs = get_distribution_dirs()
+    return {
+        "key": get_index_key(dirs),
+        "dirs": dirs,
+        "language_packs": language_packs,
+        "packages": packages,
+    }
+
+
+def get_locale_index(refresh=False):
+    """
+    Return the locale index, scanning the entry points only if it is stale.
+
+    Parameters
+    ----------
+    refresh: bool, optional
+        Scan the entry points even if the index is up to date.
+
+    Returns
+    -------
+    dict
+        Index, see `build_locale_index`.
+    """
+    global _locale_index
+
+    if (
+        not refresh
+        and _locale_index is not None
+        and _locale_index["key"] == get_index_key(_locale_index["dirs"])
+    ):
+        return _locale_index
+
+    index_path = get_index_path()
+    index = None
+    if not refresh and os.path.isfile(index_path):
+        try:
+            with open(index_path, "r") as fh:
+                index = json.load(fh)
+        except ValueError:
+            index = None
+
+        if index is not None and index.get("key") != get_index_key(
+            index.get("dirs", [])
+        ):
+            index = None
+
+    if index is None:
+        index = build_locale_index()
+        try:
+            write_if_changed(index_path, json.dumps(index, indent=1, sort_keys=True))
+        except OSError as e:
+            # The index still works in memory without a writable cache
+            print(e)
+
+    _locale_index = index
+    return index
+
+
+def get_locale_files(locale):
+    """
+    Return the JSON files with the data of a locale.
+
+    Parameters
+    ----------
+    locale: str
+        Locale name.
+
+    Returns
+    -------
+    list
+        Paths of the files bundled in packages, followed by the files of the
+        language pack, so the latter take precedence when merged.
+    """
+    index = get_locale_index()
+    paths = []
+    for package in index["packages"].values():
+        locale_json_path = package["locales"].get(locale)
+        if locale_json_path is not None:
+            paths.append(locale_json_path)
+
+    language_pack = index["language_packs"].get(locale)
+    if language_pack is not None:
+        paths.extend(language_pack["files"])
+
+    return paths
+
+
+@lru_cache(maxsize=MERGE_CACHE_SIZE)
+def _merge_files(locale, fingerprint):
+    data = {}
+    for path, _size, _mtime in fingerprint:
+        with open(path, "r") as fh:
+            jed_data = json.load(fh)
+
+        # Skip other JSON files found in language packs
+        metadata = jed_data.get("") if isinstance(jed_data, dict) else None
+        if not isinstance(metadata, dict):
+            continue
+
+        domain = metadata.get("domain") or os.path.splitext(os.path.basename(path))[0]
+        data[domain] = jed_data
+
+    # Loading a pickle is faster than `copy.deepcopy` and parsing the files
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+# --- Public API
+# ----------------------------------------------------------------------------
+def get_mo_catalog(locale: str, domain: str):
+    """
+    Get the memory mapped `.mo` catalog of a domain for a given `locale`.
+
+    The `.mo` files are found next to the JSON files of the locale, and the
+    language pack takes precedence over the data bundled in packages.
+    Catalogs stay open for the next lookups and are opened again when their
+    file changes. A catalog is forgotten when its file is replaced, removed
+    or no longer takes precedence. It is not closed, callers may still hold
+    it, its file is unmapped once it is not referenced anymore.
+
+    Parameters
+    ----------
+    locale: str
+        Locale name.
+    domain: str
+        Translation domain, like "jupyterlab".
+
+    Returns
+    -------
+    MoCatalog or None
+        Catalog, or `None` if no `.mo` file is installed.
+    """
+    mo_name = "{domain}.mo".format(domain=domain)
+    mo_path = None
+    for path in get_locale_files(locale):
+        candidate = os.path.join(os.path.dirname(path), mo_name)
+        if os.path.isfile(candidate):
+            mo_path = candidate
+
+    key = (locale, domain)
+    stat = None
+    if mo_path is not None:
+        try:
+            stat = os.stat(mo_path)
+        except OSError:
+            pass
+
+    if stat is None:
+        # Forget the catalog of a file that is gone
+        _mo_catalogs.pop(key, None)
+        return None
+
+    stamp = (mo_path, stat.st_size, stat.st_mtime_ns)
+    cached = _mo_catalogs.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, MoCatalog(mo_path))
+        _mo_catalogs[key] = cached
+
+    return cached[1]
+
+
+def merge_data(locale: str) -> dict:
     """
     Merge language pack data with locale data bundled in packages.
+
+    The merged bundles of the last used locales are cached in memory and
+    rebuilt when one of their files is added, removed or modified. Each call
+    returns a deep copy of the cached bundle.
+
+    Parameters
+    ----------
+    locale: str
+        Locale name.
+
+    Returns
+    -------
+    dict
+        Jed data of each domain, language pack data replaces the data
+        bundled in packages. Changing it does not change the cached bundle.
+        >>>{"jupyterlab": jed_data, "jupyterlab_git": jed_data, ...}
     """
+    fingerprint = []
+    for path in get_locale_files(locale):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+
+        fingerprint.append((path, stat.st_size, stat.st_mtime_ns))
+
+    return pickle.loads(_merge_files(locale, tuple(fingerprint)))
 
 
 def get_installed_packages_locale(locale: str) -> dict:
@@ -34,28 +391,13 @@ def get_installed_packages_locale(locale: str) -> dict:
     - `entry_points={"jupyterlab.locale": "jupyterlab-git = jupyterlab_git"}`
     """
     packages_locale_data = {}
-    for entry_point in pkg_resources.iter_entry_points(JUPYTERLAB_LOCALE_ENTRY):
-        name = entry_point.name.replace("-", "_").lower()
-        locales = []
-        try:
-            package_root_path = os.path.dirname(entry_point.load().__file__)
-            locale_path = os.path.join(package_root_path, "locale")
-            locales = [loc for loc in os.listdir(locales) if os.path.isdir(loc)]
-        except Exception as e:
-            print(e)
+    for name, package in get_locale_index()["packages"].items():
+        locale_json_path = package["locales"].get(locale)
+        if locale_json_path is None or not os.path.isfile(locale_json_path):
             continue
 
-        data = {}
-        if locale in locales:
-            locale_json_path = os.path.join(
-                locale_path, locale, "LC_MESSAGES", "{name}.json".format(name=name)
-            )
-            if os.path.isfile(locale_json_path):
-                with open(locale_json_path, "r") as fh:
-                    data[locale] = json.loads(fh)
-
-        if data:
-            packages_locale_data[name] = data
+        with open(locale_json_path, "r") as fh:
+            packages_locale_data[name] = {locale: json.load(fh)}
 
     return packages_locale_data
 
@@ -69,12 +411,7 @@ def get_installed_language_packs() -> list:
     list
         Ordered list of available language packs.
     """
-    return [
-        entry_point.name
-        for entry_point in pkg_resources.iter_entry_points(
-            JUPYTERLAB_LANGUAGEPACK_ENTRY
-        )
-    ]
+    return list(get_locale_index()["language_packs"])
 
 
 def get_language_pack(locale: str) -> dict:
@@ -86,12 +423,16 @@ def get_language_pack(locale: str) -> dict:
     dict
         Dictionary with language pack information in Jed format.
     """
+    from importlib.metadata import EntryPoint
+
     if check_locale(locale):
-        for entry_point in pkg_resources.iter_entry_points(
-            JUPYTERLAB_LANGUAGEPACK_ENTRY
-        ):
-            if locale == entry_point.name:
-                return entry_point.load()
+        language_pack = get_locale_index()["language_packs"].get(locale)
+        if language_pack is not None:
+            return EntryPoint(
+                name=locale,
+                value=language_pack["value"],
+                group=JUPYTERLAB_LANGUAGEPACK_ENTRY,
+            ).load()
         else:
             return {}
     else:
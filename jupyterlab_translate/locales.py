@@ -0,0 +1,58 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Locale validation.
+
+Most locales are found in the set of identifiers with CLDR data shipped by
+Babel, which is listed once. Other values, like aliases and locales using
+likely subtags, are parsed with `babel.Locale.parse`. Results are memoized,
+so each value loads the CLDR data at most once per process.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+LocaleCheck = namedtuple("LocaleCheck", ["locale", "valid", "error"])
+
+
+@lru_cache(maxsize=1)
+def get_locale_identifiers():
+    """
+    Return the set of locale identifiers with data available in Babel.
+    """
+    from babel.localedata import locale_identifiers
+
+    return frozenset(locale_identifiers())
+
+
+@lru_cache(maxsize=None)
+def validate_locale(locale):
+    """
+    Check if a locale is a valid value.
+
+    Parameters
+    ----------
+    locale: str
+        Locale name, like "es_CO".
+
+    Returns
+    -------
+    LocaleCheck
+        Result with the `locale`, whether it is `valid` and the `error`
+        message if it is not.
+    """
+    if locale in get_locale_identifiers():
+        return LocaleCheck(locale, True, None)
+
+    import babel
+
+    try:
+        babel.Locale.parse(locale)
+    except Exception as e:
+        return LocaleCheck(locale, False, str(e))
+
+    return LocaleCheck(locale, True, None)
+
+
+def check_locale(locale):
+    """Check if a locale is a valid value."""
+    return validate_locale(locale).valid
@@ -0,0 +1,391 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+In-process `.pot` template merge into the locale `.po` catalogs.
+
+This follows the semantics of `pybabel init` and `pybabel update`, but the
+template is parsed once and reused for every locale.
+"""
+import datetime
+import io
+import math
+import os
+import re
+from collections import Counter
+from collections import OrderedDict
+from difflib import get_close_matches
+from difflib import SequenceMatcher
+
+from babel.messages.catalog import Catalog
+from babel.messages.pofile import read_po
+from babel.messages.pofile import write_po
+from babel.util import LOCALTZ
+
+from .writers import record_write
+from .writers import write_if_changed
+
+# Constants
+# Default line width used by `pybabel`
+WIDTH = 76
+CREATION_DATE_RE = re.compile(rb'^"POT-Creation-Date: .*\\n"\n', re.MULTILINE)
+
+
+class DifflibMatcher:
+    """
+    Fuzzy matcher comparing the key against every candidate with `difflib`,
+    as `pybabel update` does.
+
+    Parameters
+    ----------
+    candidates: list
+        Fuzzy match keys of the translated messages.
+    """
+
+    def __init__(self, candidates):
+        self.candidates = list(candidates)
+
+    def match(self, key):
+        """
+        Return the closest candidate to `key` or `None`.
+        """
+        matches = get_close_matches(key, self.candidates, 1)
+        return matches[0] if matches else None
+
+
+class TrigramMatcher:
+    """
+    Fuzzy matcher using an inverted index of character trigrams.
+
+    Only the candidates sharing the rarest trigrams of the key are looked
+    up, and the `max_candidates` of them with the highest upper bound of
+    their `difflib` ratio are compared with `difflib`. This keeps the cost
+    of each match roughly independent of the catalog size, at the price of
+    possibly missing a match that shares very few trigrams with the key.
+
+    Parameters
+    ----------
+    candidates: list
+        Fuzzy match keys of the translated messages.
+    cutoff: float, optional
+        Minimum `difflib` similarity ratio of a match.
+    max_candidates: int, optional
+        Maximum number of candidates compared with `difflib` for each key.
+    min_shared: float, optional
+        Fraction of the trigrams of the key that a good match is expected
+        to share. Posting lists are looked up from the rarest trigram until
+        any candidate sharing that fraction must have been found.
+    max_postings: int, optional
+        Maximum number of posting list entries looked up for each key, so
+        that very common trigrams do not make a match scan the whole index.
+    """
+
+    def __init__(
+        self,
+        candidates,
+        cutoff=0.6,
+        max_candidates=10,
+        min_shared=0.5,
+        max_postings=2000,
+    ):
+        self.candidates = list(candidates)
+        self.cutoff = cutoff
+        self.max_candidates = max_candidates
+        self.min_shared = min_shared
+        self.max_postings = max_postings
+        self.grams = [self.trigrams(candidate) for candidate in self.candidates]
+        self.index = {}
+        for idx, grams in enumerate(self.grams):
+            for trigram in grams:
+                self.index.setdefault(trigram, []).append(idx)
+
+    @staticmethod
+    def trigrams(key):
+        """
+        Return the set of character trigrams of a key.
+        """
+        key = "  {} ".format(key)
+        return {key[idx : idx + 3] for idx in range(len(key) - 2)}
+
+    def match(self, key):
+        """
+        Return the closest candidate to `key` or `None`.
+        """
+        grams = self.trigrams(key)
+        postings = sorted(
+            (self.index[trigram] for trigram in grams if trigram in self.index),
+            key=len,
+        )
+        if not postings:
+            return None
+
+        # A candidate sharing `min_shared` of the trigrams is in one of these
+        probe = len(postings) - math.ceil(len(postings) * self.min_shared) + 1
+        counts = Counter()
+        budget = self.max_postings
+        for posting in postings[: max(1, probe)]:
+            counts.update(posting[:budget])
+            budget -= len(posting)
+            if budget <= 0:
+                break
+
+        # Rank the ones sharing the most trigrams by the upper bound of their
+        # `difflib` ratio, and compare them until none can beat the best one
+        matcher = SequenceMatcher()
+        matcher.set_seq2(key)
+        bounds = []
+        for idx, _count in counts.most_common(10 * self.max_candidates):
+            candidate = self.candidates[idx]
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() >= self.cutoff:
+                bound = matcher.quick_ratio()
+                if bound >= self.cutoff:
+                    bounds.append((bound, candidate))
+
+        bounds.sort(reverse=True)
+        best = None
+        for (bound, candidate) in bounds[: self.max_candidates]:
+            if best is not None and bound < best[0]:
+                break
+
+            matcher.set_seq1(candidate)
+            ratio = matcher.ratio()
+            # Ties go to the greatest candidate, as with `get_close_matches`
+            if ratio >= self.cutoff and (best is None or (ratio, candidate) > best):
+                best = (ratio, candidate)
+
+        return best[1] if best else None
+
+
+def _key_for(msgid, context=None):
+    key = msgid[0] if isinstance(msgid, (list, tuple)) else msgid
+    if context is not None:
+        key = (key, context)
+
+    return key
+
+
+def _fuzzy_key(key):
+    # Context is not used for fuzzy matching
+    msgid = key[0] if isinstance(key, tuple) else key
+    return msgid.lower().strip()
+
+
+def load_template(pot_path):
+    """
+    Parse a `.pot` template.
+
+    Parameters
+    ----------
+    pot_path: str
+        Path to the `.pot` file.
+
+    Returns
+    -------
+    babel.messages.catalog.Catalog
+        Template catalog.
+    """
+    with open(pot_path, "rb") as fh:
+        return read_po(fh)
+
+
+def init_catalog(template, locale, domain=None):
+    """
+    Create a new locale catalog from the template, like `pybabel init`.
+
+    Parameters
+    ----------
+    template: babel.messages.catalog.Catalog
+        Template catalog.
+    locale: str
+        Locale of the new catalog.
+    domain: str, optional
+        Catalog domain.
+
+    Returns
+    -------
+    babel.messages.catalog.Catalog
+        New catalog without translations.
+    """
+    catalog = Catalog(locale=locale, domain=domain, charset=template.charset)
+    header = next(iter(template))
+    catalog[header.id] = header
+    catalog.header_comment = template.header_comment
+    catalog.locale = locale
+    catalog.revision_date = datetime.datetime.now(LOCALTZ)
+    catalog.fuzzy = False
+    for message in template:
+        if message.id:
+            catalog[message.id] = message.clone()
+
+    return catalog
+
+
+def update_catalog(
+    catalog,
+    template,
+    no_fuzzy_matching=False,
+    keep_user_comments=True,
+    fuzzy_matcher=TrigramMatcher,
+):
+    """
+    Update `catalog` in place with the messages of the template.
+
+    Like `pybabel update`, messages missing from the template become
+    obsolete, and new messages similar to a translated message that is not
+    used anymore get its translation flagged as fuzzy.
+
+    Parameters
+    ----------
+    catalog: babel.messages.catalog.Catalog
+        Locale catalog to update.
+    template: babel.messages.catalog.Catalog
+        Template catalog, it is not modified.
+    no_fuzzy_matching: bool, optional
+        Do not look for fuzzy matches.
+    keep_user_comments: bool, optional
+        Keep the translator comments of the existing messages.
+    fuzzy_matcher: callable, optional
+        Factory called with the list of candidate keys of the translated
+        messages, returning an object whose `match(key)` method returns the
+        best candidate or `None`. Keys are lowercase message ids. Use
+        `DifflibMatcher` to compare against every candidate like `pybabel`.
+    """
+    messages = OrderedDict()
+    for message in catalog:
+        if message.id:
+            messages[_key_for(message.id, message.context)] = message
+
+    for message in messages.values():
+        catalog.delete(message.id, message.context)
+
+    remaining = messages.copy()
+    fuzzy_matches = set()
+    candidates = OrderedDict()
+    if not no_fuzzy_matching:
+        for key, message in messages.items():
+            if message.string:
+                candidates[_fuzzy_key(key)] = key
+
+        matcher = fuzzy_matcher(list(candidates))
+
+    def _merge(message, oldkey, newkey):
+        message = message.clone()
+        fuzzy = False
+        if oldkey != newkey:
+            fuzzy = True
+            fuzzy_matches.add(oldkey)
+            oldmsg = messages[oldkey]
+            if isinstance(oldmsg.id, str):
+                message.previous_id = [oldmsg.id]
+            else:
+                message.previous_id = list(oldmsg.id)
+        else:
+            oldmsg = remaining.pop(oldkey)
+
+        message.string = oldmsg.string
+        if keep_user_comments and oldmsg.user_comments:
+            message.user_comments = list(OrderedDict.fromkeys(oldmsg.user_comments))
+
+        if isinstance(message.id, (list, tuple)):
+            if not isinstance(message.string, (list, tuple)):
+                fuzzy = True
+                message.string = tuple(
+                    [message.string] + ([""] * (len(message.id) - 1))
+                )
+            elif len(message.string) != catalog.num_plurals:
+                fuzzy = True
+                message.string = tuple(message.string[: len(oldmsg.string)])
+        elif isinstance(message.string, (list, tuple)):
+            fuzzy = True
+            message.string = message.string[0]
+
+        message.flags |= oldmsg.flags
+        if fuzzy:
+            message.flags |= {"fuzzy"}
+
+        catalog[message.id] = message
+
+    for message in template:
+        if not message.id:
+            continue
+
+        key = _key_for(message.id, message.context)
+        if key in messages:
+            _merge(message, key, key)
+            continue
+
+        if candidates:
+            match = matcher.match(_fuzzy_key(key))
+            if match is not None:
+                _merge(message, candidates[match], key)
+                continue
+
+        catalog[message.id] = message.clone()
+
+    for key, message in remaining.items():
+        if key not in fuzzy_matches:
+            catalog.obsolete[key] = message
+
+    catalog.creation_date = template.creation_date
+
+
+def serialize_catalog(catalog, width=WIDTH):
+    """
+    Return the content of the `.po` file for a catalog.
+    """
+    buf = io.BytesIO()
+    write_po(buf, catalog, width=width)
+    return buf.getvalue()
+
+
+def merge_template(
+    template,
+    po_path,
+    locale,
+    domain=None,
+    fuzzy_matcher=TrigramMatcher,
+    write_stats=None,
+):
+    """
+    Create or update the `.po` file of a locale from the template.
+
+    The file is only written if its content changes, not counting the
+    `POT-Creation-Date` header that is updated on every run.
+
+    Parameters
+    ----------
+    template: babel.messages.catalog.Catalog
+        Template catalog, see `load_template`.
+    po_path: str
+        Path of the locale `.po` file.
+    locale: str
+        Locale of the catalog.
+    domain: str, optional
+        Catalog domain.
+    fuzzy_matcher: callable, optional
+        Fuzzy matcher factory, see `update_catalog`.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+
+    Returns
+    -------
+    bool
+        `True` if the file was written.
+    """
+    old_data = None
+    if os.path.isfile(po_path):
+        with open(po_path, "rb") as fh:
+            old_data = fh.read()
+
+        catalog = read_po(io.BytesIO(old_data), locale=locale, domain=domain)
+        update_catalog(catalog, template, fuzzy_matcher=fuzzy_matcher)
+    else:
+        catalog = init_catalog(template, locale, domain=domain)
+
+    data = serialize_catalog(catalog)
+    if old_data is not None:
+        if CREATION_DATE_RE.sub(b"", data) == CREATION_DATE_RE.sub(b"", old_data):
+            record_write(write_stats, False)
+            return False
+
+    return write_if_changed(po_path, data, stats=write_stats)
@@ -0,0 +1,160 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Memory mapped GNU `.mo` files.
+
+`MoCatalog` looks up each message in place with a binary search of the keys,
+which `.mo` files keep sorted, so the catalog is never loaded as a whole and
+processes reading the same file share its pages.
+
+The optional hash table of the format is not used: `polib` does not write
+it, and probing it with a hash computed in Python is slower than the binary
+search.
+"""
+import mmap
+import re
+import struct
+from gettext import c2py
+
+# Constants
+MAGIC = 0x950412DE
+CONTEXT_SEPARATOR = b"\x04"
+CHARSET_RE = re.compile(rb"charset=([\w-]+)", re.IGNORECASE)
+PLURAL_FORMS_RE = re.compile(rb"^Plural-Forms:.*plural=(.+?);?\s*$", re.MULTILINE)
+
+
+class MoCatalog:
+    """
+    Read-only translations of a memory mapped `.mo` file.
+
+    Parameters
+    ----------
+    path: str
+        Path to the `.mo` file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = struct.unpack_from("<I", self._data)[0]
+        if magic == MAGIC:
+            self._order = "<"
+        elif magic == struct.unpack(">I", struct.pack("<I", MAGIC))[0]:
+            self._order = ">"
+        else:
+            self._data.close()
+            raise Exception("Invalid `.mo` file `{path}`!".format(path=path))
+
+        (
+            _revision,
+            self._count,
+            self._keys_offset,
+            self._values_offset,
+        ) = struct.unpack_from(self._order + "4I", self._data, 4)
+
+        # Header entry, with an empty key
+        headers = self._lookup(b"")
+        headers = self._value(headers) if headers is not None else b""
+        match = CHARSET_RE.search(headers)
+        self.charset = match.group(1).decode("ascii") if match else "utf-8"
+        match = PLURAL_FORMS_RE.search(headers)
+        self._plural = c2py(match.group(1).decode("ascii")) if match else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        self._data.close()
+
+    def _string(self, table_offset, idx):
+        length, offset = struct.unpack_from(
+            self._order + "2I", self._data, table_offset + 8 * idx
+        )
+        return self._data[offset : offset + length]
+
+    def _key(self, idx):
+        # Plural keys are "msgid\0msgid_plural", only the msgid is compared
+        key = self._string(self._keys_offset, idx)
+        return key.split(b"\0", 1)[0]
+
+    def _value(self, idx):
+        return self._string(self._values_offset, idx)
+
+    def _lookup(self, key):
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+
+        if low < self._count and self._key(low) == key:
+            return low
+
+        return None
+
+    def _translate(self, msgid, context=None):
+        key = msgid.encode(self.charset)
+        if context is not None:
+            key = context.encode(self.charset) + CONTEXT_SEPARATOR + key
+
+        idx = self._lookup(key)
+        return None if idx is None else self._value(idx)
+
+    def _plural_index(self, n):
+        if self._plural is None:
+            return 0 if n == 1 else 1
+
+        return self._plural(n)
+
+    def __contains__(self, msgid):
+        return self._translate(msgid) is not None
+
+    def gettext(self, msgid):
+        """
+        Return the translation of a message, or the message itself.
+        """
+        return self.pgettext(None, msgid)
+
+    def pgettext(self, context, msgid):
+        """
+        Return the translation of a message with a context.
+        """
+        value = self._translate(msgid, context)
+        if value is None:
+            return msgid
+
+        return value.split(b"\0", 1)[0].decode(self.charset)
+
+    def ngettext(self, msgid, msgid_plural, n):
+        """
+        Return the plural form of a message for `n`.
+        """
+        return self.npgettext(None, msgid, msgid_plural, n)
+
+    def npgettext(self, context, msgid, msgid_plural, n):
+        """
+        Return the plural form of a message with a context for `n`.
+        """
+        value = self._translate(msgid, context)
+        if value is None:
+            return msgid if n == 1 else msgid_plural
+
+        forms = value.split(b"\0")
+        idx = self._plural_index(n)
+        if idx >= len(forms):
+            idx = len(forms) - 1
+
+        return forms[idx].decode(self.charset)
@@ -0,0 +1,103 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Helpers to distribute work across processes.
+"""
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Pool reused by `parallel_map`, see `shared_pool`
+_shared_executor = None
+
+
+def get_jobs(jobs):
+    """
+    Normalize the number of worker processes.
+
+    Parameters
+    ----------
+    jobs: int or None
+        Number of workers. `None` or `0` use all available cores.
+
+    Returns
+    -------
+    int
+        Number of workers to use, at least 1.
+    """
+    if not jobs:
+        jobs = os.cpu_count() or 1
+
+    return max(1, jobs)
+
+
+def parallel_map(func, items, jobs=1, initializer=None, initargs=()):
+    """
+    Apply `func` to every item, using a process pool if `jobs` is not 1.
+
+    Results are returned in the same order as `items`, so callers merging
+    them get a deterministic output regardless of the number of workers.
+
+    Parameters
+    ----------
+    func: callable
+        Picklable callable receiving a single item.
+    items: iterable
+        Items to process.
+    jobs: int or None
+        Number of workers. `None` or `0` use all available cores.
+    initializer: callable, optional
+        Picklable callable run once in each worker before processing items,
+        or once in the current process when running serially.
+    initargs: tuple, optional
+        Arguments passed to `initializer`.
+
+    Returns
+    -------
+    list
+        Results of `func` for each item.
+    """
+    items = list(items)
+    jobs = min(get_jobs(jobs), len(items))
+    if jobs <= 1:
+        if initializer is not None and items:
+            initializer(*initargs)
+
+        return [func(item) for item in items]
+
+    if _shared_executor is not None and initializer is None:
+        return list(_shared_executor.map(func, items))
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    ) as executor:
+        return list(executor.map(func, items))
+
+
+@contextlib.contextmanager
+def shared_pool(jobs=1):
+    """
+    Reuse a single process pool for the `parallel_map` calls in this context.
+
+    Starting a pool for each call costs the start up of the workers and
+    loses the data they cache, which adds up when processing many projects.
+    Calls with an `initializer` still use a pool of their own.
+
+    Parameters
+    ----------
+    jobs: int or None
+        Number of workers. `None` or `0` use all available cores.
+    """
+    global _shared_executor
+
+    jobs = get_jobs(jobs)
+    if jobs <= 1 or _shared_executor is not None:
+        yield
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        _shared_executor = executor
+        try:
+            yield
+        finally:
+            _shared_executor = None
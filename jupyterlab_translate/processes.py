@@ -0,0 +1,144 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Run external commands concurrently.
+
+Commands run as `asyncio` subprocesses, and an optional function runs in a
+thread meanwhile, so the wall time is the one of the slowest of them
+instead of their sum. The output of every command is collected, its
+standard error is printed and an exception is raised if one fails.
+"""
+import asyncio
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import tracing
+
+Command = namedtuple("Command", ["name", "args", "cwd"])
+ProcessResult = namedtuple(
+    "ProcessResult",
+    ["command", "returncode", "stdout", "stderr", "pid", "start", "end"],
+)
+
+
+async def run_command(command):
+    """
+    Run a command, collecting its output.
+
+    Returns
+    -------
+    ProcessResult
+        Result, the `returncode` is `None` if the program could not be
+        started and the error is in `stderr`.
+    """
+    start = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command.args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=command.cwd,
+        )
+    except OSError as e:
+        return ProcessResult(
+            command, None, b"", str(e).encode("utf-8"), None, start, time.perf_counter()
+        )
+
+    stdout, stderr = await process.communicate()
+    return ProcessResult(
+        command,
+        process.returncode,
+        stdout,
+        stderr,
+        process.pid,
+        start,
+        time.perf_counter(),
+    )
+
+
+async def _gather(commands, func):
+    loop = asyncio.get_running_loop()
+    tasks = [run_command(command) for command in commands]
+    if func is not None:
+        tasks.append(loop.run_in_executor(None, func))
+
+    # Wait for every command even if the function fails
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def check_results(results):
+    """
+    Print the standard error of the commands and raise if one failed.
+    """
+    errors = []
+    for result in results:
+        stderr = result.stderr.decode("utf-8", "replace").strip()
+        if stderr:
+            print(
+                "`{name}` stderr:\n{stderr}".format(
+                    name=result.command.name, stderr=stderr
+                )
+            )
+
+        if result.returncode is None:
+            errors.append("`{name}` could not run".format(name=result.command.name))
+        elif result.returncode != 0:
+            errors.append(
+                "`{name}` exited with code {returncode}".format(
+                    name=result.command.name, returncode=result.returncode
+                )
+            )
+
+    if errors:
+        raise Exception("{errors}!".format(errors=", ".join(errors)))
+
+
+def run_commands(commands, func=None):
+    """
+    Run commands as concurrent subprocesses, and `func` in a thread.
+
+    When called from a running event loop, like the one of a Jupyter kernel,
+    the commands run on a new event loop in a worker thread.
+
+    Parameters
+    ----------
+    commands: list
+        `Command` tuples with the `name` used in messages, the program
+        `args` and the working directory `cwd`, or `None`.
+    func: callable, optional
+        Function without arguments to run while the commands run.
+
+    Returns
+    -------
+    tuple
+        The list of `ProcessResult` of the commands and the value returned
+        by `func`.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        results = asyncio.run(_gather(commands, func))
+    else:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = executor.submit(asyncio.run, _gather(commands, func)).result()
+
+    value = results.pop() if func is not None else None
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+        tracing.record_span(
+            result.command.name,
+            result.start,
+            result.end,
+            category=tracing.SUBPROCESS,
+            tid=result.pid,
+            returncode=str(result.returncode),
+        )
+
+    if isinstance(value, BaseException):
+        raise value
+
+    check_results(results)
+    return results, value
@@ -0,0 +1,208 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Timing of the stages of a run, saved in the Chrome trace event format.
+
+Tracing is disabled by default and spans cost a single check then. Once
+enabled, each span records its wall time and arguments like entry counts.
+Bytes written and time spent in subprocesses are added to every open span,
+so each stage reports the totals of the stages it runs. Spans are recorded
+by the current process only, work done by worker processes is part of the
+span waiting for it.
+
+Traces can be opened with `chrome://tracing` or https://ui.perfetto.dev.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Constants
+API = "api"
+STAGE = "stage"
+SUBPROCESS = "subprocess"
+
+# Recorded events, `None` while tracing is disabled
+_events = None
+# Arguments of the open spans, innermost last
+_stack = []
+_start = None
+
+
+def enable():
+    """
+    Start recording spans, discarding the ones recorded before.
+    """
+    global _events, _start
+
+    _events = []
+    del _stack[:]
+    _start = time.perf_counter()
+
+
+def disable():
+    """
+    Stop recording spans.
+    """
+    global _events
+
+    _events = None
+    del _stack[:]
+
+
+def is_enabled():
+    """
+    Return `True` if spans are recorded.
+    """
+    return _events is not None
+
+
+def get_events():
+    """
+    Return the recorded events, in the order they started.
+    """
+    return sorted(_events or [], key=lambda event: event["ts"])
+
+
+def record_span(name, start, end, category=STAGE, tid=None, **args):
+    """
+    Record a span measured with `time.perf_counter`, like the ones of
+    subprocesses running concurrently, see `span`.
+
+    Spans overlapping without nesting need a different thread id `tid`,
+    by default the one of the current thread.
+    """
+    if _events is None:
+        return
+
+    if category == SUBPROCESS:
+        add_count("subprocess_ms", (end - start) * 1000)
+
+    _events.append(
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - _start) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident() if tid is None else tid,
+            "args": args,
+        }
+    )
+
+
+@contextlib.contextmanager
+def span(name, category=STAGE, **args):
+    """
+    Record the time spent in the block.
+
+    Parameters
+    ----------
+    name: str
+        Name of the span.
+    category: str, optional
+        "api", "stage" or "subprocess". The time of subprocess spans is
+        added to the `subprocess_ms` argument of the open spans.
+    args: dict
+        Arguments of the span, like the locale being processed.
+
+    Yields
+    ------
+    dict
+        Arguments of the span, more can be added to them in the block.
+    """
+    if _events is None:
+        yield args
+        return
+
+    _stack.append(args)
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        _stack.pop()
+        record_span(name, start, time.perf_counter(), category=category, **args)
+
+
+def traced(name=None, category=STAGE):
+    """
+    Decorate a function to record each call in a span, see `span`.
+    """
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return func(*args, **kwargs)
+
+            with span(span_name, category=category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_args(**kwargs):
+    """
+    Set arguments of the innermost open span, like the number of entries.
+    """
+    if _stack:
+        _stack[-1].update(kwargs)
+
+
+def add_count(name, value=1):
+    """
+    Add `value` to the `name` argument of every open span.
+    """
+    for args in _stack:
+        args[name] = args.get(name, 0) + value
+
+
+def get_summary():
+    """
+    Aggregate the recorded spans by name.
+
+    Returns
+    -------
+    OrderedDict
+        Span names, in the order they first started, mapped to the number
+        of `calls`, the total `wall_ms` and the totals of numeric arguments.
+    """
+    summary = OrderedDict()
+    for event in get_events():
+        item = summary.setdefault(event["name"], {"calls": 0, "wall_ms": 0})
+        item["calls"] += 1
+        item["wall_ms"] += event["dur"] / 1000
+        for key, value in event["args"].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                item[key] = item.get(key, 0) + value
+
+    return summary
+
+
+def save_trace(path):
+    """
+    Write the recorded spans to `path` in the Chrome trace event format.
+    """
+    data = {
+        "traceEvents": [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "args": {"name": "jupyterlab-translate"},
+            }
+        ]
+        + get_events(),
+        "displayTimeUnit": "ms",
+        "otherData": {"summary": get_summary()},
+    }
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=1)
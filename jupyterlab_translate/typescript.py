@@ -0,0 +1,560 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Tokenizer based extractor for TypeScript and TSX translation calls.
+
+It finds translation calls like `trans.__("text")` or
+`this._trans._np("context", "text", "texts")` where the arguments are string
+literals, template literals without substitutions or concatenations of them.
+"""
+import re
+
+# Constants
+RECEIVERS = (("trans",), ("this", "_trans"))
+METHODS = {
+    # method: (text index, plural index, context index)
+    "__": (0, None, None),
+    "gettext": (0, None, None),
+    "_n": (0, 1, None),
+    "ngettext": (0, 1, None),
+    "_p": (1, None, 0),
+    "pgettext": (1, None, 0),
+    "_np": (1, 2, 0),
+    "npgettext": (1, 2, 0),
+}
+TRANSLATION_CALLS = {
+    receiver + (method,): indexes
+    for receiver in RECEIVERS
+    for method, indexes in METHODS.items()
+}
+MAX_CALLEE_LENGTH = max(len(callee) for callee in TRANSLATION_CALLS)
+
+# Words after which a quote or slash starts a literal instead of being part
+# of an expression (or of JSX text)
+KEYWORDS = {
+    "as",
+    "await",
+    "case",
+    "declare",
+    "default",
+    "delete",
+    "do",
+    "else",
+    "export",
+    "extends",
+    "from",
+    "import",
+    "in",
+    "instanceof",
+    "is",
+    "keyof",
+    "module",
+    "new",
+    "of",
+    "return",
+    "throw",
+    "typeof",
+    "void",
+    "yield",
+}
+# Words starting a statement, the comments before them describe its calls
+STATEMENT_KEYWORDS = {"const", "export", "let", "return", "throw", "var"}
+
+NAME_RE = re.compile(r"[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*")
+JSX_TAG_RE = re.compile(r"<\s*(>|[A-Za-z_$][\w$.:-]*)")
+GENERIC_RE = re.compile(r"\s*(,|extends\b)")
+NUMBER_RE = re.compile(
+    r"0[xXoObB][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?"
+)
+ESCAPE_RE = re.compile(
+    r"\\(u\{[\da-fA-F]+\}|u[\da-fA-F]{4}|x[\da-fA-F]{2}|\r\n|[\s\S])"
+)
+SIMPLE_ESCAPES = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "0": "\0",
+    "\n": "",
+    "\r": "",
+    "\r\n": "",
+    "\u2028": "",
+    "\u2029": "",
+}
+
+# Token kinds
+NAME = "name"
+NUMBER = "number"
+PUNCT = "punct"
+REGEX = "regex"
+STRING = "string"
+TEMPLATE = "template"
+
+# JSX scanning modes
+CODE = "code"
+TAG = "tag"
+TEXT = "text"
+
+
+def _unescape(match):
+    value = match.group(1)
+    if value[0] == "u":
+        return chr(int(value[1:].strip("{}"), 16))
+    elif value[0] == "x" and len(value) == 3:
+        return chr(int(value[1:], 16))
+
+    return SIMPLE_ESCAPES.get(value, value)
+
+
+def unescape_string(value):
+    """
+    Decode the escape sequences of a JavaScript string literal body.
+    """
+    if "\\" not in value:
+        return value
+
+    return ESCAPE_RE.sub(_unescape, value)
+
+
+def _expects_expression(previous):
+    """
+    Check if a literal can start after the `previous` token.
+    """
+    if previous is None:
+        return True
+
+    kind, value = previous[0], previous[1]
+    if kind == NAME:
+        return value in KEYWORDS
+    elif kind == PUNCT:
+        return value not in ")]}"
+
+    return False
+
+
+def _clean_comment(text):
+    if text.startswith("/*"):
+        lines = text[2:-2].split("\n")
+        return "\n".join(line.strip().lstrip("*").strip() for line in lines).strip()
+
+    return text[2:].strip()
+
+
+def _starts_jsx_element(source, pos, previous):
+    """
+    Check if the `<` at `pos` opens a JSX element instead of being a
+    comparison or the type parameters of a generic arrow function.
+    """
+    if not _expects_expression(previous):
+        return False
+
+    match = JSX_TAG_RE.match(source, pos)
+    return bool(match) and not GENERIC_RE.match(source, match.end())
+
+
+def tokenize(source, jsx=False):
+    """
+    Split TypeScript/TSX source code into tokens.
+
+    This is not a complete lexer, it only needs to tell apart names,
+    punctuation, string and template literals, regular expressions and
+    comments well enough to find translation calls. Quotes following a name
+    (as in JSX text like `Don't`) do not start a string.
+
+    With `jsx`, the text between JSX tags is skipped, so slashes and quotes
+    in it are not read as comments, regular expressions or strings.
+
+    Parameters
+    ----------
+    source: str
+        Source code.
+    jsx: bool, optional
+        Parse JSX elements, for TSX files.
+
+    Returns
+    -------
+    tuple
+        A list of `(kind, value, line)` tokens and a dictionary mapping token
+        indexes to the `(start_line, end_line, text, own_line)` comments found
+        right before them. The value of string tokens is the decoded string,
+        and template literals with substitutions have a `None` value.
+    """
+    tokens = []
+    comments = {}
+    pending_comments = []
+    # Brace depth where each open template substitution started
+    templates = []
+    # Mode to go back to when each open JSX element ends, and the brace depth
+    # and mode where each open JSX expression container started
+    elements = []
+    containers = []
+    mode = CODE
+    closing_tag = False
+    depth = 0
+    line = 1
+    line_has_token = False
+    pos = 0
+    length = len(source)
+
+    def scan_template(pos, line):
+        # Scan a template literal body from `pos` until the closing backtick
+        # or the start of a substitution.
+        start = pos
+        while pos < length:
+            char = source[pos]
+            if char == "\\":
+                if source.startswith("\n", pos + 1):
+                    line += 1
+
+                pos += 2
+                continue
+            elif char == "`":
+                return pos + 1, line, source[start:pos], False
+            elif char == "$" and source.startswith("${", pos):
+                return pos + 2, line, source[start:pos], True
+            elif char == "\n":
+                line += 1
+
+            pos += 1
+
+        return pos, line, source[start:pos], False
+
+    while pos < length:
+        if mode == TEXT:
+            # JSX text ends at a tag or an expression container
+            end = pos
+            while end < length and source[end] not in "<{":
+                end += 1
+
+            line += source.count("\n", pos, end)
+            pos = end
+            if pos == length:
+                break
+
+        char = source[pos]
+        if mode == TEXT and char == "<":
+            closing_tag = source.startswith("</", pos)
+            if not closing_tag:
+                elements.append(TEXT)
+
+            tokens.append((PUNCT, char, line))
+            mode = TAG
+            pos += 2 if closing_tag else 1
+            continue
+        elif char == "\n":
+            line += 1
+            line_has_token = False
+            pos += 1
+            continue
+        elif char in " \t\r\f\v\ufeff\u00a0":
+            pos += 1
+            continue
+
+        previous = tokens[-1] if tokens else None
+
+        # Comments
+        if source.startswith("//", pos):
+            end = source.find("\n", pos)
+            end = length if end == -1 else end
+            pending_comments.append(
+                (line, line, _clean_comment(source[pos:end]), not line_has_token)
+            )
+            pos = end
+            continue
+        elif source.startswith("/*", pos):
+            end = source.find("*/", pos + 2)
+            end = length if end == -1 else end + 2
+            text = source[pos:end]
+            end_line = line + text.count("\n")
+            pending_comments.append(
+                (line, end_line, _clean_comment(text), not line_has_token)
+            )
+            line = end_line
+            pos = end
+            continue
+
+        if pending_comments:
+            comments[len(tokens)] = pending_comments
+            pending_comments = []
+
+        line_has_token = True
+
+        if mode == TAG and (char == ">" or source.startswith("/>", pos)):
+            tokens.append((PUNCT, ">", line))
+            if char == ">" and not closing_tag:
+                mode = TEXT
+                pos += 1
+            else:
+                mode = elements.pop()
+                closing_tag = False
+                pos += 1 if char == ">" else 2
+        elif mode != CODE and char == "{":
+            # JSX expression container
+            containers.append((depth, mode))
+            tokens.append((PUNCT, char, line))
+            depth += 1
+            mode = CODE
+            pos += 1
+        elif jsx and char == "<" and _starts_jsx_element(source, pos, previous):
+            elements.append(mode)
+            tokens.append((PUNCT, char, line))
+            mode = TAG
+            pos += 1
+        elif char in "'\"":
+            end = pos + 1
+            while end < length and source[end] not in (char, "\n"):
+                end += 2 if source[end] == "\\" else 1
+
+            if end < length and source[end] == char and _expects_expression(previous):
+                value = unescape_string(source[pos + 1 : end])
+                tokens.append((STRING, value, line))
+                # Escaped line breaks continue the string on the next line
+                line += source.count("\n", pos, end)
+                pos = end + 1
+                continue
+
+            # Not a string literal, most likely an apostrophe in JSX text
+            tokens.append((PUNCT, char, line))
+            pos += 1
+        elif char == "`":
+            start_line = line
+            pos, line, body, substitution = scan_template(pos + 1, line)
+            if substitution:
+                templates.append(depth)
+                tokens.append((TEMPLATE, None, start_line))
+            else:
+                tokens.append((STRING, unescape_string(body), start_line))
+        elif char == "}" and templates and templates[-1] == depth:
+            # End of a template substitution, continue with the template
+            templates.pop()
+            pos, line, __, substitution = scan_template(pos + 1, line)
+            if substitution:
+                templates.append(depth)
+        elif char == "}" and containers and containers[-1][0] == depth - 1:
+            # End of a JSX expression container, continue with the element
+            depth, mode = containers.pop()
+            tokens.append((PUNCT, char, line))
+            pos += 1
+        elif (
+            char == "/"
+            and _expects_expression(previous)
+            and previous != (PUNCT, "<", line)
+        ):
+            # Regular expression literal, they can not span several lines
+            end = pos + 1
+            in_class = False
+            while end < length and source[end] != "\n":
+                current = source[end]
+                if current == "\\":
+                    end += 2
+                    continue
+                elif current == "[":
+                    in_class = True
+                elif current == "]":
+                    in_class = False
+                elif current == "/" and not in_class:
+                    break
+
+                end += 1
+
+            if end < length and source[end] == "/":
+                # Skip the regular expression flags
+                match = NAME_RE.match(source, end + 1)
+                tokens.append((REGEX, source[pos : end + 1], line))
+                pos = match.end() if match else end + 1
+            else:
+                tokens.append((PUNCT, char, line))
+                pos += 1
+        else:
+            match = NAME_RE.match(source, pos)
+            if match:
+                tokens.append((NAME, match.group(), line))
+                pos = match.end()
+                continue
+
+            match = NUMBER_RE.match(source, pos)
+            if match and match.end() > pos:
+                tokens.append((NUMBER, match.group(), line))
+                pos = match.end()
+                continue
+
+            if char in "([{":
+                depth += 1
+            elif char in ")]}":
+                depth -= 1
+
+            tokens.append((PUNCT, char, line))
+            pos += 1
+
+    return tokens, comments
+
+
+def _literal_value(tokens):
+    """
+    Return the value of an argument made of string literals joined with `+`.
+    """
+    if not tokens:
+        return None
+
+    parts = []
+    for idx, (kind, value, __) in enumerate(tokens):
+        if idx % 2 == 0:
+            if kind != STRING or value is None:
+                return None
+
+            parts.append(value)
+        elif (kind, value) != (PUNCT, "+"):
+            return None
+
+    if len(tokens) % 2 == 0:
+        return None
+
+    return "".join(parts)
+
+
+def _collect_arguments(tokens, start, count):
+    """
+    Collect the tokens of the first `count` arguments of the call whose
+    opening parenthesis is at `start`.
+    """
+    args = []
+    current = []
+    depth = 0
+    for token in tokens[start + 1 :]:
+        kind, value = token[0], token[1]
+        if kind == PUNCT and value in "([{":
+            depth += 1
+        elif kind == PUNCT and value in ")]}":
+            if depth == 0:
+                args.append(current)
+                break
+
+            depth -= 1
+        elif kind == PUNCT and value == "," and depth == 0:
+            args.append(current)
+            current = []
+            if len(args) == count:
+                break
+
+            continue
+
+        current.append(token)
+
+    return args
+
+
+def _leading_comment(comments, index, line):
+    """
+    Return the comments written on the lines right before the token at index.
+    """
+    texts = []
+    expected_line = line - 1
+    for start_line, end_line, text, own_line in reversed(comments.get(index, [])):
+        if not own_line or end_line != expected_line:
+            break
+
+        texts.insert(0, text)
+        expected_line = start_line - 1
+
+    return "\n".join(text for text in texts if text)
+
+
+def _statement_comment(tokens, comments, index):
+    """
+    Return the comments written right before the statement holding the
+    token at `index`, or right before the token closest to it that has any.
+    """
+    depth = 0
+    for idx in range(index, -1, -1):
+        kind, value, line = tokens[idx]
+        if idx in comments:
+            return _leading_comment(comments, idx, line)
+        elif idx == 0 or (depth == 0 and kind == NAME and value in STATEMENT_KEYWORDS):
+            break
+
+        kind, value, previous_line = tokens[idx - 1]
+        if kind != PUNCT:
+            continue
+        elif value in ")]":
+            depth += 1
+        elif value == "}":
+            # The end of a block on a previous line ends the statement before
+            if depth == 0 and previous_line < line:
+                break
+
+            depth += 1
+        elif value in "([":
+            depth = max(depth - 1, 0)
+        elif value == "{":
+            if depth == 0:
+                break
+
+            depth -= 1
+        elif value == ";" and depth == 0:
+            break
+
+    return ""
+
+
+def extract_typescript(source, jsx=False):
+    """
+    Extract translation calls from TypeScript/TSX source code.
+
+    Parameters
+    ----------
+    source: str
+        Source code.
+    jsx: bool, optional
+        Parse JSX elements, for TSX files.
+
+    Yields
+    ------
+    tuple
+        `(line, context, text, plural, comment)` for each translation call
+        found. `context`, `plural` and `comment` can be `None`.
+    """
+    tokens, comments = tokenize(source, jsx=jsx)
+    for idx, token in enumerate(tokens):
+        if token[0] != NAME or token[1] not in ("trans", "this"):
+            continue
+
+        if idx > 0 and tokens[idx - 1][:2] == (PUNCT, "."):
+            continue
+
+        # Read a dotted `name.name...` callee followed by a parenthesis
+        callee = [token[1]]
+        end = idx + 1
+        while (
+            len(callee) < MAX_CALLEE_LENGTH
+            and end + 1 < len(tokens)
+            and tokens[end][:2] == (PUNCT, ".")
+            and tokens[end + 1][0] == NAME
+        ):
+            callee.append(tokens[end + 1][1])
+            end += 2
+
+        indexes = TRANSLATION_CALLS.get(tuple(callee))
+        if indexes is None or end >= len(tokens) or tokens[end][:2] != (PUNCT, "("):
+            continue
+
+        text_idx, plural_idx, context_idx = indexes
+        count = max(index for index in indexes if index is not None) + 1
+        args = _collect_arguments(tokens, end, count)
+        values = [_literal_value(arg) for arg in args]
+        values.extend([None] * (count - len(values)))
+
+        text = values[text_idx]
+        plural = None if plural_idx is None else values[plural_idx]
+        context = None if context_idx is None else values[context_idx]
+        if (
+            not text
+            or (plural_idx is not None and plural is None)
+            or (context_idx is not None and context is None)
+        ):
+            continue
+
+        line = token[2]
+        comment = _statement_comment(tokens, comments, idx) or None
+        yield line, context, text, plural, comment
@@ -2,30 +2,85 @@
 # Distributed under the terms of the Modified BSD License.
 """
 """
+import bisect
+import functools
 import importlib
 import json
 import os
+import re
 import shutil
-import subprocess
 import sys
 import tempfile
+import time
+from collections import namedtuple
 from collections import OrderedDict
+from json.decoder import scanstring
+from json.scanner import NUMBER_RE
 
 import babel
 import polib
-from cookiecutter.main import cookiecutter
-
+from babel.messages.catalog import Message
+from babel.messages.catalog import TranslationError
+from babel.messages.checkers import python_format
+
+from . import tracing
+from .catalog import Catalog
+from .catalog import CatalogEntry
+from .catalog import make_occurrence
 from .constants import COOKIECUTTER_URL
 from .constants import EXTENSIONS_FOLDER
+from .constants import EXTRACTION_CACHE
 from .constants import JUPYTERLAB
 from .constants import LANG_PACKS_FOLDER
 from .constants import LC_MESSAGES
 from .constants import LOCALE_FOLDER
+from .constants import PACKAGES_FOLDER
 from .constants import TRANSLATIONS_FOLDER
+from .converters import convert_catalog_to_json
+from .converters import get_nplurals
+from .extractors import BABEL
+from .extractors import catalog_to_entries
+from .extractors import extract_source_strings
+from .extractors import extract_typescript_strings
+from .extractors import load_extraction_cache
+from .extractors import prune_file_hashes
+from .extractors import save_extraction_cache
+from .extractors import TYPESCRIPT
+from .locales import check_locale
+from .merge import load_template
+from .merge import merge_template
+from .parallel import parallel_map
+from .processes import Command
+from .processes import run_commands
+from .walker import IGNORE_FILES
+from .walker import walk_files
+from .writers import merge_write_stats
+from .writers import open_if_changed
+from .writers import write_if_changed
 
 # Constants
 HERE = os.path.abspath(os.path.dirname(__file__))
 
+# Files read by the extraction, see `find_catalog_files`
+CatalogFiles = namedtuple(
+    "CatalogFiles", ["source", "typescript", "package_json", "schemas"]
+)
+
+# Template parsed by each update worker, see `_init_update_worker`
+_update_template = None
+# Settings schemas parsed by the current process, by path, see
+# `extract_schema_strings`
+_schemas = {}
+JSON_CONSTANTS = (
+    ("true", True),
+    ("false", False),
+    ("null", None),
+    ("NaN", float("nan")),
+    ("Infinity", float("inf")),
+    ("-Infinity", float("-inf")),
+)
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
 # --- Helpers
 # ----------------------------------------------------------------------------
 def get_version(repo_root_path, project):
@@ -86,6 +141,7 @@ def get_version(repo_root_path, project):
     return version
 
 
+@tracing.traced()
 def create_new_language_pack(output_dir, locale, cookiecutter_url=COOKIECUTTER_URL):
     """
     Creates a new language pack python package with cookiecutter.
@@ -97,6 +153,9 @@ def create_new_language_pack(output_dir, locale, cookiecutter_url=COOKIECUTTER_U
     locale: str
         FIXME:
     """
+    # Only needed to create language packs, and slow to import
+    from cookiecutter.main import cookiecutter
+
     if not check_locale(locale):
         raise Exception("Invalid locale!")
 
@@ -107,17 +166,38 @@ def create_new_language_pack(output_dir, locale, cookiecutter_url=COOKIECUTTER_U
     )
 
 
-def check_locale(locale):
-    """Check if a locale is a valid value."""
-    value = False
-    try:
-        val = babel.Locale.parse(locale)
-        value = True
-    except Exception as e:
-        print(str(e))
-        value = False
+def get_language_pack_dir(language_packs_repo_dir, project, locale):
+    """
+    Return the folder where the compiled catalogs of a project are published
+    in the language pack of a locale.
 
-    return value
+    Parameters
+    ----------
+    language_packs_repo_dir: str
+        Path to the language packs repository.
+    project: str
+        Normalized project name.
+    locale: str
+        Locale of the language pack.
+
+    Returns
+    -------
+    tuple
+        Path of the language pack package and of the output folder.
+    """
+    language_packs_dir = os.path.join(language_packs_repo_dir, LANG_PACKS_FOLDER)
+    pkg_name = "jupyterlab-language-pack-{locale}".format(locale=locale).replace(
+        "_", "-"
+    )
+    locale_language_pack_dir = os.path.join(
+        language_packs_dir, pkg_name, pkg_name.replace("-", "_")
+    )
+    if project == JUPYTERLAB:
+        output_dir = os.path.join(locale_language_pack_dir)
+    else:
+        output_dir = os.path.join(locale_language_pack_dir, EXTENSIONS_FOLDER)
+
+    return locale_language_pack_dir, output_dir
 
 
 def find_locales(output_dir):
@@ -138,6 +218,9 @@ def find_locales(output_dir):
     locale_path = os.path.join(output_dir, LOCALE_FOLDER)
     folders = os.listdir(locale_path) if os.path.isdir(locale_path) else []
     for locale_folder in folders:
+        if not os.path.isdir(os.path.join(locale_path, locale_folder)):
+            continue
+
         if locale_folder not in locales and check_locale(locale_folder):
             locales.add(locale_folder)
 
@@ -146,7 +229,9 @@ def find_locales(output_dir):
 
 # --- Find source files
 # ----------------------------------------------------------------------------
-def find_packages_source_files(packages_path):
+def find_packages_source_files(
+    packages_path, extensions=(".ts", ".py"), ignore_root=None, stats=None
+):
     """
     FIXME:
 
@@ -154,6 +239,12 @@ def find_packages_source_files(packages_path):
     ----------
     packages_path: str
         FIXME:
+    extensions: sequence
+        File extensions to look for.
+    ignore_root: str, optional
+        Repository root, see `find_source_files`.
+    stats: dict, optional
+        Walk statistics, see `find_source_files`.
 
     Returns
     -------
@@ -161,10 +252,18 @@ def find_packages_source_files(packages_path):
         FIXME:
     """
     package_files = OrderedDict()
-    for pkg_name in os.listdir(packages_path):
-        files = find_source_files(os.path.join(packages_path, pkg_name))
-        if files:
-            package_files[pkg_name] = files
+    files = find_source_files(
+        packages_path, extensions=extensions, ignore_root=ignore_root, stats=stats
+    )
+    for path in files:
+        parts = os.path.relpath(path, packages_path).split(os.sep)
+        if parts[0] == PACKAGES_FOLDER:
+            # Monorepo workspace, keep each package on its own
+            parts = ["/".join(parts[:2])] + parts[2:]
+
+        # Files at the top level are not part of any package
+        if len(parts) > 1:
+            package_files.setdefault(parts[0], []).append(path)
 
     return package_files
 
@@ -173,54 +272,181 @@ def find_source_files(
     path,
     extensions=(".ts", ".py"),
     skip_folders=("tests", "test", "node_modules", "lib", ".git", ".ipynb_checkpoints"),
+    ignore_files=IGNORE_FILES,
+    ignore_root=None,
+    stats=None,
 ):
     """
     Find source files in given `path`.
 
+    Skipped folders and paths excluded by `.gitignore` style files are pruned
+    before being walked into.
+
     Parameters
     ----------
     extensions: sequence
         FIXME:
     skip_folders: sequence
         FIXME:
+    ignore_files: sequence
+        Names of `.gitignore` style files to honor.
+    ignore_root: str, optional
+        Repository root containing `path`, ignore files found between them
+        also apply.
+    stats: dict, optional
+        If given, the number of "scanned" and "skipped" entries is added to it.
 
     Returns
     -------
     list
         FIXME:
     """
-    all_files = []
-    for root, _dirs, files in os.walk(path, topdown=False):
-        for name in files:
-            fpath = os.path.join(root, name)
-            if any(
-                "{sep}{skip_folder}{sep}".format(sep=os.sep, skip_folder=skip_folder)
-                in fpath
-                for skip_folder in skip_folders
-            ):
-                continue
+    return walk_files(
+        path,
+        extensions,
+        skip_folders=skip_folders,
+        ignore_files=ignore_files,
+        ignore_root=ignore_root,
+        stats=stats,
+    )
+
+
+def find_schema_files(input_path, stats=None):
+    """
+    Find the `package.json` files and the settings schemas they declare.
+
+    Parameters
+    ----------
+    input_path: str
+        Repository root path.
+    stats: dict, optional
+        Walk statistics, see `find_source_files`.
+
+    Returns
+    -------
+    tuple
+        Lists of `package.json` paths and of schema paths.
+    """
+    input_paths = find_source_files(
+        input_path, extensions=("package.json",), stats=stats
+    )
+    schema_paths = []
+    for path in input_paths:
+        if os.path.isfile(path):
+            with open(path, "r") as fh:
+                data = json.load(fh)
+
+            schema_dir = data.get("jupyterlab", {}).get("schemaDir", None)
+            if schema_dir is not None:
+                schema_path = os.path.join(os.path.dirname(path), schema_dir)
+                if os.path.isdir(schema_path):
+                    for p in os.listdir(schema_path):
+                        if p.endswith(".json"):
+                            schema_paths.append(os.path.join(schema_path, p))
+
+    return input_paths, schema_paths
+
+
+def find_catalog_files(repo_root_dir, stats=None):
+    """
+    Find the files read when creating the catalog of a repository.
+
+    Parameters
+    ----------
+    repo_root_dir: str
+        Repository root path.
+    stats: dict, optional
+        Walk statistics, see `find_source_files`.
+
+    Returns
+    -------
+    CatalogFiles
+        Source and TypeScript/TSX files by package, see
+        `find_packages_source_files` and `find_typescript_files`, and the
+        `package.json` and schema paths, see `find_schema_files`.
+    """
+    source = find_packages_source_files(repo_root_dir, stats=stats)
+    typescript = find_typescript_files(repo_root_dir, stats=stats)
+    package_json, schemas = find_schema_files(repo_root_dir, stats=stats)
+    return CatalogFiles(source, typescript, package_json, schemas)
+
+
+def find_extraction_files(repo_root_dir, project, catalog_files=None):
+    """
+    Find every file read when extracting the strings of a repository.
+
+    Parameters
+    ----------
+    repo_root_dir: str
+        Repository root path.
+    project: str
+        Project name, used to find the files holding its version.
+    catalog_files: CatalogFiles, optional
+        Files found by `find_catalog_files`, the repository is walked to find
+        them if not given.
+
+    Returns
+    -------
+    list
+        Sorted file paths.
+    """
+    if catalog_files is None:
+        catalog_files = find_catalog_files(repo_root_dir)
 
-            if fpath.endswith(extensions):
-                all_files.append(fpath)
+    paths = set(catalog_files.package_json + catalog_files.schemas)
+    for files in catalog_files.source.values():
+        paths.update(files)
 
-    return all_files
+    for files in catalog_files.typescript.values():
+        paths.update(files)
+
+    for name in ("_version.py", "__init__.py", "package.json"):
+        path = os.path.join(repo_root_dir, project, name)
+        if os.path.isfile(path):
+            paths.add(path)
+
+    return sorted(paths)
 
 
 # --- .pot and .po generation
 # ----------------------------------------------------------------------------
+@tracing.traced()
 def extract_tsx_strings(input_path):
     """
     Use gettext-extract to extract strings from TSX files.
 
     Parameters
     ----------
-    temp_output_path: str
-        FIXME:
+    input_path: str
+        Repository root path.
 
     Returns
     -------
-    str
-        FIXME:
+    list
+        Extracted entries.
+    """
+    command, output_path, config_path = get_tsx_command(input_path)
+    try:
+        run_commands([command])
+        return read_tsx_entries(output_path)
+    finally:
+        remove_files([output_path, config_path])
+
+
+def get_tsx_command(input_path):
+    """
+    Prepare the `gettext-extract` command extracting strings from TSX files.
+
+    Parameters
+    ----------
+    input_path: str
+        Repository root path.
+
+    Returns
+    -------
+    tuple
+        The `Command` to run, the path of the `.pot` file it writes and the
+        path of its configuration file, to remove once it ran.
     """
     __, output_path = tempfile.mkstemp(suffix=".pot")
     if "~" in input_path:
@@ -289,12 +515,16 @@ def extract_tsx_strings(input_path):
     with open(config_path, "w") as fh:
         fh.write(json.dumps(config))
 
-    cmd = ["gettext-extract", "--config", config_path]
-    p = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=input_path
+    command = Command(
+        "gettext-extract", ["gettext-extract", "--config", config_path], input_path
     )
-    p.communicate()
+    return command, output_path, config_path
+
 
+def read_tsx_entries(output_path):
+    """
+    Read the entries of a `.pot` file written by `gettext-extract`.
+    """
     # Fix the missing format
     with open(output_path, "r") as fh:
         lines = ["#, fuzzy"] + fh.read().split("\n")
@@ -302,61 +532,119 @@ def extract_tsx_strings(input_path):
     with open(output_path, "w") as fh:
         fh.write("\n".join(lines))
 
-    entries = []
     pot = polib.pofile(output_path, wrapwidth=100000)
-    for entry in pot:
-        occurrences = []
-        for (string_fpath, line) in entry.occurrences:
-            # Convert absolute paths to relative paths
-            occurrences.append((string_fpath, line))
-
-        data = {"msgid": entry.msgid, "occurrences": occurrences}
-
-        if entry.msgid_plural:
-            data["msgid_plural"] = entry.msgid_plural
-            data["msgstr_plural"] = entry.msgstr_plural
-
-        if entry.msgctxt:
-            data["msgctxt"] = entry.msgctxt
-
-        if entry.comment:
-            data["comment"] = entry.comment
+    entries = [CatalogEntry.from_poentry(entry) for entry in pot]
+    tracing.set_args(tsx_entries=len(entries))
+    return entries
 
-        if entry.encoding:
-            data["encoding"] = entry.encoding
 
-        if entry.obsolete:
-            data["obsolete"] = entry.obsolete
+def remove_files(paths):
+    """
+    Remove temporary files, ignoring the ones that are already gone.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
-        entries.append(data)
 
-    try:
-        os.remove(config_path)
-    except Exception:
-        pass
+def load_json_with_lines(text):
+    """
+    Parse a JSON document keeping track of the line of every string value.
 
-    try:
-        os.remove(input_path)
-    except Exception:
-        pass
+    Parameters
+    ----------
+    text: str
+        JSON document.
 
-    return entries
+    Returns
+    -------
+    tuple
+        The parsed data and a dictionary mapping the path of every string
+        value, e.g. `("properties", "name", "title")`, to its line number.
+    """
+    newlines = [match.start() for match in re.finditer("\n", text)]
+    lines = {}
+
+    def skip(pos):
+        return WHITESPACE_RE.match(text, pos).end()
+
+    def parse(pos, path):
+        pos = skip(pos)
+        char = text[pos : pos + 1]
+        if char == "{":
+            value = {}
+            pos = skip(pos + 1)
+            if text[pos : pos + 1] == "}":
+                return value, pos + 1
+
+            while True:
+                if text[pos : pos + 1] != '"':
+                    raise ValueError("Expecting property name at {}".format(pos))
+
+                key, pos = scanstring(text, pos + 1)
+                pos = skip(pos)
+                if text[pos : pos + 1] != ":":
+                    raise ValueError("Expecting ':' delimiter at {}".format(pos))
+
+                value[key], pos = parse(pos + 1, path + (key,))
+                pos = skip(pos)
+                char = text[pos : pos + 1]
+                if char == "}":
+                    return value, pos + 1
+                elif char != ",":
+                    raise ValueError("Expecting ',' delimiter at {}".format(pos))
+
+                pos = skip(pos + 1)
+        elif char == "[":
+            value = []
+            pos = skip(pos + 1)
+            if text[pos : pos + 1] == "]":
+                return value, pos + 1
+
+            while True:
+                item, pos = parse(pos, path + (len(value),))
+                value.append(item)
+                pos = skip(pos)
+                char = text[pos : pos + 1]
+                if char == "]":
+                    return value, pos + 1
+                elif char != ",":
+                    raise ValueError("Expecting ',' delimiter at {}".format(pos))
+
+                pos += 1
+        elif char == '"':
+            lines[path] = bisect.bisect_left(newlines, pos) + 1
+            return scanstring(text, pos + 1)
+
+        for literal, value in JSON_CONSTANTS:
+            if text.startswith(literal, pos):
+                return value, pos + len(literal)
+
+        match = NUMBER_RE.match(text, pos)
+        if match is None:
+            raise ValueError("Expecting value at {}".format(pos))
+
+        integer, fraction, exponent = match.groups()
+        if fraction or exponent:
+            value = float(integer + (fraction or "") + (exponent or ""))
+        else:
+            value = int(integer)
 
+        return value, match.end()
 
-def get_line(lines, value):
-    value1 = '"' + value + '"'
-    value2 = "'" + value + "'"
-    line_count = 0
-    for idx, line in enumerate(lines):
-        # TODO: Might be needed for other escaped chars?
-        line = line.replace(r"\n", "\n")
-        if value1 in line or value2 in line:
-            line_count = idx + 1
+    data, pos = parse(0, ())
+    if skip(pos) != len(text):
+        raise ValueError("Extra data at {}".format(pos))
 
-    return str(line_count)
+    return data, lines
 
 
-def extract_schema_strings(input_path):
+@tracing.traced()
+def extract_schema_strings(
+    input_path, stats=None, changed_files=None, schema_paths=None
+):
     """
     Use gettext-extract to extract strings from TSX files.
 
@@ -364,80 +652,82 @@ def extract_schema_strings(input_path):
     ----------
     temp_output_path: str
         FIXME:
+    changed_files: collection, optional
+        Paths of the files changed since the previous call in this process,
+        the other schemas are not parsed again.
+    schema_paths: list, optional
+        Schema paths, see `find_schema_files`. The repository is walked to
+        find them if not given.
 
     Returns
     -------
     str
         FIXME:
     """
-    input_paths = find_source_files(input_path, extensions=("package.json",))
-    schema_paths = []
-    message_context = "schema"
+    if schema_paths is None:
+        schema_paths = find_schema_files(input_path, stats=stats)[1]
 
-    for path in input_paths:
-        if os.path.isfile(path):
-            with open(path, "r") as fh:
-                data = json.load(fh)
+    # Forget the schemas removed since the previous call
+    for path in set(_schemas).difference(schema_paths):
+        del _schemas[path]
 
-            schema_dir = data.get("jupyterlab", {}).get("schemaDir", None)
-            if schema_dir is not None:
-                schema_path = os.path.join(os.path.dirname(path), schema_dir)
-                if os.path.isdir(schema_path):
-                    for p in os.listdir(schema_path):
-                        if p.endswith(".json"):
-                            schema_paths.append(os.path.join(schema_path, p))
+    message_context = "schema"
 
     entries = []
     for path in schema_paths:
         if os.path.isfile(path):
-            with open(path, "r") as fh:
-                data = fh.read()
-                schema = json.loads(data)
-                schema_lines = data.split("\n")
+            if changed_files is None or path in changed_files or path not in _schemas:
+                with open(path, "r") as fh:
+                    _schemas[path] = load_json_with_lines(fh.read())
+
+            schema, schema_lines = _schemas[path]
 
             ref_path = path.replace(input_path, "")
+
+            def get_occurrence(*keys):
+                return make_occurrence(ref_path, schema_lines.get(keys, 0))
+
             title = schema["title"].replace("\n", "</br/>")
             entries.append(
-                dict(
+                CatalogEntry(
                     msgctxt=message_context,
                     msgid=title,
-                    occurrences=[(ref_path, get_line(schema_lines, schema["title"]))],
+                    occurrences=[get_occurrence("title")],
                 )
             )
             desc = schema["description"].replace("\n", "</br/>")
             entries.append(
-                dict(
+                CatalogEntry(
                     msgctxt=message_context,
                     msgid=desc,
-                    occurrences=[
-                        (ref_path, get_line(schema_lines, schema["description"]))
-                    ],
+                    occurrences=[get_occurrence("description")],
                 )
             )
-            for __, values in schema.get("properties", {}).items():
+            for name, values in schema.get("properties", {}).items():
                 title = values.get("title", None)
                 if title is not None:
                     entries.append(
-                        dict(
+                        CatalogEntry(
                             msgid=title.replace("\n", "</br/>"),
-                            occurrences=[(ref_path, get_line(schema_lines, title))],
+                            occurrences=[get_occurrence("properties", name, "title")],
                         )
                     )
                 description = values.get("description", "")
                 entries.append(
-                    dict(
+                    CatalogEntry(
                         msgctxt=message_context,
                         msgid=description.replace("\n", "</br/>"),
-                        occurrences=[(ref_path, get_line(schema_lines, description))],
+                        occurrences=[get_occurrence("properties", name, "description")],
                     )
                 )
 
+    tracing.set_args(files=len(schema_paths), entries=len(entries))
     return entries
 
 
 def extract_strings(input_paths, output_path, project, version):
     """
-    Extract localizable strings on input files.
+    Extract localizable strings on input files with `pybabel extract`.
 
     Parameters
     ----------
@@ -455,9 +745,24 @@ def extract_strings(input_paths, output_path, project, version):
     str
         Output path.
     """
+    run_commands([get_extract_command(input_paths, output_path, project, version)])
+    return os.path.join(os.getcwd(), output_path)
+
+
+def get_extract_command(input_paths, output_path, project, version):
+    """
+    Prepare the `pybabel extract` command, see `extract_strings`.
+
+    Returns
+    -------
+    Command
+        Command to run.
+    """
     mapping = os.path.join(HERE, "pybabel_config.cfg")
     cmd = [
         "pybabel",
+        # Only report warnings and errors, not each file
+        "--quiet",
         "extract",
         "--no-wrap",
         "--charset=utf-8",
@@ -467,24 +772,28 @@ def extract_strings(input_paths, output_path, project, version):
         "--version={version}".format(version=version),
         "--mapping={mapping}".format(mapping=mapping),
     ] + input_paths
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    p.communicate()
-    return os.path.join(os.getcwd(), output_path)
+    return Command("pybabel extract", cmd, None)
 
 
-def fix_location(path, pot_path, append_entries=None):
+@tracing.traced()
+def fix_location(path, pot, append_entries=None):
     """
-    Remove any hardcoded paths on the pot file.
+    Remove any hardcoded paths on the pot catalog.
 
     Parameters
     ----------
-    pot_file: str
+    path: str
         FIXME:
-    append_entries: list of dict
+    pot: Catalog
+        Catalog to update in place.
+    append_entries: list of CatalogEntry
         FIXME:
+
+    Returns
+    -------
+    Catalog
+        The updated catalog.
     """
-    # Do not add column wrapping by using a large value!
-    pot = polib.pofile(pot_path, wrapwidth=100000, check_for_duplicates=False)
     remove_path = path
     for entry in pot:
         new_occurrences = []
@@ -495,13 +804,13 @@ def fix_location(path, pot_path, append_entries=None):
             string_fpaths.append(os.path.abspath(string_fpath))
             lines.append(line)
 
-            if line != "":
+            if line is not None:
                 string_fpath = " ".join(string_fpaths).replace(remove_path, "")
 
                 # Normalize paths
                 string_fpath = string_fpath.replace("\\", "/")
 
-                new_occurrences.append((string_fpath, line))
+                new_occurrences.append(make_occurrence(string_fpath, line))
                 string_fpaths = []
                 lines = []
 
@@ -509,22 +818,35 @@ def fix_location(path, pot_path, append_entries=None):
 
     if append_entries:
         for entry in append_entries:
-            entry = polib.POEntry(**entry)
             pot.append(entry)
 
-    pot.save(pot_path)
-    return pot.metadata.copy()
+    return pot
 
 
-def remove_duplicates(pot_path, metadata):
+@tracing.traced()
+def remove_duplicates(pot, metadata):
     """
     FIXME:
+
+    Parameters
+    ----------
+    pot: Catalog
+        Catalog with possibly duplicated entries.
+    metadata: dict
+        FIXME:
+
+    Returns
+    -------
+    Catalog
+        New catalog with the merged entries, sorted by occurrence.
     """
-    old_pot_name = pot_path + ".bak"
-    os.rename(pot_path, old_pot_name)
-    pot = polib.pofile(old_pot_name, wrapwidth=100000, check_for_duplicates=False)
-    entries = {}
-    entries_data = {}
+
+    def occurrence_key(occurrence):
+        path, line = occurrence
+        return path, "" if line is None else str(line)
+
+    # Entries by unique key, duplicates share the first entry
+    entries = OrderedDict()
     duplicates = set()
     for entry in pot:
         # Remove empty msgid
@@ -533,33 +855,29 @@ def remove_duplicates(pot_path, metadata):
 
         # Create a unique key using context, singular and plurals
         key = (entry.msgctxt, entry.msgid, entry.msgid_plural)
-        if key in entries:
-            entries[key].append(entry)
-            duplicates.add(key)
+        first = entries.get(key)
+        if first is None:
+            entry.occurrences.sort(key=occurrence_key)
+            entries[key] = entry
         else:
-            entry.occurrences = list(sorted(entry.occurrences))
-            entries[key] = [entry]
-            entries_data[key] = entry
+            if key not in duplicates:
+                # Merged entries only keep the message and the occurrences
+                entries[key] = first = CatalogEntry(
+                    msgid=first.msgid,
+                    msgid_plural=first.msgid_plural,
+                    msgctxt=first.msgctxt,
+                    occurrences=first.occurrences,
+                    num_plurals=first.num_plurals,
+                )
+                duplicates.add(key)
+
+            first.occurrences.extend(entry.occurrences)
 
     # Merge info from duplicate
     print("Merging duplicates...")
     for key in duplicates:
-        items = entries[key]
-        entry = entries_data[key]
-        new_occurences = []
-        for item in items:
-            new_occurences.extend(item.occurrences)
-
-        entry = polib.POEntry(
-            msgid=entry.msgid,
-            msgid_plural=entry.msgid_plural,
-            msgctxt=entry.msgctxt,
-            occurrences=list(sorted(new_occurences)),
-        )
-
-        entries[key] = [entry]
+        entries[key].occurrences.sort(key=occurrence_key)
 
-    po = polib.POFile(wrapwidth=100000)
     keys = [
         "Project-Id-Version",
         "MIME-Version",
@@ -570,22 +888,78 @@ def remove_duplicates(pot_path, metadata):
     for key in keys:
         new_metadata[key] = metadata[key]
 
-    po.metadata = new_metadata
-    for item in sorted(entries, key=lambda x: entries[x][0].occurrences):
-        po.append(entries[item][0])
+    tracing.set_args(entries=len(entries), duplicates=len(duplicates))
+    return Catalog(
+        metadata=new_metadata,
+        entries=sorted(entries.values(), key=lambda entry: entry.sort_key()),
+    )
+
 
-    po.save(pot_path)
+@tracing.traced()
+def save_catalog(pot, pot_path, write_stats=None):
+    """
+    Write the final `.pot` file, unless it has not changed.
 
-    with open(pot_path, "r") as fh:
-        data = fh.read()
+    Parameters
+    ----------
+    pot: Catalog
+        Catalog to write.
+    pot_path: str
+        Output path.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+    """
+    tracing.set_args(entries=len(pot.entries))
+    with open_if_changed(pot_path, stats=write_stats) as fh:
+        for text in pot.iter_text():
+            fh.write(text.replace(r"</br/>", r"\n"))
 
-    with open(pot_path, "w") as fh:
-        fh.write(data.replace(r"</br/>", r"\n"))
 
-    os.remove(old_pot_name)
+def find_typescript_files(repo_root_dir, stats=None):
+    """
+    Find the TypeScript/TSX files of the `packages` folder, skipping specs.
 
+    Parameters
+    ----------
+    repo_root_dir: str
+        Repository root path.
+    stats: dict, optional
+        Walk statistics, see `find_source_files`.
 
-def create_catalog(repo_root_dir, locale_dir, project, version):
+    Returns
+    -------
+    dict
+        Mapping of package name to the list of its source file paths.
+    """
+    packages_path = os.path.join(repo_root_dir, PACKAGES_FOLDER)
+    if not os.path.isdir(packages_path):
+        return OrderedDict()
+
+    package_files = find_packages_source_files(
+        packages_path,
+        extensions=(".ts", ".tsx"),
+        ignore_root=repo_root_dir,
+        stats=stats,
+    )
+    for pkg_name, files in package_files.items():
+        package_files[pkg_name] = [f for f in files if not f.endswith(".spec.ts")]
+
+    return package_files
+
+
+@tracing.traced()
+def create_catalog(
+    repo_root_dir,
+    locale_dir,
+    project,
+    version,
+    engine="native",
+    jobs=1,
+    use_cache=True,
+    write_stats=None,
+    changed_files=None,
+    catalog_files=None,
+):
     """
     FIXME:
 
@@ -599,25 +973,124 @@ def create_catalog(repo_root_dir, locale_dir, project, version):
         FIXME:
     version: str
         FIXME:
+    engine: str, optional
+        Use "native" to extract python and typescript strings in process, or
+        "external" to run the `pybabel extract` and `gettext-extract`
+        commands instead.
+    jobs: int, optional
+        Number of worker processes used to extract packages in parallel with
+        the "native" engine. `None` or `0` use all available cores.
+    use_cache: bool, optional
+        Reuse the strings extracted from unchanged files on previous runs with
+        the "native" engine. The cache is stored in `locale_dir`.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+    changed_files: collection, optional
+        Paths of the files changed since the previous extraction in this
+        process, only they are read again by the "native" engine. By default
+        every file is read.
+    catalog_files: CatalogFiles, optional
+        Files to extract, see `find_catalog_files`. The repository is walked
+        to find them if not given.
+
+    Returns
+    -------
+    tuple
+        Path where the `.pot` file belongs and the in memory catalog, which is
+        not written by this function.
     """
     pot_path = os.path.join(locale_dir, "{project}.pot".format(project=project))
-    nested_files = find_packages_source_files(repo_root_dir)
-    flat_files = [item for sublist in nested_files.values() for item in sublist]
-    extract_strings(flat_files, pot_path, project, version=version)
-    append_entries_tsx = extract_tsx_strings(repo_root_dir)
-    append_entries_schemas = extract_schema_strings(repo_root_dir)
+    walk_stats = {}
+    if catalog_files is None:
+        catalog_files = find_catalog_files(repo_root_dir, stats=walk_stats)
+
+    nested_files = catalog_files.source
+    if engine == "external":
+        flat_files = [item for sublist in nested_files.values() for item in sublist]
+        # Extract to a temporary file, the `.pot` file is only written if the
+        # final catalog changes
+        extract_path = pot_path + ".extract"
+        tsx_command, tsx_path, tsx_config_path = get_tsx_command(repo_root_dir)
+        try:
+            # Both extractors and the schema scan read different files
+            _results, append_entries_schemas = run_commands(
+                [
+                    get_extract_command(flat_files, extract_path, project, version),
+                    tsx_command,
+                ],
+                functools.partial(
+                    extract_schema_strings,
+                    repo_root_dir,
+                    schema_paths=catalog_files.schemas,
+                ),
+            )
+            # Do not add column wrapping by using a large value!
+            pot = Catalog.from_pofile(
+                polib.pofile(extract_path, wrapwidth=100000, check_for_duplicates=False)
+            )
+            append_entries_tsx = read_tsx_entries(tsx_path)
+        finally:
+            remove_files([extract_path, tsx_path, tsx_config_path])
+
+        append_entries_source = []
+    else:
+        cache_path = os.path.join(locale_dir, EXTRACTION_CACHE)
+        cache = load_extraction_cache(cache_path if use_cache else None)
+        source_catalog = extract_source_strings(
+            nested_files,
+            project,
+            version,
+            jobs=jobs,
+            cache=cache[BABEL],
+            changed_files=changed_files,
+        )
+        append_entries_source = catalog_to_entries(source_catalog, repo_root_dir)
+        append_entries_tsx = extract_typescript_strings(
+            catalog_files.typescript,
+            repo_root_dir,
+            jobs=jobs,
+            cache=cache[TYPESCRIPT],
+            changed_files=changed_files,
+        )
+        save_extraction_cache(cache_path, cache, write_stats=write_stats)
+        pot = Catalog(metadata=dict(source_catalog.mime_headers))
+        append_entries_schemas = extract_schema_strings(
+            repo_root_dir,
+            changed_files=changed_files,
+            schema_paths=catalog_files.schemas,
+        )
+        # Forget the files removed since the previous extraction
+        extracted_files = set()
+        for package_files in (nested_files, catalog_files.typescript):
+            for files in package_files.values():
+                extracted_files.update(files)
+
+        prune_file_hashes(extracted_files)
+
+    if walk_stats:
+        print(
+            "Scanned {scanned} entries, skipped {skipped}".format(
+                scanned=walk_stats["scanned"], skipped=walk_stats["skipped"]
+            )
+        )
+
     print(
         "\nTotal entries: {}\n".format(
             len(append_entries_schemas) + len(append_entries_tsx)
         )
     )
-    metadata = fix_location(
-        repo_root_dir, pot_path, append_entries_tsx + append_entries_schemas
+    pot = fix_location(
+        repo_root_dir,
+        pot,
+        append_entries_source + append_entries_tsx + append_entries_schemas,
     )
-    return pot_path, metadata
+    files = {path for entry in pot.entries for (path, _line) in entry.occurrences}
+    tracing.set_args(engine=engine, files=len(files), entries=len(pot.entries))
+    return pot_path, pot
 
 
-def update_catalogs(pot_path, output_dir, locale):
+@tracing.traced()
+def update_catalogs(pot_path, output_dir, locale, template=None, write_stats=None):
     """
     Create new locale `.po` files or update and merge if they already exist.
 
@@ -631,70 +1104,198 @@ def update_catalogs(pot_path, output_dir, locale):
         Domain will be infered from the `pot_path`.
     locale: str
         FIXME:
+    template: babel.messages.catalog.Catalog, optional
+        Template already parsed from `pot_path`, to avoid parsing it again for
+        each locale.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+
+    Returns
+    -------
+    bool
+        `True` if the `.po` file was created or changed.
     """
     if not check_locale(locale):
-        return
+        return False
 
+    tracing.set_args(locale=locale)
     pot_path = pot_path.replace("\\", "/")
     domain = pot_path.rsplit("/")[-1].replace(".pot", "")
+    if template is None:
+        template = load_template(pot_path)
 
     # Check if locale exists!
     po_path = "{output_dir}/{locale}/LC_MESSAGES/{domain}.po".format(
         output_dir=output_dir, locale=locale, domain=domain
     )
-    command = "update" if os.path.isfile(po_path) else "init"
-    cmd = [
-        "pybabel",
-        command,
-        "--domain={domain}".format(domain=domain),
-        "--input-file={pot_path}".format(pot_path=pot_path),
-        "--output-dir={output_dir}".format(output_dir=output_dir),
-        "--locale={locale}".format(locale=locale),
-    ]
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    p.communicate()
+    return merge_template(
+        template, po_path, locale, domain=domain, write_stats=write_stats
+    )
 
 
-def compile_catalog(locale_dir, domain, locale):
+def check_catalog(po, nplurals):
     """
-    Compile `*.po` files into `*.mo` files and saved them next to the
-    original po files found.
+    Check the translated entries of a catalog, like `pybabel compile` does.
 
     Parameters
     ----------
-    output_dir: str
+    po: polib.POFile
+        Catalog to check.
+    nplurals: int
+        Number of plural forms of the catalog language.
+
+    Returns
+    -------
+    list
+        List of `(line, error)` tuples.
+    """
+    errors = []
+    for entry in po.translated_entries():
+        if entry.msgid_plural:
+            msgstrs = [msgstr for __, msgstr in sorted(entry.msgstr_plural.items())]
+            if len(msgstrs) != nplurals:
+                errors.append(
+                    (
+                        entry.linenum,
+                        "Wrong number of plural forms (expected {})".format(nplurals),
+                    )
+                )
+
+            message = Message(
+                (entry.msgid, entry.msgid_plural),
+                tuple(msgstrs),
+                flags=entry.flags,
+            )
+        else:
+            message = Message(entry.msgid, entry.msgstr, flags=entry.flags)
+
+        try:
+            python_format(None, message)
+        except TranslationError as e:
+            errors.append((entry.linenum, str(e)))
+
+    return errors
+
+
+def get_catalog_path(locale_dir, domain, locale, extension=".po"):
+    """
+    Return the path of a locale catalog file.
+    """
+    return os.path.join(
+        locale_dir,
+        locale,
+        LC_MESSAGES,
+        "{domain}{extension}".format(domain=domain, extension=extension),
+    )
+
+
+@tracing.traced()
+def read_catalog(po_path, check=True):
+    """
+    Parse a `.po` file for compilation.
+
+    Parameters
+    ----------
+    po_path: str
+        Path to the `.po` file.
+    check: bool, optional
+        Report the errors found in the translations, see `check_catalog`,
+        and raise an exception if there are any.
+
+    Returns
+    -------
+    polib.POFile
+        Parsed catalog.
+    """
+    if not os.path.isfile(po_path):
+        raise Exception("Catalog `{po_path}` not found!".format(po_path=po_path))
+
+    try:
+        # Do not add column wrapping by using a large value!
+        po = polib.pofile(po_path, wrapwidth=100000)
+    except (IOError, ValueError) as e:
+        raise Exception(
+            "Could not parse `{po_path}`: {error}".format(po_path=po_path, error=e)
+        )
+
+    tracing.set_args(entries=len(po))
+    if check:
+        errors = check_catalog(po, get_nplurals(po))
+        for line, error in errors:
+            print(
+                "error: {po_path}:{line}: {error}".format(
+                    po_path=po_path, line=line, error=error
+                )
+            )
+
+        if errors:
+            raise Exception(
+                "Catalog `{po_path}` has {count} errors!".format(
+                    po_path=po_path, count=len(errors)
+                )
+            )
+
+    return po
+
+
+@tracing.traced()
+def compile_catalog(locale_dir, domain, locale, minify=False, write_stats=None):
+    """
+    Compile a `.po` file into `.mo` and Jed `.json` files and saved them next
+    to the original po file.
+
+    The catalog is parsed once for both outputs. An exception is raised if
+    the catalog is missing, can not be parsed or has errors in its
+    translations, see `read_catalog`.
+
+    Parameters
+    ----------
+    locale_dir: str
         FIXME:
     domain: str
         FIXME:
     locale: str, optional
         FIXME:
-    """
-    # Check if locale exists!
-    cmd = [
-        "pybabel",
-        "compile",
-        "--domain={domain}".format(domain=domain),
-        "--dir={locale_dir}".format(locale_dir=locale_dir),
-        "--locale={locale}".format(locale=locale),
-    ]
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    p.communicate()
+    minify: bool, optional
+        Write the JSON file without whitespace.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
 
-    return os.path.join(
-        locale_dir, locale, LC_MESSAGES, "{domain}.po".format(domain=domain)
+    Returns
+    -------
+    tuple
+        Paths of the `.mo` and `.json` files.
+    """
+    tracing.set_args(locale=locale)
+    po_path = get_catalog_path(locale_dir, domain, locale)
+    po = read_catalog(po_path)
+    mo_path = os.path.splitext(po_path)[0] + ".mo"
+    write_if_changed(mo_path, po.to_binary(), stats=write_stats)
+    json_path = convert_catalog_to_json(
+        po_path,
+        os.path.dirname(po_path),
+        domain,
+        po=po,
+        minify=minify,
+        write_stats=write_stats,
     )
-
-
-def compile_to_mo(po_path):
-    po = polib.pofile(po_path)
-    mo_path = po_path.replace(".po", ".mo")
-    po.save_as_mofile(mo_path)
-    return mo_path
+    return mo_path, json_path
 
 
 # --- Global methods
 # ----------------------------------------------------------------------------
-def extract_translations(repo_root_dir, output_dir, project):
+@tracing.traced()
+def extract_translations(
+    repo_root_dir,
+    output_dir,
+    project,
+    engine="native",
+    jobs=1,
+    use_cache=True,
+    write_stats=None,
+    changed_files=None,
+    catalog_files=None,
+):
     """
     FIXME:
 
@@ -706,6 +1307,18 @@ def extract_translations(repo_root_dir, output_dir, project):
         FIXME:
     project:
         FIXME:
+    engine: str, optional
+        Extraction engine, see `create_catalog`.
+    jobs: int, optional
+        Number of worker processes, see `create_catalog`.
+    use_cache: bool, optional
+        Reuse strings extracted on previous runs, see `create_catalog`.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
+    changed_files: collection, optional
+        Files changed since the previous extraction, see `create_catalog`.
+    catalog_files: CatalogFiles, optional
+        Files to extract, see `create_catalog`.
     """
     # Load version from setup.py
     version = get_version(repo_root_dir, project)
@@ -713,12 +1326,56 @@ def extract_translations(repo_root_dir, output_dir, project):
     # Extract pot file
     locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
     os.makedirs(locale_dir, exist_ok=True)
-    pot_path, metadata = create_catalog(repo_root_dir, locale_dir, project, version)
-    remove_duplicates(pot_path, metadata)
+    pot_path, pot = create_catalog(
+        repo_root_dir,
+        locale_dir,
+        project,
+        version,
+        engine=engine,
+        jobs=jobs,
+        use_cache=use_cache,
+        write_stats=write_stats,
+        changed_files=changed_files,
+        catalog_files=catalog_files,
+    )
+    pot = remove_duplicates(pot, pot.metadata)
+    save_catalog(pot, pot_path, write_stats=write_stats)
     return pot_path
 
 
-def update_translations(repo_root_dir, output_dir, project, locales=None):
+def _init_update_worker(pot_path):
+    """
+    Parse the template once for all the locales updated by a worker.
+    """
+    global _update_template
+    _update_template = (pot_path, load_template(pot_path))
+
+
+def _update_locale(args):
+    """
+    Update the catalog of a locale with the template of the worker.
+    """
+    locale_dir, locale = args
+    pot_path, template = _update_template
+    start = time.time()
+    write_stats = {}
+    changed = update_catalogs(
+        pot_path, locale_dir, locale, template=template, write_stats=write_stats
+    )
+    return locale, changed, time.time() - start, write_stats
+
+
+@tracing.traced()
+def update_translations(
+    repo_root_dir,
+    output_dir,
+    project,
+    locales=None,
+    engine="native",
+    jobs=1,
+    use_cache=True,
+    write_stats=None,
+):
     """
     FIXME:
 
@@ -732,25 +1389,73 @@ def update_translations(repo_root_dir, output_dir, project, locales=None):
         FIXME:
     locales: sequence
         FIXME:
-    """
-    # # Find locales, if not there, error?
-    # locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
-    # if locales is None:
-    #     locales = find_locales(output_dir)
+    engine: str, optional
+        Extraction engine, see `create_catalog`.
+    jobs: int, optional
+        Number of worker processes used to extract strings and to update the
+        locales in parallel. `None` or `0` use all available cores.
+    use_cache: bool, optional
+        Reuse strings extracted on previous runs, see `create_catalog`.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
 
-    # # Load version from setup.py
-    # version = get_version(repo_root_dir, project)
+    Returns
+    -------
+    dict
+        Locales mapped to `True` if their `.po` file was created or changed.
+    """
+    locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
+    if not locales:
+        locales = find_locales(output_dir)
 
-    # # Extract pot file
-    # os.makedirs(locale_dir, exist_ok=True)
-    # pot_path = create_catalog(repo_root_dir, locale_dir, project, version)
+    # Extract pot file once for all the locales
+    pot_path = extract_translations(
+        repo_root_dir,
+        output_dir,
+        project,
+        engine=engine,
+        jobs=jobs,
+        use_cache=use_cache,
+        write_stats=write_stats,
+    )
 
     # Create or update po files
-    for locale in locales:
-        update_catalogs(pot_path, locale_dir, locale)
+    start = time.time()
+    results = parallel_map(
+        _update_locale,
+        [(locale_dir, locale) for locale in locales],
+        jobs=jobs,
+        initializer=_init_update_worker,
+        initargs=(pot_path,),
+    )
+    changes = OrderedDict()
+    for locale, changed, elapsed, locale_write_stats in results:
+        changes[locale] = changed
+        if write_stats is not None:
+            merge_write_stats(write_stats, locale_write_stats)
+
+        print(
+            "{status} `{locale}` in {elapsed:.2f}s".format(
+                status="Updated" if changed else "No changes for",
+                locale=locale,
+                elapsed=elapsed,
+            )
+        )
 
+    print(
+        "\nUpdated {changed} of {total} locales in {elapsed:.2f}s\n".format(
+            changed=sum(changes.values()),
+            total=len(changes),
+            elapsed=time.time() - start,
+        )
+    )
+    return changes
 
-def compile_translations(output_dir, project, locales=None):
+
+@tracing.traced()
+def compile_translations(
+    output_dir, project, locales=None, minify=False, write_stats=None
+):
     """
     FIXME:
 
@@ -762,19 +1467,24 @@ def compile_translations(output_dir, project, locales=None):
         FIXME:
     locales: sequence
         FIXME:
+    minify: bool, optional
+        Write the JSON files without whitespace.
+    write_stats: dict, optional
+        Written and unchanged file counts, see `writers.record_write`.
 
     Returns
     -------
     dict
-        FIXME:
+        Locales mapped to the paths of their `.mo` and `.json` files.
     """
-    if locales is None:
+    if not locales:
         locales = find_locales(output_dir)
 
     locale_dir = os.path.join(output_dir, LOCALE_FOLDER)
-    po_paths = {}
+    compiled_paths = {}
     for locale in locales:
-        po_path = compile_catalog(locale_dir, project, locale)
-        po_paths[locale] = po_path
+        compiled_paths[locale] = compile_catalog(
+            locale_dir, project, locale, minify=minify, write_stats=write_stats
+        )
 
-    return po_paths
+    return compiled_paths
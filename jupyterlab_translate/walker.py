@@ -0,0 +1,237 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Filesystem walker pruning skipped folders and honoring ignore files.
+"""
+import os
+import re
+from collections import namedtuple
+
+# Constants
+IGNORE_FILES = (".gitignore",)
+
+IgnoreRule = namedtuple("IgnoreRule", ["regex", "negate", "dir_only", "base"])
+
+
+def _translate_pattern(pattern):
+    """
+    Translate a `.gitignore` glob pattern into a regular expression.
+    """
+    regex = []
+    idx = 0
+    length = len(pattern)
+    while idx < length:
+        char = pattern[idx]
+        if pattern.startswith("**/", idx):
+            regex.append("(?:.*/)?")
+            idx += 3
+            continue
+        elif pattern.startswith("**", idx):
+            regex.append(".*")
+            idx += 2
+            continue
+        elif char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", idx + 2)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                group = pattern[idx + 1 : end]
+                if group.startswith("!"):
+                    group = "^" + group[1:]
+
+                regex.append("[{}]".format(group.replace("\\", "\\\\")))
+                idx = end
+        elif char == "\\" and idx + 1 < length:
+            idx += 1
+            regex.append(re.escape(pattern[idx]))
+        else:
+            regex.append(re.escape(char))
+
+        idx += 1
+
+    return re.compile("".join(regex) + "$")
+
+
+def parse_ignore_file(path, base):
+    """
+    Parse a `.gitignore` style file.
+
+    Parameters
+    ----------
+    path: str
+        Path to the ignore file.
+    base: str
+        Directory of the ignore file, relative to the walked root, using
+        forward slashes. Patterns are matched relative to it.
+
+    Returns
+    -------
+    list
+        List of `IgnoreRule` named tuples.
+    """
+    rules = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            lines = fh.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+
+        # Trailing spaces are ignored unless escaped
+        pattern = re.sub(r"(?<!\\) +$", "", line)
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            continue
+
+        # Patterns with a slash are relative to the ignore file directory,
+        # other patterns match a name at any depth
+        if "/" not in pattern:
+            pattern = "**/" + pattern
+
+        regex = _translate_pattern(pattern.lstrip("/"))
+        rules.append(IgnoreRule(regex, negate, dir_only, base))
+
+    return rules
+
+
+def is_ignored(rel_path, is_dir, rules):
+    """
+    Check if `rel_path` is ignored by the given rules, the last match wins.
+
+    Parameters
+    ----------
+    rel_path: str
+        Path relative to the walked root, using forward slashes.
+    is_dir: bool
+        Whether `rel_path` is a directory.
+    rules: list
+        List of `IgnoreRule` named tuples.
+    """
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+
+        if rule.base:
+            if not rel_path.startswith(rule.base + "/"):
+                continue
+
+            path = rel_path[len(rule.base) + 1 :]
+        else:
+            path = rel_path
+
+        if rule.regex.match(path):
+            ignored = not rule.negate
+
+    return ignored
+
+
+def walk_files(
+    path,
+    extensions,
+    skip_folders=(),
+    ignore_files=IGNORE_FILES,
+    ignore_root=None,
+    stats=None,
+):
+    """
+    Walk `path` top-down and return the files ending with `extensions`.
+
+    Folders in `skip_folders` and paths matched by the ignore files found on
+    the way are pruned before being entered.
+
+    Parameters
+    ----------
+    path: str
+        Path to walk.
+    extensions: sequence
+        File name endings to look for.
+    skip_folders: sequence
+        Folder names that are never entered.
+    ignore_files: sequence
+        Names of `.gitignore` style files to honor.
+    ignore_root: str, optional
+        Ancestor of `path`, usually the repository root. Ignore files found
+        between it and `path` also apply.
+    stats: dict, optional
+        If given, the "scanned" and "skipped" entry counts are added to it.
+
+    Returns
+    -------
+    list
+        Sorted paths of the files found.
+    """
+    extensions = tuple(extensions)
+    skip_folders = set(skip_folders)
+    all_files = []
+    scanned = skipped = 0
+
+    rel_root = ""
+    rules = []
+    if ignore_root is not None:
+        rel_root = os.path.relpath(path, ignore_root).replace(os.sep, "/")
+        rel_root = "" if rel_root == "." else rel_root
+        parts = rel_root.split("/") if rel_root else []
+        for idx in range(len(parts)):
+            base = "/".join(parts[:idx])
+            dir_path = os.path.join(ignore_root, *parts[:idx])
+            for ignore_file in ignore_files:
+                ignore_path = os.path.join(dir_path, ignore_file)
+                if os.path.isfile(ignore_path):
+                    rules = rules + parse_ignore_file(ignore_path, base)
+
+    # Stack of (directory path, relative path, ignore rules)
+    stack = [(path, rel_root, rules)]
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+        for ignore_file in ignore_files:
+            ignore_path = os.path.join(dir_path, ignore_file)
+            if os.path.isfile(ignore_path):
+                rules = rules + parse_ignore_file(ignore_path, rel_dir)
+
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            scanned += 1
+            rel_path = "/".join([rel_dir, entry.name]) if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if entry.name in skip_folders or is_ignored(rel_path, True, rules):
+                    skipped += 1
+                else:
+                    sub_dirs.append((entry.path, rel_path, rules))
+            elif entry.name.endswith(extensions):
+                if is_ignored(rel_path, False, rules):
+                    skipped += 1
+                else:
+                    all_files.append(entry.path)
+
+        # Reversed so that folders are visited in alphabetical order
+        stack.extend(reversed(sub_dirs))
+
+    if stats is not None:
+        stats["scanned"] = stats.get("scanned", 0) + scanned
+        stats["skipped"] = stats.get("skipped", 0) + skipped
+
+    return all_files
@@ -0,0 +1,126 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Watch the source files of a repository for changes.
+
+The files read by the extraction, and the folders holding them up to the
+repository root, are polled for changes of their size and modification
+time. Polling needs no platform specific notification API, and checking
+the few thousand files of a large repository takes a few milliseconds.
+A changed folder means files were added, removed or renamed, and a changed
+`package.json` can declare other settings schemas, so the repository is
+walked again.
+"""
+import os
+import time
+
+from .utils import find_catalog_files
+from .utils import find_extraction_files
+
+# Constants
+DEFAULT_INTERVAL = 0.25
+
+
+def get_stamps(paths):
+    """
+    Return the `(size, mtime_ns)` of each path, or `None` if it is missing.
+    """
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamps[path] = None
+        else:
+            stamps[path] = (stat.st_size, stat.st_mtime_ns)
+
+    return stamps
+
+
+def get_parent_dirs(paths, root_dir):
+    """
+    Return the folders holding `paths`, and their parents up to `root_dir`.
+    """
+    root_dir = os.path.abspath(root_dir)
+    dirs = {root_dir}
+    for path in paths:
+        path = os.path.dirname(os.path.abspath(path))
+        while path not in dirs and path.startswith(root_dir):
+            dirs.add(path)
+            path = os.path.dirname(path)
+
+    return sorted(dirs)
+
+
+class SourceWatcher:
+    """
+    Poll the files read when extracting the strings of a repository.
+
+    Parameters
+    ----------
+    repo_root_dir: str
+        Repository root path.
+    project: str
+        Project name.
+    """
+
+    def __init__(self, repo_root_dir, project):
+        self.repo_root_dir = repo_root_dir
+        self.project = project
+        self.files = []
+        self.catalog_files = None
+        self._file_stamps = {}
+        self._dir_stamps = {}
+        self.scan()
+
+    def scan(self):
+        """
+        Walk the repository and record the current state of its files.
+        """
+        self.catalog_files = find_catalog_files(self.repo_root_dir)
+        self.files = find_extraction_files(
+            self.repo_root_dir, self.project, catalog_files=self.catalog_files
+        )
+        self._file_stamps = get_stamps(self.files)
+        self._dir_stamps = get_stamps(get_parent_dirs(self.files, self.repo_root_dir))
+
+    def poll(self):
+        """
+        Return the files added, removed or modified since the last poll.
+
+        Returns
+        -------
+        list
+            Sorted file paths.
+        """
+        file_stamps = get_stamps(self._file_stamps)
+        changed = {
+            path
+            for (path, stamp) in file_stamps.items()
+            if stamp != self._file_stamps[path]
+        }
+        rescan = any(os.path.basename(path) == "package.json" for path in changed)
+        if rescan or get_stamps(self._dir_stamps) != self._dir_stamps:
+            old_files = set(self.files)
+            self.scan()
+            changed.update(old_files.symmetric_difference(self.files))
+            file_stamps = self._file_stamps
+
+        self._file_stamps = file_stamps
+        return sorted(changed)
+
+    def wait(self, interval=DEFAULT_INTERVAL):
+        """
+        Poll every `interval` seconds until a file changes.
+
+        Returns
+        -------
+        list
+            Sorted paths of the changed files.
+        """
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+
+            time.sleep(interval)
@@ -0,0 +1,205 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Output helpers that leave files untouched when their content is the same.
+
+Rewriting identical files bumps their modification time, which triggers
+downstream rebuilds and cache invalidation. Every generated file goes
+through these helpers, which can count written and unchanged files in a
+`stats` dictionary.
+"""
+import contextlib
+import hashlib
+import os
+import shutil
+
+from . import tracing
+
+# Constants
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+
+
+def get_content_hash(path):
+    """
+    Return the sha256 hex digest of a file content, or `None` if missing.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def record_write(stats, changed, path=None):
+    """
+    Count a written or unchanged file in `stats`, if given.
+
+    The size of a written `path` is added to the `bytes_written` of the
+    open tracing spans.
+    """
+    if stats is not None:
+        key = WRITTEN if changed else UNCHANGED
+        stats[key] = stats.get(key, 0) + 1
+
+    if changed and path is not None and tracing.is_enabled():
+        tracing.add_count("bytes_written", os.path.getsize(path))
+
+
+def merge_write_stats(stats, other):
+    """
+    Add the counts of `other` to `stats`.
+    """
+    for key in (WRITTEN, UNCHANGED):
+        if other.get(key):
+            stats[key] = stats.get(key, 0) + other[key]
+
+
+def report_write_stats(stats):
+    """
+    Print how many files were written and how many were already up to date.
+    """
+    print(
+        "Wrote {written} files, {unchanged} unchanged".format(
+            written=stats.get(WRITTEN, 0), unchanged=stats.get(UNCHANGED, 0)
+        )
+    )
+
+
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except OSError:
+        # Different file systems
+        shutil.copyfile(src, dst)
+        os.remove(src)
+
+
+def write_if_changed(path, data, stats=None):
+    """
+    Write `data` to `path` unless the file already has that content.
+
+    Parameters
+    ----------
+    path: str
+        Output path, parent folders are created if needed.
+    data: str or bytes
+        Content, text is encoded as utf-8.
+    stats: dict, optional
+        Written and unchanged file counts, see `record_write`.
+
+    Returns
+    -------
+    bool
+        `True` if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    changed = hashlib.sha256(data).hexdigest() != get_content_hash(path)
+    if changed:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = "{path}.{pid}.tmp".format(path=path, pid=os.getpid())
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+
+        _replace(tmp_path, path)
+
+    record_write(stats, changed, path)
+    return changed
+
+
+@contextlib.contextmanager
+def open_if_changed(path, mode="w", stats=None):
+    """
+    Open a temporary file that replaces `path` on close only if the content
+    is different.
+
+    Parameters
+    ----------
+    path: str
+        Output path, parent folders are created if needed.
+    mode: str, optional
+        "w" for text, written as utf-8, or "wb" for binary content.
+    stats: dict, optional
+        Written and unchanged file counts, see `record_write`.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = "{path}.{pid}.tmp".format(path=path, pid=os.getpid())
+    encoding = None if "b" in mode else "utf-8"
+    try:
+        with open(tmp_path, mode, encoding=encoding) as fh:
+            yield fh
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    changed = get_content_hash(tmp_path) != get_content_hash(path)
+    if changed:
+        _replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+
+    record_write(stats, changed, path)
+
+
+def move_if_changed(src, dst, stats=None):
+    """
+    Move `src` to `dst`, leaving `dst` untouched if it has the same content.
+
+    Parameters
+    ----------
+    src: str
+        File to move, it is removed in any case.
+    dst: str
+        Destination path.
+    stats: dict, optional
+        Written and unchanged file counts, see `record_write`.
+
+    Returns
+    -------
+    bool
+        `True` if `dst` was replaced.
+    """
+    changed = get_content_hash(src) != get_content_hash(dst)
+    if changed:
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        _replace(src, dst)
+    else:
+        os.remove(src)
+
+    record_write(stats, changed, dst)
+    return changed
+
+
+def copy_if_changed(src, dst, stats=None):
+    """
+    Copy `src` to `dst`, leaving `dst` untouched if it has the same content.
+
+    Parameters
+    ----------
+    src: str
+        File to copy.
+    dst: str
+        Destination path.
+    stats: dict, optional
+        Written and unchanged file counts, see `record_write`.
+
+    Returns
+    -------
+    bool
+        `True` if `dst` was replaced.
+    """
+    changed = get_content_hash(src) != get_content_hash(dst)
+    if changed:
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        tmp_path = "{path}.{pid}.tmp".format(path=dst, pid=os.getpid())
+        shutil.copyfile(src, tmp_path)
+        _replace(tmp_path, dst)
+
+    record_write(stats, changed, dst)
+    return changed
@@ -0,0 +1,28 @@
+import { ITranslator } from '@jupyterlab/translation';
+
+export function addCommands(translator: ITranslator, n: number): void {
+  const trans = translator.load('jupyterlab');
+
+  // Label of the command opening a notebook
+  const label = trans.__('Open Notebook');
+  const caption = trans._n('%1 file', '%1 files', n);
+  const pattern = /\/path\//g;
+  const url = 'https://jupyter.org'; // A trailing comment is not extracted
+  const menu = trans._p('menu', 'File');
+
+  /* Comments of several
+   * lines are joined */
+  const title = trans.__('Close ' + 'All');
+  const saved = trans.__(`Save ${label}`);
+  if (n < 2) {
+    // Shown for a single file
+    trans.__('Less than two');
+  }
+  const escaped = trans.__('Don\'t "quote"');
+}
+
+class Panel {
+  constructor() {
+    this._trans._np('panel', 'One panel', 'Many panels', 2);
+  }
+}
@@ -0,0 +1,22 @@
+import * as React from 'react';
+
+export function Links(props: { trans: TranslationBundle }): JSX.Element {
+  const trans = props.trans;
+  // Heading of the links panel
+  const heading = trans.__('Links');
+  return (
+    <div title={trans.__('Links panel')}>
+      <a href="https://jupyter.org">https://jupyter.org</a> {trans.__('See')}
+      <p>/path {trans.__("Slash")}</p>
+      <p>Don't {trans._p('link', 'Open')}</p>
+      {count > 0 && <span>{trans._n('%1 item', '%1 items', count)}</span>}
+      <>// not a comment {trans.__('Fragment')}</>
+      <br />
+    </div>
+  );
+}
+
+export const identity = <T,>(value: T): T => value;
+
+// After a generic arrow function
+const after = trans.__('After generic');
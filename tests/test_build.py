@@ -0,0 +1,65 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import json
+import os
+
+import polib
+
+from jupyterlab_translate.api import build_language_pack
+from jupyterlab_translate.utils import get_language_pack_dir
+
+LOCALE = "es_CO"
+SOURCE = """
+const a = trans.__('Old one');
+const b = trans.__('New one');
+"""
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def translate(po_path):
+    po = polib.pofile(po_path, wrapwidth=100000)
+    for entry in po:
+        entry.msgstr = "ES " + entry.msgid
+
+    po.save(po_path)
+
+
+def test_build_drops_removed_strings(tmp_path):
+    repo_dir = str(tmp_path / "jupyterlab")
+    packs_dir = str(tmp_path / "language-packs")
+    source_path = os.path.join(repo_dir, "packages", "app", "src", "index.ts")
+    write_file(source_path, SOURCE)
+    write_file(
+        os.path.join(repo_dir, "jupyterlab", "_version.py"), "__version__ = '3.0.0'\n"
+    )
+
+    # Avoid creating the language pack with cookiecutter
+    locale_language_pack_dir, pack_dir = get_language_pack_dir(
+        packs_dir, "jupyterlab", LOCALE
+    )
+    os.makedirs(locale_language_pack_dir)
+    json_path = os.path.join(pack_dir, "jupyterlab.json")
+    locale_dir = os.path.join(packs_dir, "jupyterlab", "locale")
+    po_path = os.path.join(locale_dir, LOCALE, "LC_MESSAGES", "jupyterlab.po")
+
+    build_language_pack(repo_dir, packs_dir, "jupyterlab", [LOCALE])
+    translate(po_path)
+    build_language_pack(repo_dir, packs_dir, "jupyterlab", [LOCALE])
+    with open(json_path) as fh:
+        assert "New one" in json.load(fh)
+
+    write_file(source_path, SOURCE.replace("New one", "Newer one"))
+    build_language_pack(repo_dir, packs_dir, "jupyterlab", [LOCALE])
+    with open(json_path) as fh:
+        data = json.load(fh)
+
+    assert "New one" not in data
+    assert data["Old one"] == ["ES Old one"]
+
+    # Nothing is left next to the catalogs
+    assert sorted(os.listdir(os.path.dirname(po_path))) == ["jupyterlab.po"]
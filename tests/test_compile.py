@@ -0,0 +1,52 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import os
+
+from click.testing import CliRunner
+
+from jupyterlab_translate.cli import main
+
+PO = """
+msgid ""
+msgstr ""
+"Project-Id-Version: my_extension 1.0.0\\n"
+"Language: es_CO\\n"
+"Content-Type: text/plain; charset=utf-8\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+
+msgid "Open"
+msgstr "Abrir"
+
+msgid "%(count)s file"
+msgid_plural "%(count)s files"
+msgstr[0] "%(count)s archivo"
+"""
+
+
+def compile_package(tmp_path, text):
+    locale_dir = tmp_path / "my_extension" / "locale" / "es_CO" / "LC_MESSAGES"
+    locale_dir.mkdir(parents=True)
+    (locale_dir / "my_extension.po").write_text(text)
+    result = CliRunner().invoke(
+        main, ["compile", str(tmp_path), "my_extension", "-l", "es_CO"]
+    )
+    return result, sorted(os.listdir(str(locale_dir)))
+
+
+def test_compile(tmp_path):
+    text = PO.replace(
+        '"%(count)s archivo"', '"%(count)s archivo"\nmsgstr[1] "%(count)s archivos"'
+    )
+    result, names = compile_package(tmp_path, text)
+
+    assert result.exit_code == 0, result.output
+    assert names == ["my_extension.json", "my_extension.mo", "my_extension.po"]
+
+
+def test_compile_errors(tmp_path):
+    result, names = compile_package(tmp_path, PO)
+
+    assert result.exit_code != 0
+    assert "Wrong number of plural forms (expected 2)" in result.output
+    assert "has 1 errors" in str(result.exception)
+    assert names == ["my_extension.po"]
@@ -0,0 +1,77 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import json
+
+import polib
+import pytest
+
+from jupyterlab_translate.converters import convert_catalog_to_json
+from jupyterlab_translate.converters import iter_json
+
+DATA = {
+    "": {"domain": "jupyterlab", "language": "es-CO", "version": "3.0.0"},
+    "Open": ["Abrir"],
+    "menu\x04File": ["Archivo"],
+    "%1 cell": ["%1 cells", "%1 celda", "%1 celdas"],
+    'Quote " and é': ['Comilla " y é\nnueva línea'],
+    "Nested": {"list": [1, 2.5, None, True], "empty": {}, "empty_list": []},
+}
+
+
+@pytest.mark.parametrize("data", [DATA, {}, {"a": []}, {"a": {}}])
+def test_iter_json_indented(data):
+    text = "".join(iter_json(data))
+
+    assert text == json.dumps(data, sort_keys=True, indent=4)
+
+
+@pytest.mark.parametrize("data", [DATA, {}, {"a": []}, {"a": {}}])
+def test_iter_json_minified(data):
+    text = "".join(iter_json(data, indent=None))
+
+    assert text == json.dumps(data, sort_keys=True, separators=(",", ":"))
+    assert json.loads(text) == data
+
+
+def test_convert_catalog_to_json_merge(tmp_path):
+    po = polib.POFile()
+    po.metadata = {
+        "Project-Id-Version": "jupyterlab 3.0.0",
+        "Language": "es_CO",
+        "Plural-Forms": "nplurals=2; plural=(n != 1);",
+        "Content-Type": "text/plain; charset=utf-8",
+    }
+    po.append(polib.POEntry(msgid="Open", msgstr="Abrir"))
+    po.append(polib.POEntry(msgid="Kept", msgstr=""))
+    po.append(polib.POEntry(msgid="File", msgctxt="menu", msgstr="Archivo"))
+    po.append(
+        polib.POEntry(
+            msgid="%1 cell",
+            msgid_plural="%1 cells",
+            msgstr_plural={1: "celdas", 0: "celda"},
+        )
+    )
+    po.append(polib.POEntry(msgid="Old", msgstr="Viejo", obsolete=True))
+    po_path = str(tmp_path / "jupyterlab.po")
+    po.save(po_path)
+    old_data = {"": {"domain": "old"}, "Kept": ["Guardado"], "Open": ["Viejo"]}
+    (tmp_path / "jupyterlab.json").write_text(json.dumps(old_data))
+
+    json_path = convert_catalog_to_json(po_path, str(tmp_path), "jupyterlab", po=po)
+
+    with open(json_path) as fh:
+        text = fh.read()
+
+    expected = {
+        "": {
+            "domain": "jupyterlab",
+            "language": "es-CO",
+            "plural_forms": "nplurals=2; plural=(n != 1);",
+            "version": "3.0.0",
+        },
+        "%1 cell": ["%1 cells", "celda", "celdas"],
+        "Kept": ["Guardado"],
+        "Open": ["Abrir"],
+        "menu\x04File": ["Archivo"],
+    }
+    assert text == json.dumps(expected, sort_keys=True, indent=4)
@@ -0,0 +1,66 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+from jupyterlab_translate import extractors
+from jupyterlab_translate import tracing
+
+
+def test_extract_cached_reads_changed_files(tmp_path, monkeypatch):
+    paths = []
+    for name in ("a.py", "b.py", "c.py"):
+        path = tmp_path / name
+        path.write_text("_('{name}')\n".format(name=name))
+        paths.append(str(path))
+
+    hashed = []
+    get_file_hash = extractors.get_file_hash
+
+    def counting_hash(path):
+        hashed.append(path)
+        return get_file_hash(path)
+
+    def extract_batch(batch):
+        return [(path, [path]) for path in batch]
+
+    monkeypatch.setattr(extractors, "get_file_hash", counting_hash)
+    monkeypatch.setattr(extractors, "_file_hashes", {})
+    cache = {}
+    extractors.extract_cached({"pkg": paths}, extract_batch, cache)
+    assert hashed == paths
+
+    hashed.clear()
+    (tmp_path / "b.py").write_text("_('changed')\n")
+    file_hashes = extractors.extract_cached(
+        {"pkg": paths}, extract_batch, cache, changed_files={paths[1]}
+    )
+    assert hashed == [paths[1]]
+    assert file_hashes[paths[1]] == get_file_hash(paths[1])
+    assert len(cache) == 3
+
+    hashed.clear()
+    extractors.extract_cached({"pkg": paths}, extract_batch, cache)
+    assert hashed == paths
+
+
+def test_extract_typescript_strings_span_args(tmp_path):
+    for name in ("a.ts", "b.ts"):
+        (tmp_path / name).write_text(
+            "trans.__('Open');\ntrans.__('{name}');\n".format(name=name)
+        )
+
+    paths = sorted(str(path) for path in tmp_path.iterdir())
+    tracing.enable()
+    try:
+        extractors.extract_typescript_strings({"pkg": paths}, str(tmp_path))
+        events = tracing.get_events()
+    finally:
+        tracing.disable()
+
+    (event,) = [e for e in events if e["name"] == "extract_typescript_strings"]
+    assert event["args"] == {"files": 2, "extracted": 2, "cached": 0, "entries": 3}
+
+
+def test_prune_file_hashes(monkeypatch):
+    monkeypatch.setattr(extractors, "_file_hashes", {"a.py": "1", "b.py": "2"})
+    extractors.prune_file_hashes({"b.py", "c.py"})
+
+    assert extractors._file_hashes == {"b.py": "2"}
@@ -0,0 +1,96 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import os
+
+import polib
+
+from jupyterlab_translate import finder
+
+
+def test_index_key(tmp_path):
+    site_dir = tmp_path / "site-packages"
+    site_dir.mkdir()
+    key = finder.get_index_key([str(site_dir)])
+
+    # Other folders, like the current directory, are not part of the key
+    (tmp_path / "other").mkdir()
+    assert finder.get_index_key([str(site_dir)]) == key
+
+    (site_dir / "package-1.0.dist-info").mkdir()
+    os.utime(str(site_dir), ns=(0, 0))
+    assert finder.get_index_key([str(site_dir)]) != key
+
+
+def test_distribution_dirs():
+    dirs = finder.get_distribution_dirs()
+
+    # The folder holding the distribution of pytest is one of them
+    assert any(
+        os.path.isfile(os.path.join(path, "pytest", "__init__.py")) for path in dirs
+    )
+
+
+def test_get_mo_catalog_reload(tmp_path, monkeypatch):
+    locale_dir = tmp_path / "es_CO" / "LC_MESSAGES"
+    locale_dir.mkdir(parents=True)
+    json_path = locale_dir / "jupyterlab.json"
+    json_path.write_text("{}")
+    mo_path = str(locale_dir / "jupyterlab.mo")
+    monkeypatch.setattr(finder, "get_locale_files", lambda locale: [str(json_path)])
+    monkeypatch.setattr(finder, "_mo_catalogs", {})
+
+    po = polib.POFile()
+    po.metadata = {"Content-Type": "text/plain; charset=utf-8"}
+    po.append(polib.POEntry(msgid="Open", msgstr="Abrir"))
+    po.save_as_mofile(mo_path)
+    catalog = finder.get_mo_catalog("es_CO", "jupyterlab")
+    assert finder.get_mo_catalog("es_CO", "jupyterlab") is catalog
+
+    po[0].msgstr = "Abrir archivo"
+    po.save_as_mofile(mo_path + ".tmp")
+    os.replace(mo_path + ".tmp", mo_path)
+    new_catalog = finder.get_mo_catalog("es_CO", "jupyterlab")
+
+    # The replaced catalog is still usable by the callers holding it
+    assert new_catalog is not catalog
+    assert new_catalog.gettext("Open") == "Abrir archivo"
+    assert catalog.gettext("Open") == "Abrir"
+
+
+def test_merge_data_returns_copies(tmp_path, monkeypatch):
+    json_path = tmp_path / "jupyterlab.json"
+    json_path.write_text(
+        '{"": {"domain": "jupyterlab", "lang": "es"}, "Open": ["Abrir"]}'
+    )
+    monkeypatch.setattr(finder, "get_locale_files", lambda locale: [str(json_path)])
+    finder._merge_files.cache_clear()
+
+    data = finder.merge_data("es_CO")
+    data["jupyterlab"][""]["lang"] = "en"
+    data["jupyterlab"]["Open"].append("Cambiado")
+    data["other"] = {}
+
+    assert finder.merge_data("es_CO") == {
+        "jupyterlab": {"": {"domain": "jupyterlab", "lang": "es"}, "Open": ["Abrir"]}
+    }
+
+
+def test_get_mo_catalog_forgets_removed_files(tmp_path, monkeypatch):
+    locale_dir = tmp_path / "es_CO" / "LC_MESSAGES"
+    locale_dir.mkdir(parents=True)
+    json_path = locale_dir / "jupyterlab.json"
+    json_path.write_text("{}")
+    mo_path = str(locale_dir / "jupyterlab.mo")
+    monkeypatch.setattr(finder, "get_locale_files", lambda locale: [str(json_path)])
+    monkeypatch.setattr(finder, "_mo_catalogs", {})
+
+    po = polib.POFile()
+    po.metadata = {"Content-Type": "text/plain; charset=utf-8"}
+    po.append(polib.POEntry(msgid="Open", msgstr="Abrir"))
+    po.save_as_mofile(mo_path)
+    assert finder.get_mo_catalog("es_CO", "jupyterlab") is not None
+    assert list(finder._mo_catalogs) == [("es_CO", "jupyterlab")]
+
+    os.remove(mo_path)
+    assert finder.get_mo_catalog("es_CO", "jupyterlab") is None
+    assert finder._mo_catalogs == {}
@@ -0,0 +1,133 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import io
+import random
+
+import pytest
+from babel.messages.pofile import read_po
+
+from jupyterlab_translate.merge import DifflibMatcher
+from jupyterlab_translate.merge import serialize_catalog
+from jupyterlab_translate.merge import TrigramMatcher
+from jupyterlab_translate.merge import update_catalog
+
+PO = b"""# Spanish translations for jupyterlab.
+msgid ""
+msgstr ""
+"Project-Id-Version: jupyterlab 3.0.0\\n"
+"POT-Creation-Date: 2020-01-01 00:00+0000\\n"
+"PO-Revision-Date: 2020-01-02 00:00+0000\\n"
+"Language: es_CO\\n"
+"MIME-Version: 1.0\\n"
+"Content-Type: text/plain; charset=utf-8\\n"
+"Content-Transfer-Encoding: 8bit\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+
+# A translator comment
+#: src/a.ts:1
+msgid "Open File"
+msgstr "Abrir archivo"
+
+#: src/a.ts:2
+msgid "Save the notebook"
+msgstr "Guardar el cuaderno"
+
+#: src/a.ts:3
+msgid "Removed message"
+msgstr "Mensaje eliminado"
+
+#: src/a.ts:4
+msgctxt "menu"
+msgid "Edit"
+msgstr "Editar"
+
+#: src/a.ts:5
+msgid "%1 cell"
+msgid_plural "%1 cells"
+msgstr[0] "%1 celda"
+msgstr[1] "%1 celdas"
+
+#: src/a.ts:6
+msgid "Untranslated"
+msgstr ""
+"""
+POT = b"""msgid ""
+msgstr ""
+"Project-Id-Version: jupyterlab 3.1.0\\n"
+"POT-Creation-Date: 2020-02-01 00:00+0000\\n"
+"MIME-Version: 1.0\\n"
+"Content-Type: text/plain; charset=utf-8\\n"
+"Content-Transfer-Encoding: 8bit\\n"
+
+#: src/a.ts:1
+msgid "Open File"
+msgstr ""
+
+#: src/b.ts:2
+msgid "Save the notebooks"
+msgstr ""
+
+#: src/a.ts:4
+msgctxt "menu"
+msgid "Edit"
+msgstr ""
+
+#: src/a.ts:5
+msgid "%1 cell"
+msgid_plural "%1 cells"
+msgstr[0] ""
+msgstr[1] ""
+
+#: src/a.ts:7
+msgid "Untranslated text"
+msgstr ""
+
+#: src/a.ts:8
+msgid "Brand new"
+msgstr ""
+"""
+WORDS = (
+    "open close save file folder notebook cell code markdown kernel restart "
+    "run select all copy paste cut undo redo view tab panel console terminal "
+    "settings theme language export download upload rename delete new edit"
+).split()
+
+
+def load(data):
+    return read_po(io.BytesIO(data), locale="es_CO")
+
+
+@pytest.mark.parametrize("matcher", [DifflibMatcher, TrigramMatcher])
+def test_update_catalog_matches_babel(matcher):
+    expected = load(PO)
+    expected.update(load(POT))
+    catalog = load(PO)
+    update_catalog(catalog, load(POT), fuzzy_matcher=matcher)
+
+    data = serialize_catalog(catalog)
+    assert data == serialize_catalog(expected)
+    assert b'#, fuzzy\nmsgid "Save the notebooks"' in data
+    assert b'#~ msgid "Removed message"' in data
+
+
+def test_matchers_agree():
+    rng = random.Random(0)
+    candidates = sorted(
+        {" ".join(rng.sample(WORDS, rng.randint(2, 6))) for __ in range(500)}
+    )
+    keys = []
+    for candidate in rng.sample(candidates, 200):
+        words = candidate.split()
+        kind = rng.randrange(3)
+        if kind == 0:
+            keys.append(candidate + "s")
+        elif kind == 1:
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            keys.append(" ".join(words))
+        else:
+            keys.append(" ".join(words[:-1]) + "...")
+
+    difflib_matcher = DifflibMatcher(candidates)
+    trigram_matcher = TrigramMatcher(candidates)
+    for key in keys:
+        assert trigram_matcher.match(key) == difflib_matcher.match(key), key
@@ -0,0 +1,96 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import gettext
+
+import polib
+import pytest
+
+from jupyterlab_translate.mofile import MoCatalog
+
+PO = """
+msgid ""
+msgstr ""
+"Project-Id-Version: jupyterlab 3.0.0\\n"
+"Language: pl_PL\\n"
+"MIME-Version: 1.0\\n"
+"Content-Type: text/plain; charset=utf-8\\n"
+"Content-Transfer-Encoding: 8bit\\n"
+"Plural-Forms: nplurals=3; plural=(n==1 ? 0 : n%10>=2 && n%10<=4 && "
+"(n%100<10 || n%100>=20) ? 1 : 2);\\n"
+
+msgid "Open"
+msgstr "Otwórz"
+
+msgid "Close"
+msgstr "Zamknij"
+
+msgid "Untranslated"
+msgstr ""
+
+msgctxt "menu"
+msgid "File"
+msgstr "Plik"
+
+msgid "File"
+msgstr "Akta"
+
+msgid "%1 cell"
+msgid_plural "%1 cells"
+msgstr[0] "%1 komórka"
+msgstr[1] "%1 komórki"
+msgstr[2] "%1 komórek"
+
+msgctxt "notebook"
+msgid "%1 kernel"
+msgid_plural "%1 kernels"
+msgstr[0] "%1 jądro"
+msgstr[1] "%1 jądra"
+msgstr[2] "%1 jąder"
+"""
+COUNTS = [0, 1, 2, 5, 12, 22, 101, 1000]
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    mo_path = str(tmp_path / "jupyterlab.mo")
+    polib.pofile(PO).save_as_mofile(mo_path)
+    with open(mo_path, "rb") as fh:
+        expected = gettext.GNUTranslations(fh)
+
+    with MoCatalog(mo_path) as catalog:
+        yield catalog, expected
+
+
+@pytest.mark.parametrize(
+    "msgid", ["Open", "Close", "File", "Untranslated", "Missing", "", "%1 cell"]
+)
+def test_gettext(catalogs, msgid):
+    catalog, expected = catalogs
+
+    assert catalog.gettext(msgid) == expected.gettext(msgid)
+
+
+@pytest.mark.parametrize(
+    "context, msgid", [("menu", "File"), ("menu", "Open"), ("other", "File")]
+)
+def test_pgettext(catalogs, context, msgid):
+    catalog, expected = catalogs
+
+    assert catalog.pgettext(context, msgid) == expected.pgettext(context, msgid)
+
+
+@pytest.mark.parametrize("n", COUNTS)
+def test_ngettext(catalogs, n):
+    catalog, expected = catalogs
+    for (msgid, msgid_plural) in [("%1 cell", "%1 cells"), ("%1 row", "%1 rows")]:
+        assert catalog.ngettext(msgid, msgid_plural, n) == expected.ngettext(
+            msgid, msgid_plural, n
+        )
+
+
+@pytest.mark.parametrize("n", COUNTS)
+def test_npgettext(catalogs, n):
+    catalog, expected = catalogs
+    for context in ("notebook", "other"):
+        args = (context, "%1 kernel", "%1 kernels", n)
+        assert catalog.npgettext(*args) == expected.npgettext(*args)
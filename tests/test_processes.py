@@ -0,0 +1,37 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import asyncio
+import sys
+
+import pytest
+
+from jupyterlab_translate.processes import Command
+from jupyterlab_translate.processes import run_commands
+
+COMMANDS = [
+    Command("first", [sys.executable, "-c", "print('one')"], None),
+    Command("second", [sys.executable, "-c", "print('two')"], None),
+]
+
+
+def check(results, value):
+    assert [result.stdout.strip() for result in results] == [b"one", b"two"]
+    assert [result.returncode for result in results] == [0, 0]
+    assert value == 3
+
+
+def test_run_commands():
+    check(*run_commands(COMMANDS, func=lambda: 3))
+
+
+def test_run_commands_in_running_loop():
+    async def main():
+        return run_commands(COMMANDS, func=lambda: 3)
+
+    check(*asyncio.run(main()))
+
+
+def test_run_commands_failure():
+    commands = [Command("fail", [sys.executable, "-c", "exit(3)"], None)]
+    with pytest.raises(Exception, match="`fail` exited with code 3"):
+        run_commands(commands)
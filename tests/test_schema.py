@@ -0,0 +1,72 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import json
+import os
+
+from jupyterlab_translate.utils import extract_schema_strings
+from jupyterlab_translate.utils import load_json_with_lines
+
+SCHEMA = """{
+  "title": "Notebook",
+  "description": "Notebook settings.",
+  "properties": {
+    "kernel": {
+      "title": "Kernel",
+      "description": "Line one\\nline two \\"quoted\\" \\u00e9",
+      "properties": {
+        "name": {
+          "title": "Nested",
+          "description": "Not translated"
+        }
+      }
+    },
+    "theme": {
+      "title": "Kernel",
+      "description": "Notebook settings."
+    }
+  }
+}
+"""
+
+
+def test_load_json_with_lines():
+    data, lines = load_json_with_lines(SCHEMA)
+
+    assert data == json.loads(SCHEMA)
+    assert lines[("title",)] == 2
+    assert lines[("properties", "kernel", "title")] == 6
+    assert lines[("properties", "kernel", "properties", "name", "title")] == 10
+    # Repeated strings keep the line of each occurrence
+    assert lines[("properties", "theme", "title")] == 16
+    assert lines[("properties", "theme", "description")] == 17
+
+
+def test_load_json_with_lines_escapes():
+    text = '[\n"a\\\\b",\n"\\ud83d\\ude00",\n"\\/\\t"\n]'
+    data, lines = load_json_with_lines(text)
+
+    assert data == json.loads(text)
+    assert lines == {(0,): 2, (1,): 3, (2,): 4}
+
+
+def test_extract_schema_strings(tmp_path):
+    package_dir = tmp_path / "packages" / "notebook"
+    schema_dir = package_dir / "schema"
+    schema_dir.mkdir(parents=True)
+    (package_dir / "package.json").write_text(
+        json.dumps({"name": "notebook", "jupyterlab": {"schemaDir": "schema"}})
+    )
+    (schema_dir / "plugin.json").write_text(SCHEMA)
+
+    entries = extract_schema_strings(str(tmp_path))
+    ref_path = os.sep + os.path.join("packages", "notebook", "schema", "plugin.json")
+    messages = [(entry.msgctxt, entry.msgid, entry.occurrences) for entry in entries]
+
+    assert messages == [
+        ("schema", "Notebook", [(ref_path, 2)]),
+        ("schema", "Notebook settings.", [(ref_path, 3)]),
+        (None, "Kernel", [(ref_path, 6)]),
+        ("schema", 'Line one</br/>line two "quoted" é', [(ref_path, 7)]),
+        (None, "Kernel", [(ref_path, 16)]),
+        ("schema", "Notebook settings.", [(ref_path, 17)]),
+    ]
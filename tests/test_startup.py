@@ -0,0 +1,69 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+# The benchmarks are scripts, load the startup one by path
+STARTUP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "benchmarks",
+    "startup.py",
+)
+spec = importlib.util.spec_from_file_location("startup", STARTUP_PATH)
+startup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(startup)
+
+CLI_MODULE = "jupyterlab_translate.cli"
+# Generous budget, the import takes a few tens of milliseconds, so slow CI
+# machines pass and only a real regression goes over it
+MAX_IMPORT_MS = 500
+
+SCRIPT = """
+import json
+import sys
+
+from jupyterlab_translate.cli import main
+
+try:
+    main({args!r})
+except SystemExit:
+    pass
+
+print(json.dumps(sorted(name.split(".")[0] for name in sys.modules)))
+"""
+
+
+def get_imported_modules(args):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(args=args)],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_import_time():
+    # Keep the best run, the others measure noise of the machine
+    runs = [startup.measure_imports(CLI_MODULE) for _ in range(3)]
+    times = min(runs, key=lambda run: run[CLI_MODULE])
+    heavy = sorted(name for name in times if name in startup.HEAVY_MODULES)
+    assert not heavy
+    assert times[CLI_MODULE] / 1000 < MAX_IMPORT_MS
+
+
+def test_help_does_not_import_heavy_modules():
+    imported = get_imported_modules(["--help"])
+    assert imported.isdisjoint(startup.HEAVY_MODULES), sorted(
+        imported & set(startup.HEAVY_MODULES)
+    )
+
+
+def test_command_help_does_not_import_heavy_modules():
+    imported = get_imported_modules(["build", "--help"])
+    assert imported.isdisjoint(startup.HEAVY_MODULES), sorted(
+        imported & set(startup.HEAVY_MODULES)
+    )
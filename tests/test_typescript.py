@@ -0,0 +1,57 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import os
+
+import polib
+
+from jupyterlab_translate.extractors import extract_typescript_strings
+from jupyterlab_translate.typescript import extract_typescript
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "typescript")
+
+
+def get_messages(entries):
+    return sorted(
+        (
+            entry.msgctxt or "",
+            entry.msgid,
+            entry.msgid_plural,
+            entry.comment,
+            sorted((path, int(line)) for (path, line) in entry.occurrences),
+        )
+        for entry in entries
+    )
+
+
+def test_extract_fixtures():
+    paths = [os.path.join(FIXTURES_DIR, name) for name in ("commands.ts", "links.tsx")]
+    entries = extract_typescript_strings({"fixtures": paths}, FIXTURES_DIR)
+    expected = polib.pofile(os.path.join(FIXTURES_DIR, "expected.pot"))
+
+    assert get_messages(entries) == get_messages(expected)
+
+
+def test_jsx_text_slashes():
+    source = (
+        "const a = <a>https://jupyter.org</a> {trans.__('See')};\n"
+        'const b = <p>/path {trans.__("Slash")}</p>;\n'
+    )
+
+    assert list(extract_typescript(source, jsx=True)) == [
+        (1, None, "See", None, None),
+        (2, None, "Slash", None, None),
+    ]
+
+
+def test_statement_comment():
+    source = (
+        "// translators: first\n"
+        "const a = trans.__('A');\n"
+        "foo();\n"
+        "const b = trans.__('B');\n"
+    )
+
+    assert list(extract_typescript(source)) == [
+        (2, None, "A", None, "translators: first"),
+        (4, None, "B", None, None),
+    ]
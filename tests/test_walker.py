@@ -0,0 +1,137 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import os
+
+import pytest
+
+from jupyterlab_translate.walker import _translate_pattern
+from jupyterlab_translate.walker import is_ignored
+from jupyterlab_translate.walker import parse_ignore_file
+from jupyterlab_translate.walker import walk_files
+
+
+def get_rules(tmp_path, text, base=""):
+    path = tmp_path / ".gitignore"
+    path.write_text(text)
+    return parse_ignore_file(str(path), base)
+
+
+@pytest.mark.parametrize(
+    "pattern, path, matched",
+    [
+        ("*.ts", "index.ts", True),
+        ("*.ts", "src/index.ts", False),
+        ("src/*.ts", "src/a/index.ts", False),
+        ("a?c", "abc", True),
+        ("a?c", "a/c", False),
+        ("[a-c].ts", "b.ts", True),
+        ("[!a-c].ts", "b.ts", False),
+        ("**/lib", "lib", True),
+        ("**/lib", "a/b/lib", True),
+        ("lib/**", "lib/a/b.ts", True),
+        ("lib/**", "lib", False),
+        ("a/**/b", "a/b", True),
+        ("a/**/b", "a/x/y/b", True),
+        ("\\!important", "!important", True),
+    ],
+)
+def test_translate_pattern(pattern, path, matched):
+    assert bool(_translate_pattern(pattern).match(path)) == matched
+
+
+def test_negation(tmp_path):
+    rules = get_rules(tmp_path, "*.ts\n!keep.ts\n")
+
+    assert is_ignored("drop.ts", False, rules)
+    assert not is_ignored("keep.ts", False, rules)
+    assert not is_ignored("src/keep.ts", False, rules)
+
+    # The last matching rule wins
+    rules = get_rules(tmp_path, "!keep.ts\n*.ts\n")
+    assert is_ignored("keep.ts", False, rules)
+
+
+def test_anchored_patterns(tmp_path):
+    rules = get_rules(tmp_path, "/build\nlib\ndocs/api\n# comment\n\n")
+
+    assert is_ignored("build", True, rules)
+    assert not is_ignored("src/build", True, rules)
+    assert is_ignored("lib", True, rules)
+    assert is_ignored("src/lib", True, rules)
+    assert is_ignored("docs/api", True, rules)
+    assert not is_ignored("src/docs/api", True, rules)
+    assert not is_ignored("# comment", False, rules)
+
+
+def test_dir_only_patterns(tmp_path):
+    rules = get_rules(tmp_path, "out/\n")
+
+    assert is_ignored("out", True, rules)
+    assert is_ignored("src/out", True, rules)
+    assert not is_ignored("out", False, rules)
+
+
+def test_nested_rules(tmp_path):
+    rules = get_rules(tmp_path, "*.ts\n/local.ts\n", base="packages/a")
+
+    assert is_ignored("packages/a/index.ts", False, rules)
+    assert is_ignored("packages/a/src/index.ts", False, rules)
+    assert is_ignored("packages/a/local.ts", False, rules)
+    assert not is_ignored("packages/b/index.ts", False, rules)
+    assert not is_ignored("index.ts", False, rules)
+
+
+def test_walk_files(tmp_path):
+    paths = [
+        "index.ts",
+        "build/index.ts",
+        "src/build/index.ts",
+        "out/index.ts",
+        "src/out.ts",
+        "node_modules/dep/index.ts",
+        "packages/a/index.ts",
+        "packages/a/generated.ts",
+        "packages/a/lib/index.ts",
+        "packages/b/generated.ts",
+        "packages/b/keep.ts",
+        "packages/b/lib/index.ts",
+        "packages/b/src/lib/index.ts",
+    ]
+    for path in paths:
+        path = tmp_path.joinpath(*path.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    (tmp_path / ".gitignore").write_text("/build\nout/\ngenerated.ts\n!keep.ts\n")
+    (tmp_path / "packages" / "a" / ".gitignore").write_text("!generated.ts\n")
+    (tmp_path / "packages" / "b" / ".gitignore").write_text("/lib\n")
+
+    stats = {}
+    files = walk_files(
+        str(tmp_path / "packages"),
+        (".ts",),
+        skip_folders=("node_modules",),
+        ignore_root=str(tmp_path),
+        stats=stats,
+    )
+    # The ignore file of the root applies to the walked folder
+    assert [os.path.relpath(path, str(tmp_path)) for path in files] == [
+        os.path.join("packages", "a", "generated.ts"),
+        os.path.join("packages", "a", "index.ts"),
+        os.path.join("packages", "a", "lib", "index.ts"),
+        os.path.join("packages", "b", "keep.ts"),
+        os.path.join("packages", "b", "src", "lib", "index.ts"),
+    ]
+    assert stats["skipped"] == 2
+
+    files = walk_files(str(tmp_path), (".ts",), skip_folders=("node_modules",))
+    assert [os.path.relpath(path, str(tmp_path)) for path in files] == [
+        "index.ts",
+        os.path.join("packages", "a", "generated.ts"),
+        os.path.join("packages", "a", "index.ts"),
+        os.path.join("packages", "a", "lib", "index.ts"),
+        os.path.join("packages", "b", "keep.ts"),
+        os.path.join("packages", "b", "src", "lib", "index.ts"),
+        os.path.join("src", "out.ts"),
+        os.path.join("src", "build", "index.ts"),
+    ]
@@ -0,0 +1,82 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import json
+import os
+
+from jupyterlab_translate import utils
+from jupyterlab_translate.watch import SourceWatcher
+
+SCHEMA = {"title": "Settings", "description": "App settings", "properties": {}}
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def make_repo(repo_dir):
+    package_dir = os.path.join(repo_dir, "packages", "app")
+    write_file(
+        os.path.join(package_dir, "src", "index.ts"), "const a = trans.__('Open');\n"
+    )
+    write_file(
+        os.path.join(package_dir, "package.json"),
+        json.dumps({"jupyterlab": {"schemaDir": "schema"}}),
+    )
+    schema_path = os.path.join(package_dir, "schema", "plugin.json")
+    write_file(schema_path, json.dumps(SCHEMA))
+    return schema_path
+
+
+def get_messages(pot):
+    return sorted((entry.msgctxt or "", entry.msgid) for entry in pot.entries)
+
+
+def test_create_catalog_with_watcher_files(tmp_path, monkeypatch):
+    repo_dir = str(tmp_path / "repo")
+    schema_path = make_repo(repo_dir)
+    locale_dir = str(tmp_path / "locale")
+    _pot_path, expected = utils.create_catalog(repo_dir, locale_dir, "app", "1.0")
+
+    watcher = SourceWatcher(repo_dir, "app")
+    assert schema_path in watcher.files
+
+    def walk_files(*args, **kwargs):
+        raise AssertionError("The repository is walked again")
+
+    monkeypatch.setattr(utils, "walk_files", walk_files)
+    _pot_path, pot = utils.create_catalog(
+        repo_dir, locale_dir, "app", "1.0", catalog_files=watcher.catalog_files
+    )
+    assert get_messages(pot) == get_messages(expected)
+    assert schema_path in utils._schemas
+
+
+def test_removed_schema_is_forgotten(tmp_path):
+    repo_dir = str(tmp_path / "repo")
+    schema_path = make_repo(repo_dir)
+    watcher = SourceWatcher(repo_dir, "app")
+    utils.extract_schema_strings(repo_dir, schema_paths=watcher.catalog_files.schemas)
+    assert schema_path in utils._schemas
+
+    os.remove(schema_path)
+    assert watcher.poll() == [schema_path]
+    assert watcher.catalog_files.schemas == []
+    entries = utils.extract_schema_strings(
+        repo_dir, changed_files={schema_path}, schema_paths=[]
+    )
+    assert entries == []
+    assert schema_path not in utils._schemas
+
+
+def test_package_json_change_rescans(tmp_path):
+    repo_dir = str(tmp_path / "repo")
+    schema_path = make_repo(repo_dir)
+    watcher = SourceWatcher(repo_dir, "app")
+    package_json = os.path.join(repo_dir, "packages", "app", "package.json")
+    write_file(package_json, json.dumps({"name": "app"}))
+    os.utime(package_json, ns=(0, 0))
+
+    assert package_json in watcher.poll()
+    assert schema_path not in watcher.catalog_files.schemas